@@ -30,3 +30,6 @@ class EmptyError(Exception):
 
 class FullError(Exception):
     pass
+
+class CorruptError(Exception):
+    pass
@@ -0,0 +1,271 @@
+# priority queue implemented using a min-heap in parallel numpy arrays
+from prioqueueABC import PrioQueueABC
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class ArrayHeapPrioQueue(PrioQueueABC):
+    """
+    Priority Queue for numeric priorities, implemented using a min-heap
+    held in parallel numpy arrays instead of an array of Node objects
+    Entries with equal priorities leave the queue in insertion (FIFO)
+    order, as in HeapPrioQueue.
+    Attributes
+    - _dtype (a class) - type of data values associated with priorities
+    default is type(int())
+    - _prioType (numpy dtype) - type of the priorities, default float64
+    - _capacity (int) - the size of the min-heap arrays
+    - _last (int) - the last occupied index in the min-heap arrays
+    - _sequenceNo (int) - the next sequence number to assign to an entry
+    - _prio (numpy 1D array of _prioType) - priority of each heap entry
+    - _seqno (numpy 1D int64 array) - sequence number of each heap entry
+    - _datum (numpy 1D array of _dtype) - datum of each heap entry
+    """
+    DEFAULT_CAPACITY = 25
+
+    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int()),
+                 prioType = type(float())):
+        """
+        Construct array-based priority queue ADT
+        Parameters
+        - capacity (int) - initial capacity for the min-heap, default of 25
+        - dtype (class) - element type in the min-heap, default type(int())
+        - prioType (class) - numeric priority type, default type(float())
+        Effects
+        - empty prio queue object ready to act like one
+        Raises
+        - TypeError if prioType is not a numeric type
+        - MemoryError if allocation of the arrays fails
+        """
+        self._dtype = typemap(dtype)
+        self._prioType = np.dtype(typemap(prioType))
+        if self._prioType.kind not in 'iuf':
+            raise TypeError(
+                'ArrayHeapPrioQueue - prioType {} is not numeric'.format(
+                    prioType))
+        self._capacity = max(capacity, 2)
+        self._last = 0
+        self._sequenceNo = 1
+        self._prio, self._seqno, self._datum = self._alloc_(self._capacity)
+
+    def _alloc_(self, n):
+        """
+        Allocate heap arrays with n cells
+        Returns
+        - (prio, seqno, datum) numpy 1D arrays
+        Raises
+        - MemoryError if allocation fails
+        """
+        try:
+            prio = np.empty(n, dtype=self._prioType)
+            seqno = np.empty(n, dtype=np.int64)
+            datum = np.empty(n, dtype=self._dtype)
+        except:
+            raise MemoryError('ArrayHeapPrioQueue - unable to allocate array')
+        return (prio, seqno, datum)
+
+    def __str__(self):
+        """Document metadata about the PrioQueue"""
+        return 'ArrayHeapPrioQueue - capacity:{}, size:{}, dtype:{}'.format(
+            self._capacity, self._last, self._dtype)
+
+    def clear(self):
+        """
+        Empty the PrioQueue
+        Effects
+        - after return, isEmpty() invoked on the PrioQueue returns True
+        """
+        self._last = 0
+
+    def _grow_(self, n):
+        """
+        Make room for at least n cells, copying the heap in one block
+        Raises
+        - MemoryError if allocation of larger arrays fails
+        """
+        new_capacity = self._capacity
+        while new_capacity < n:
+            new_capacity *= 2
+        if new_capacity == self._capacity:
+            return
+        prio, seqno, datum = self._alloc_(new_capacity)
+        k = self._last + 1
+        prio[1:k] = self._prio[1:k]
+        seqno[1:k] = self._seqno[1:k]
+        datum[1:k] = self._datum[1:k]
+        self._prio, self._seqno, self._datum = prio, seqno, datum
+        self._capacity = new_capacity
+
+    def _siftup_(self, i, p_i, s_i, d_i):
+        """
+        Place an entry by moving a hole at index i towards the root
+        Parameters
+        - i - index of a hole, with heap(1, n) true apart from it
+        - p_i, s_i, d_i - priority, sequence number and datum to place
+        Effects
+        - the entry is stored so that heap(1, n) is true
+        """
+        prio = self._prio
+        seqno = self._seqno
+        datum = self._datum
+        while i > 1:
+            p = i // 2
+            pp = prio[p]
+            if pp < p_i or (pp == p_i and seqno[p] < s_i):
+                break
+            prio[i] = pp
+            seqno[i] = seqno[p]
+            datum[i] = datum[p]
+            i = p
+        prio[i] = p_i
+        seqno[i] = s_i
+        datum[i] = d_i
+
+    def _siftdown_(self, i, p_i, s_i, d_i):
+        """
+        Place an entry by moving a hole at index i towards the leaves
+        Parameters
+        - i - index of a hole, with heap(2i, n) true below it
+        - p_i, s_i, d_i - priority, sequence number and datum to place
+        Effects
+        - the entry is stored so that the subtree at i is a heap
+        """
+        prio = self._prio
+        seqno = self._seqno
+        datum = self._datum
+        last = self._last
+        while True:
+            c = 2 * i
+            if c > last:
+                break
+            pc = prio[c]
+            if c < last:
+                pc2 = prio[c + 1]
+                if pc2 < pc or (pc2 == pc and seqno[c + 1] < seqno[c]):
+                    c += 1
+                    pc = pc2
+            if p_i < pc or (p_i == pc and s_i < seqno[c]):
+                break
+            prio[i] = pc
+            seqno[i] = seqno[c]
+            datum[i] = datum[c]
+            i = c
+        prio[i] = p_i
+        seqno[i] = s_i
+        datum[i] = d_i
+
+    def insert(self, prio, datum):
+        """
+        Insert (prio, datum) into the correct place in the PrioQueue
+        Parameters
+        - prio - numeric priority for this entry
+        - datum - datum associated with this priority in this entry
+        Effects
+        - (prio,datum) will be inserted into the min-heap arrays such that
+        they satisfy the heap property
+        Raises
+        - TypeError if type(datum) is different from _dtype
+        - MemoryError if allocation of larger arrays fails
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'ArrayHeapPrioQueue.insert - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        i = self._last + 1
+        if i >= self._capacity:
+            self._grow_(i + 1)
+        self._last = i
+        seq = self._sequenceNo
+        self._sequenceNo += 1
+        self._siftup_(i, self._prioType.type(prio), seq, datum)
+
+    def min(self):
+        """
+        Return (prio,datum) for the highest priority entry in the PrioQueue
+        Returns
+        - (prio,datum) for the highest priority entry in the PrioQueue
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._last == 0:
+            raise EmptyError('ArrayHeapPrioQueue.min - queue is empty')
+        return (self._prio[1], self._datum[1])
+
+    def removeMin(self):
+        """
+        remove and return (prio,datum) for the highest priority entry in the
+        PrioQueue
+        Returns
+        - (prio,datum) for the highest priority entry in the PrioQueue
+        Effects
+        - one fewer entries in the PrioQueue
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._last == 0:
+            raise EmptyError('ArrayHeapPrioQueue.removeMin - queue is empty')
+        ans = (self._prio[1], self._datum[1])
+        n = self._last
+        self._last -= 1
+        if n > 1:
+            self._siftdown_(1, self._prio[n], self._seqno[n], self._datum[n])
+        return ans
+
+    def isEmpty(self):
+        """
+        Indicate if the PrioQueue is empty
+        Returns
+        - True if the PrioQueue has no elements
+        - False otherwise
+        """
+        return self._last == 0
+
+    def size(self):
+        """
+        Return the number of elements in the PrioQueue
+        Returns
+        - the number of elements in the PrioQueue, >= 0
+        """
+        return self._last
+
+    def _genArray_(self):
+        """
+        Generate an array of (prio,value) tuples ordered by priority
+        Returns
+        - numpy 1D array of (prio,value) tuples ordered by priority, with
+        FIFO order among equal priorities
+        Raises
+        - MemoryError if array allocation failure
+        """
+        n = self._last
+        k = n + 1
+        order = np.lexsort((self._seqno[1:k], self._prio[1:k])) + 1
+        try:
+            x = np.empty(n, dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'ArrayHeapPrioQueue._genArray_ - unable to allocate array'
+            )
+        prio = self._prio[order].tolist()
+        datum = self._datum[order].tolist()
+        for j in range(n):
+            x[j] = (prio[j], datum[j])
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        returns iterator over the (prio,datum) elements, in priority order
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of array fails
+        """
+        n = self._last
+        x = self._genArray_()
+        return it.Iterator(n, x)
@@ -28,6 +28,7 @@ import numpy as np
 import ADTiterator as it
 from ADTexceptions import *
 from ADTtypemap import typemap
+from growthpolicy import DEFAULT_POLICY
 
 class ArrayQueue(QueueABC):
     """
@@ -40,14 +41,17 @@ class ArrayQueue(QueueABC):
     - _out (int) - index into _array at which the next front/dequeue will
     occur
     - _array - numpy 1D array, size _capacity, cells for _dtype elements
+    - _growth (GrowthPolicy) - decides the capacity when resizing
     """
     DEFAULT_CAPACITY = 25
-    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int())):
+    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int()),
+                 growth = DEFAULT_POLICY):
         """
         Construct array-based queue
         Parameters
         - capacity (int) - initial capacity for the queue, defaults to 25
         - dtype (a class) - type of queue elements, defaults to type(int())
+        - growth (GrowthPolicy) - resizing policy, defaults to doubling
         EffectsA.4. ARRAYQUEUE.PY 257
         - object instance ready to act like a queue
         Raises
@@ -55,6 +59,7 @@ class ArrayQueue(QueueABC):
         """
 
         self._dtype = typemap(dtype)
+        self._growth = growth
         self._capacity = capacity
         self._count = 0
         self._in = 0
@@ -79,16 +84,55 @@ class ArrayQueue(QueueABC):
         self._count = 0
         self._in = 0
         self._out = 0
-        
+        self._shrink_()
+
+    def _resize_(self, new_capacity):
+        """
+        Reallocate _array with new_capacity cells, copying the elements in
+        one block
+        Raises
+        - MemoryError if allocation of the new array fails
+        """
+        try:
+            new_array = np.empty(new_capacity, dtype=self._dtype)
+        except:
+            raise MemoryError('ArrayQueue - unable to resize array')
+        n = self._count
+        head = min(n, self._capacity - self._out)
+        new_array[0:head] = self._array[self._out:self._out + head]
+        new_array[head:n] = self._array[0:n - head]
+        self._out = 0
+        self._in = n % new_capacity
+        self._capacity = new_capacity
+        self._array = new_array
+
+    def _shrink_(self):
+        """Shrink _array if the growth policy calls for it"""
+        new_capacity = self._growth.shrink(self._capacity, self._count)
+        if new_capacity:
+            self._resize_(new_capacity)
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by _array
+        """
+        return self._array.nbytes
+
+    def slack(self):
+        """
+        Return the number of bytes held by unused cells of _array
+        """
+        return self._array.nbytes - self._count * self._array.itemsize
+
     def enqueue(self, datum):
         """
         Enqueue an item at the tail of the queue
-        Doubles the capacity of _array if the queue is full
+        Grows _array as the growth policy decides if the queue is full
         Parameters
         - datum - datum of the correct type
         Effects
-        - the queue is larger by one element; array has doubled
-        in size if upon entry the queue was full
+        - the queue is larger by one element; array has grown
+        if upon entry the queue was full
         Raises
         - TypeError if type of datum is not the same as _dtyhpe
         - MemoryError if allocation of the larger array fails
@@ -102,25 +146,7 @@ class ArrayQueue(QueueABC):
             )
         
         if self._count >= self._capacity:
-            new_capacity = 2 * self._capacity
-            try:
-                new_array = np.empty(new_capacity, dtype=self._dtype)
-                n = self._count
-                i = self._out
-                j = 0
-                while n > 0:
-                    new_array[j] = self._array[i]
-                    n -= 1
-                    j += 1
-                    i = (i + 1) % self._capacity
-                self._array = new_array
-                self._capacity = new_capacity
-                self._out = 0
-                self._in = self._count    
-            except:
-                raise MemoryError(
-                    'ArrayQueue.enqueue - unable to grow array'
-                )
+            self._resize_(self._growth.grow(self._capacity, self._count + 1))
         self._array[self._in] = datum
         self._in = (self._in + 1) % self._capacity
         self._count += 1
@@ -153,6 +179,7 @@ class ArrayQueue(QueueABC):
         datum = self._array[self._out]
         self._count -= 1
         self._out = (self._out + 1) % self._capacity
+        self._shrink_()
         return datum
 
     def isEmpty(self):
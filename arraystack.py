@@ -29,6 +29,7 @@ import numpy as np
 import ADTiterator as it
 from ADTexceptions import *
 from ADTtypemap import typemap
+from growthpolicy import DEFAULT_POLICY
 class ArrayStack(StackABC):
     """
     Array-based implementation of the Stack ADT
@@ -37,15 +38,18 @@ class ArrayStack(StackABC):
     - _dtype - default value is type(int())
     - _next - index into _array for next pushed element
     - _array - numpy 1D array, size _capacity, cells for _dtype elements
+    - _growth (GrowthPolicy) - decides the capacity when resizing
     """
     DEFAULT_CAPACITY = 25
 
-    def __init__(self, capacity=DEFAULT_CAPACITY, dtype=type(int())):
+    def __init__(self, capacity=DEFAULT_CAPACITY, dtype=type(int()),
+                 growth=DEFAULT_POLICY):
         """
         Construct array-based stack
         Parameters
         - capacity (int) - initial capacity for stack, defaults to 25
         - dtype (a class) - type of elements in stack, defaults to type(int())
+        - growth (GrowthPolicy) - resizing policy, defaults to doubling
         Effects
         - object instance ready to act like a stack
         Raises
@@ -53,6 +57,7 @@ class ArrayStack(StackABC):
         """
 
         self._dtype = typemap(dtype)
+        self._growth = growth
         self._capacity = capacity
         self._next = 0
         try:
@@ -72,16 +77,50 @@ class ArrayStack(StackABC):
         - after return, isEmpty() invoked on the stack returns True
         """
         self._next = 0
+        self._shrink_()
+
+    def _resize_(self, new_capacity):
+        """
+        Reallocate _array with new_capacity cells, copying the elements in
+        one block
+        Raises
+        - MemoryError if allocation of the new array fails
+        """
+        try:
+            new_array = np.empty(new_capacity, dtype=self._dtype)
+        except:
+            raise MemoryError('ArrayStack - unable to resize array')
+        new_array[0:self._next] = self._array[0:self._next]
+        self._capacity = new_capacity
+        self._array = new_array
+
+    def _shrink_(self):
+        """Shrink _array if the growth policy calls for it"""
+        new_capacity = self._growth.shrink(self._capacity, self._next)
+        if new_capacity:
+            self._resize_(new_capacity)
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by _array
+        """
+        return self._array.nbytes
+
+    def slack(self):
+        """
+        Return the number of bytes held by unused cells of _array
+        """
+        return self._array.nbytes - self._next * self._array.itemsize
 
     def push(self, datum):
         """
-        Push an item on top of the stack; doubles the capacity
-        of _array if the stack is full
+        Push an item on top of the stack; grows _array as the
+        growth policy decides if the stack is full
         Parameters
         - datum - datum of the correct type
         Effects
-        - the stack is larger by one element; array has doubled
-        in size if upon entry the stack was full
+        - the stack is larger by one element; array has grown
+        if upon entry the stack was full
         Raises
         - TypeError - if type of datum is not the same as _dtype
         - MemoryError - if allocation of larger array fails
@@ -93,15 +132,7 @@ class ArrayStack(StackABC):
                 )
             )
         if self._next >= self._capacity:
-            new_capacity = 2 * self._capacity
-            try:
-                new_array = np.empty(new_capacity, dtype=self._dtype)
-                for i in range(self._capacity):
-                    new_array[i] = self._array[i]
-                self._capacity = new_capacity
-                self._array = new_array
-            except:
-                raise MemoryError('ArrayStack.push - unable to grow array')
+            self._resize_(self._growth.grow(self._capacity, self._next + 1))
         self._array[self._next] = datum
         self._next += 1
 
@@ -134,6 +165,7 @@ class ArrayStack(StackABC):
             raise EmptyError('ArrayStack.pop - stack is empty')
         self._next -= 1
         datum = self._array[self._next]
+        self._shrink_()
         return datum
 
     
@@ -0,0 +1,313 @@
+# asyncio queues built on ArrayQueue and HeapPrioQueue
+from arrayqueue import ArrayQueue
+from heapprioqueue import HeapPrioQueue
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from ADTexceptions import *
+
+class AsyncQueueBase(ABC):
+    """
+    Waiting logic shared by the asyncio queues
+    Coroutines waiting in get or put park on futures, woken one at a time
+    as entries are added or removed, as in asyncio.Queue; nothing blocks
+    the event loop.  Subclasses own the storage and implement the abstract
+    methods below.
+    Not thread-safe: use the queues from one event loop.
+    Attributes
+    - _maxsize (int) - maximum number of entries, 0 for unbounded
+    - _getters (deque of futures) - coroutines waiting for an entry
+    - _putters (deque of futures) - coroutines waiting for room
+    """
+
+    def __init__(self, maxsize = 0):
+        """
+        Parameters
+        - maxsize (int) - maximum number of entries; 0 (the default) for
+        no limit, so that put never waits
+        """
+        self._maxsize = maxsize
+        self._getters = deque()
+        self._putters = deque()
+
+    @abstractmethod
+    def __str__(self):
+        """
+        Derived class must generate string representation for the queue
+        """
+        pass
+
+    @abstractmethod
+    def _count_(self):
+        """
+        Derived class must return the number of entries in the storage
+        """
+        pass
+
+    @abstractmethod
+    def put_nowait(self, *entry):
+        """
+        Add an entry without waiting
+        Parameters
+        - entry - the entry's fields, as defined by the derived class
+        Raises
+        - FullError if the queue is full
+        """
+        pass
+
+    @abstractmethod
+    async def put(self, *entry):
+        """
+        Add an entry, waiting for room if the queue is full
+        Parameters
+        - entry - the entry's fields, as defined by the derived class
+        """
+        pass
+
+    @abstractmethod
+    def get_nowait(self):
+        """
+        Remove and return the next entry without waiting
+        Raises
+        - EmptyError if the queue is empty
+        """
+        pass
+
+    @abstractmethod
+    async def get(self):
+        """
+        Remove and return the next entry, waiting for one if the queue is
+        empty
+        """
+        pass
+
+    @abstractmethod
+    def toArray(self):
+        """
+        Return a numpy 1D array of the entries in the order get removes
+        them
+        """
+        pass
+
+    def _full_(self):
+        """Indicate if a put must wait"""
+        return 0 < self._maxsize <= self._count_()
+
+    def _wakeup_(self, waiters):
+        """Wake the first waiter that is still waiting"""
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait_(self, waiters, mustWait):
+        """
+        Park the calling coroutine on waiters until mustWait() is False
+        If the coroutine is cancelled after being woken, the wakeup is
+        passed on so that it is not lost
+        """
+        while mustWait():
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except:
+                waiter.cancel()
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not mustWait() and not waiter.cancelled():
+                    self._wakeup_(waiters)
+                raise
+
+    def _checkPut_(self, where):
+        """Raise FullError if a put may not proceed now"""
+        if self._full_():
+            raise FullError('{} - queue is full'.format(where))
+
+    def _checkGet_(self, where):
+        """Raise EmptyError if a get may not proceed now"""
+        if self._count_() == 0:
+            raise EmptyError('{} - queue is empty'.format(where))
+
+    def maxsize(self):
+        """Return the maximum number of entries, 0 for unbounded"""
+        return self._maxsize
+
+    def full(self):
+        """Indicate if put would wait"""
+        return self._full_()
+
+    def isEmpty(self):
+        """
+        Indicate if the queue is empty
+        Returns
+        - True if the queue has no elements
+        - False otherwise
+        """
+        return self._count_() == 0
+
+    def size(self):
+        """
+        Return the number of elements in the queue
+        Returns
+        - the number of elements in the queue, >= 0
+        """
+        return self._count_()
+
+    def __len__(self):
+        """
+        Synonym for size
+        """
+        return self._count_()
+
+class AsyncQueue(AsyncQueueBase):
+    """
+    FIFO queue for asyncio, storing its elements in an ArrayQueue
+    Attributes (in addition to those of AsyncQueueBase)
+    - _queue (ArrayQueue) - the elements
+    """
+
+    def __init__(self, maxsize = 0, dtype = type(int()),
+                 capacity = ArrayQueue.DEFAULT_CAPACITY):
+        """
+        Construct asyncio FIFO queue
+        Parameters
+        - maxsize (int) - maximum number of elements, 0 for unbounded
+        - dtype (a class) - type of queue elements, default type(int())
+        - capacity (int) - initial capacity of the ArrayQueue
+        Raises
+        - MemoryError if allocation of the ArrayQueue fails
+        """
+        AsyncQueueBase.__init__(self, maxsize)
+        self._queue = ArrayQueue(capacity=capacity, dtype=dtype)
+
+    def __str__(self):
+        """Document metadata about the queue"""
+        return 'AsyncQueue - maxsize:{}, size:{}, dtype:{}'.format(
+            self._maxsize, self._queue.size(), self._queue._dtype)
+
+    def _count_(self):
+        return self._queue._count
+
+    def put_nowait(self, datum):
+        """
+        Enqueue datum without waiting
+        Raises
+        - FullError if the queue is full
+        - TypeError if type(datum) is different from the queue's dtype
+        """
+        self._checkPut_('AsyncQueue.put_nowait')
+        self._queue.enqueue(datum)
+        self._wakeup_(self._getters)
+
+    async def put(self, datum):
+        """
+        Enqueue datum, waiting for room if the queue is full
+        Raises
+        - TypeError if type(datum) is different from the queue's dtype
+        """
+        await self._wait_(self._putters, self._full_)
+        self.put_nowait(datum)
+
+    def get_nowait(self):
+        """
+        Dequeue and return the oldest element without waiting
+        Raises
+        - EmptyError if the queue is empty
+        """
+        self._checkGet_('AsyncQueue.get_nowait')
+        ans = self._queue.dequeue()
+        self._wakeup_(self._putters)
+        return ans
+
+    async def get(self):
+        """
+        Dequeue and return the oldest element, waiting for one if the
+        queue is empty
+        """
+        await self._wait_(self._getters, self.isEmpty)
+        return self.get_nowait()
+
+    def toArray(self):
+        """Return numpy 1D array of the elements, oldest first"""
+        return self._queue.toArray()
+
+class AsyncPrioQueue(AsyncQueueBase):
+    """
+    Priority queue for asyncio, storing its entries in a HeapPrioQueue;
+    equal priorities leave in FIFO order
+    Attributes (in addition to those of AsyncQueueBase)
+    - _queue (HeapPrioQueue) - the entries
+    """
+
+    def __init__(self, maxsize = 0, dtype = type(int()),
+                 capacity = HeapPrioQueue.DEFAULT_CAPACITY,
+                 arity = HeapPrioQueue.DEFAULT_ARITY):
+        """
+        Construct asyncio priority queue
+        Parameters
+        - maxsize (int) - maximum number of entries, 0 for unbounded
+        - dtype (class) - element type in the queue, default type(int())
+        - capacity (int) - initial capacity of the min-heap
+        - arity (int) - children per heap node, see HeapPrioQueue
+        Raises
+        - MemoryError if allocation of the min-heap fails
+        """
+        AsyncQueueBase.__init__(self, maxsize)
+        self._queue = HeapPrioQueue(capacity=capacity, dtype=dtype,
+                                    arity=arity)
+
+    def __str__(self):
+        """Document metadata about the queue"""
+        return 'AsyncPrioQueue - maxsize:{}, size:{}, dtype:{}'.format(
+            self._maxsize, self._queue.size(), self._queue._dtype)
+
+    def _count_(self):
+        return self._queue._last
+
+    def put_nowait(self, prio, datum):
+        """
+        Insert (prio, datum) without waiting
+        Raises
+        - FullError if the queue is full
+        - TypeError if type(datum) is different from the queue's dtype
+        """
+        self._checkPut_('AsyncPrioQueue.put_nowait')
+        self._queue.insert(prio, datum)
+        self._wakeup_(self._getters)
+
+    async def put(self, prio, datum):
+        """
+        Insert (prio, datum), waiting for room if the queue is full
+        Raises
+        - TypeError if type(datum) is different from the queue's dtype
+        """
+        await self._wait_(self._putters, self._full_)
+        self.put_nowait(prio, datum)
+
+    def get_nowait(self):
+        """
+        Remove and return (prio,datum) for the highest priority entry
+        without waiting
+        Raises
+        - EmptyError if the queue is empty
+        """
+        self._checkGet_('AsyncPrioQueue.get_nowait')
+        ans = self._queue.removeMin()
+        self._wakeup_(self._putters)
+        return ans
+
+    async def get(self):
+        """
+        Remove and return (prio,datum) for the highest priority entry,
+        waiting for one if the queue is empty
+        """
+        await self._wait_(self._getters, self.isEmpty)
+        return self.get_nowait()
+
+    def toArray(self):
+        """Return numpy 1D array of (prio,datum) entries in priority order"""
+        return self._queue.toArray()
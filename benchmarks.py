@@ -0,0 +1,335 @@
+# timing comparisons for the ADT implementations
+# run as: python benchmarks.py [name ...]
+import sys
+import time
+import tracemalloc
+import threading
+import numpy as np
+from dynamicarray import DynamicArray
+from chunkedarray import ChunkedArray
+from hashmap import HashMap
+from inthashmap import IntHashMap
+from concurrenthashmap import ConcurrentHashMap
+from heapprioqueue import HeapPrioQueue
+from arrayheapprioqueue import ArrayHeapPrioQueue
+from blockingprioqueue import BlockingPrioQueue
+from indexedheapprioqueue import IndexedHeapPrioQueue
+from timerwheel import TimerWheel
+
+def timeit(fxn, *args):
+    """
+    Time a single call
+    Parameters
+    - fxn - function to call
+    - args - arguments passed to fxn
+    Returns
+    - elapsed wall-clock seconds
+    """
+    t0 = time.perf_counter()
+    fxn(*args)
+    return time.perf_counter() - t0
+
+def report(label, n, seconds):
+    """Print a line with the per-operation cost of a timed run"""
+    print('{:40s} n={:>10d} {:8.3f}s {:10.1f} ns/op'.format(
+        label, n, seconds, 1e9 * seconds / max(n, 1)))
+
+def bench_hashmap_bulk(n = 200000):
+    """HashMap.putMany/getMany/containsMany vs a loop of single calls"""
+    keys = np.random.randint(0, 4 * n, size=n)
+    values = np.arange(n)
+
+    def loopPut(m):
+        for k, v in zip(keys.tolist(), values.tolist()):
+            m.put(k, v)
+
+    def loopGet(m):
+        for k in keys.tolist():
+            m.get(k)
+
+    def loopContains(m):
+        for k in keys.tolist():
+            m.containsKey(k)
+
+    m = HashMap()
+    report('HashMap.put loop', n, timeit(loopPut, m))
+    report('HashMap.get loop', n, timeit(loopGet, m))
+    report('HashMap.containsKey loop', n, timeit(loopContains, m))
+    m = HashMap()
+    report('HashMap.putMany', n, timeit(m.putMany, keys, values))
+    report('HashMap.getMany', n, timeit(m.getMany, keys))
+    report('HashMap.containsMany', n, timeit(m.containsMany, keys))
+
+def bytesPerEntry(build, n):
+    """
+    Measure the memory a map built by build(n) holds per entry
+    Parameters
+    - build - function returning a map of n entries
+    - n - number of entries
+    Returns
+    - bytes allocated by build and still live, divided by n
+    """
+    tracemalloc.start()
+    m = build(n)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del m
+    return used / n
+
+def bench_inthashmap(n = 10000000):
+    """IntHashMap vs HashMap: memory per entry and lookups/sec"""
+    keys = np.random.permutation(n).astype(np.int64) * 7919
+    values = np.arange(n, dtype=np.int64)
+    probe = np.random.choice(keys, size=min(n, 1000000))
+
+    def buildInt(k):
+        m = IntHashMap()
+        m.putMany(keys[:k], values[:k])
+        return m
+
+    def buildHash(k):
+        m = HashMap()
+        m.putMany(keys[:k], values[:k])
+        return m
+
+    sample = min(n, 1000000)
+    for label, build in (('IntHashMap', buildInt), ('HashMap', buildHash)):
+        print('{:40s} {:8.1f} bytes/entry'.format(
+            label, bytesPerEntry(build, sample)))
+        t0 = time.perf_counter()
+        m = build(n)
+        report(label + ' build', n, time.perf_counter() - t0)
+        report(label + ' getMany', len(probe),
+               timeit(m.getMany, probe))
+        lst = probe[:100000].tolist()
+        report(label + ' get loop', len(lst),
+               timeit(lambda: [m.get(k) for k in lst]))
+        del m
+
+def runThreads(nthreads, work):
+    """
+    Run work(t) in nthreads threads and return the elapsed seconds
+    """
+    threads = [threading.Thread(target=work, args=(t,))
+               for t in range(nthreads)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+def bench_concurrent(ops = 200000, threadCounts = (1, 2, 4, 8, 16)):
+    """ConcurrentHashMap vs a HashMap behind one lock, scaling threads"""
+    for nthreads in threadCounts:
+        per = ops // nthreads
+        keys = [np.random.randint(0, 100000, size=per).tolist()
+                for t in range(nthreads)]
+
+        glock = threading.Lock()
+        shared = HashMap()
+        def globalWork(t):
+            for k in keys[t]:
+                with glock:
+                    if shared.containsKey(k):
+                        shared.put(k, shared.get(k) + 1)
+                    else:
+                        shared.put(k, 1)
+
+        striped = ConcurrentHashMap()
+        def stripedWork(t):
+            for k in keys[t]:
+                striped.merge(k, 1, lambda old, new: old + new)
+
+        n = per * nthreads
+        report('HashMap + global lock, {} threads'.format(nthreads), n,
+               runThreads(nthreads, globalWork))
+        report('ConcurrentHashMap, {} threads'.format(nthreads), n,
+               runThreads(nthreads, stripedWork))
+
+def bench_prioqueue(sizes = (10**5, 10**6, 10**7), nodeLimit = 1000000):
+    """
+    ArrayHeapPrioQueue vs HeapPrioQueue insert/removeMin throughput
+    HeapPrioQueue keeps a Python object per entry, so it is only run up
+    to nodeLimit entries.  The default sizes keep the run to minutes;
+    pass larger ones, e.g. sizes=(10**8,), given several GB of memory
+    """
+    for n in sizes:
+        prios = np.random.random(n).tolist()
+        classes = [ArrayHeapPrioQueue]
+        if n <= nodeLimit:
+            classes.append(HeapPrioQueue)
+        for cls in classes:
+            pq = cls()
+            def fill():
+                for j, p in enumerate(prios):
+                    pq.insert(p, j)
+            def drain():
+                while not pq.isEmpty():
+                    pq.removeMin()
+            report(cls.__name__ + ' insert', n, timeit(fill))
+            report(cls.__name__ + ' removeMin', n, timeit(drain))
+            del pq
+
+def bench_arity(n = 200000, arities = (2, 3, 4, 8, 16)):
+    """
+    HeapPrioQueue arity matrix: time per operation for an insert-heavy
+    mix (3 inserts per removeMin) and a removeMin-heavy mix (fill, then
+    drain), one row per arity
+    """
+    prios = np.random.random(n).tolist()
+    for d in arities:
+        pq = HeapPrioQueue(capacity=n + 1, arity=d)
+        def insertHeavy():
+            for j, p in enumerate(prios):
+                pq.insert(p, j)
+                if j % 3 == 2:
+                    pq.removeMin()
+        report('arity {} insert-heavy'.format(d), n, timeit(insertHeavy))
+        pq = HeapPrioQueue.fromArrays(prios, list(range(n)), arity=d)
+        def removeHeavy():
+            while not pq.isEmpty():
+                pq.removeMin()
+        report('arity {} removeMin-heavy'.format(d), n, timeit(removeHeavy))
+
+def bench_blocking(n = 240000, mixes = ((1, 1), (2, 2), (4, 4), (4, 1),
+                                       (1, 4)),
+                   maxsize = 1024, batch = 64):
+    """
+    BlockingPrioQueue multi-producer/multi-consumer throughput: each mix
+    of (producers, consumers) moves n entries through a bounded queue,
+    with consumers taking one entry per get or up to batch per drain
+    """
+    prios = np.random.random(n).tolist()
+    for producers, consumers in mixes:
+        for useDrain in (False, True):
+            pq = BlockingPrioQueue(maxsize=maxsize)
+            def work(t):
+                if t < producers:
+                    for j in range(t, n, producers):
+                        pq.put(prios[j], j)
+                    return
+                left = len(range(t - producers, n, consumers))
+                while left > 0:
+                    if useDrain:
+                        left -= len(pq.drain(min(batch, left)))
+                    else:
+                        pq.get()
+                        left -= 1
+            label = '{}P/{}C {}'.format(producers, consumers,
+                                        'drain' if useDrain else 'get')
+            report(label, n, runThreads(producers + consumers, work))
+
+def bench_timers(n = 500000, cancelRates = (0.5, 0.9, 0.99),
+                 horizon = 100000):
+    """
+    TimerWheel vs heaps for timeouts, most of which are cancelled: n
+    timers with deadlines spread over horizon ticks, a fraction of them
+    cancelled, then the survivors fired in deadline order.  HeapPrioQueue
+    cannot cancel, so it marks cancelled timers and skips them when they
+    reach the top; IndexedHeapPrioQueue removes them in O(log n)
+    """
+    deadlines = (np.random.random(n) * horizon).tolist()
+    for rate in cancelRates:
+        cancel = (np.random.random(n) < rate).tolist()
+
+        def wheel():
+            w = TimerWheel()
+            handles = [w.insert(d, j) for j, d in enumerate(deadlines)]
+            for j, c in enumerate(cancel):
+                if c:
+                    w.cancel(handles[j])
+            while not w.isEmpty():
+                w.removeMin()
+
+        def indexed():
+            pq = IndexedHeapPrioQueue()
+            handles = [pq.insert(d, j) for j, d in enumerate(deadlines)]
+            for j, c in enumerate(cancel):
+                if c:
+                    pq.remove(handles[j])
+            while not pq.isEmpty():
+                pq.removeMin()
+
+        def lazy():
+            pq = HeapPrioQueue()
+            for j, d in enumerate(deadlines):
+                pq.insert(d, j)
+            dead = set(j for j, c in enumerate(cancel) if c)
+            fired = 0
+            while not pq.isEmpty():
+                if pq.removeMin()[1] not in dead:
+                    fired += 1
+
+        label = 'cancel {:.0%} '.format(rate)
+        report(label + 'TimerWheel', n, timeit(wheel))
+        report(label + 'IndexedHeapPrioQueue', n, timeit(indexed))
+        report(label + 'HeapPrioQueue, lazy', n, timeit(lazy))
+
+def bench_dynamicarray(n = 50000000, checkpoints = 6, chunk = 100000):
+    """
+    DynamicArray append cost as the list grows: time per add over each
+    tenfold stretch of sizes stays flat because growth is a block copy
+    doubling the array; then extend in chunks, and reserve up front
+    """
+    arr = DynamicArray()
+    lo = 0
+    for e in range(checkpoints):
+        hi = min(n, 10 ** (e + 2))
+        if hi <= lo:
+            break
+        def appendRange():
+            for i in range(lo, hi):
+                arr.add(i)
+        report('add {}..{}'.format(lo, hi), hi - lo, timeit(appendRange))
+        lo = hi
+    data = np.arange(chunk)
+    arr = DynamicArray()
+    def extendAll():
+        for i in range(n // chunk):
+            arr.extend(data)
+    report('extend, {} per call'.format(chunk), n, timeit(extendAll))
+    arr = DynamicArray()
+    def reserveThenExtend():
+        arr.reserve(n)
+        for i in range(n // chunk):
+            arr.extend(data)
+    report('reserve then extend', n, timeit(reserveThenExtend))
+
+def bench_chunked(n = 20000000):
+    """
+    Worst single add and mean add cost, DynamicArray vs ChunkedArray:
+    DynamicArray pauses to copy everything when it doubles, ChunkedArray
+    only ever allocates one chunk
+    """
+    for cls in (DynamicArray, ChunkedArray):
+        arr = cls()
+        worst = 0.0
+        clock = time.perf_counter
+        t0 = clock()
+        for i in range(n):
+            t = clock()
+            arr.add(i)
+            worst = max(worst, clock() - t)
+        report(cls.__name__ + ' add', n, clock() - t0)
+        print('{:40s} worst add {:8.3f} ms'.format(cls.__name__,
+                                                   1e3 * worst))
+        del arr
+
+BENCHMARKS = {
+    'hashmap_bulk': bench_hashmap_bulk,
+    'inthashmap': bench_inthashmap,
+    'concurrent': bench_concurrent,
+    'prioqueue': bench_prioqueue,
+    'arity': bench_arity,
+    'blocking': bench_blocking,
+    'timers': bench_timers,
+    'dynamicarray': bench_dynamicarray,
+    'chunked': bench_chunked,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print('== {}'.format(name))
+        BENCHMARKS[name]()
@@ -0,0 +1,226 @@
+# thread-safe blocking priority queue built on HeapPrioQueue
+from prioqueueABC import PrioQueueABC
+from heapprioqueue import HeapPrioQueue
+import threading
+import ADTiterator as it
+from ADTexceptions import *
+
+class BlockingPrioQueue(PrioQueueABC):
+    """
+    Thread-safe Priority Queue for producer/consumer pools
+    A HeapPrioQueue guarded by one lock, with two condition variables in
+    the style of queue.Queue: consumers wait in get or drain while the
+    queue is empty, and, if maxsize > 0, producers wait in put while it is
+    full.  Ordering is that of HeapPrioQueue, including FIFO order among
+    equal priorities.  The PrioQueueABC methods never wait: insert raises
+    FullError and min/removeMin raise EmptyError instead.
+    Attributes
+    - _dtype (a class) - type of data values associated with priorities
+    - _maxsize (int) - maximum number of entries, 0 for unbounded
+    - _queue (HeapPrioQueue) - the entries
+    - _lock (threading.Lock) - guards _queue
+    - _notEmpty (threading.Condition) - signalled when entries are added
+    - _notFull (threading.Condition) - signalled when entries are removed
+    """
+
+    def __init__(self, maxsize = 0, dtype = type(int()),
+                 capacity = HeapPrioQueue.DEFAULT_CAPACITY,
+                 arity = HeapPrioQueue.DEFAULT_ARITY):
+        """
+        Construct blocking priority queue ADT
+        Parameters
+        - maxsize (int) - maximum number of entries; 0 (the default) for
+        no limit, so that put never waits
+        - dtype (class) - element type in the queue, default type(int())
+        - capacity (int) - initial capacity of the min-heap
+        - arity (int) - children per heap node, see HeapPrioQueue
+        Effects
+        - empty prio queue object ready to act like one
+        Raises
+        - MemoryError if allocation of the min-heap fails
+        """
+        self._queue = HeapPrioQueue(capacity=capacity, dtype=dtype,
+                                    arity=arity)
+        self._dtype = self._queue._dtype
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._notEmpty = threading.Condition(self._lock)
+        self._notFull = threading.Condition(self._lock)
+
+    def __str__(self):
+        """Document metadata about the PrioQueue"""
+        with self._lock:
+            return 'BlockingPrioQueue - maxsize:{}, size:{}, dtype:{}'.format(
+                self._maxsize, self._queue.size(), self._dtype)
+
+    def _full_(self):
+        """Indicate if a put must wait; caller holds _lock"""
+        return 0 < self._maxsize <= self._queue._last
+
+    def clear(self):
+        """
+        Empty the PrioQueue
+        Effects
+        - after return, isEmpty() invoked on the PrioQueue returns True
+        - producers waiting for room are woken
+        """
+        with self._lock:
+            self._queue.clear()
+            self._notFull.notify_all()
+
+    def put(self, prio, datum, block = True, timeout = None):
+        """
+        Insert (prio, datum), waiting for room if the queue is full
+        Parameters
+        - prio - priority for this entry
+        - datum - datum associated with this priority in this entry
+        - block - if False, never wait
+        - timeout - if block, the longest wait in seconds; None for no
+        limit
+        Effects
+        - (prio,datum) is inserted and one waiting consumer is woken
+        Raises
+        - FullError if there is still no room when the wait ends
+        - TypeError if type(datum) is different from _dtype; the datum is
+        checked before waiting
+        - MemoryError if the min-heap cannot grow
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'BlockingPrioQueue.put - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        with self._notFull:
+            if self._full_():
+                if not block or not self._notFull.wait_for(
+                        lambda: not self._full_(), timeout):
+                    raise FullError('BlockingPrioQueue.put - queue is full')
+            try:
+                self._queue.insert(prio, datum)
+            except:
+                # pass on the wakeup this producer may have consumed, so
+                # the free slot is not lost
+                self._notFull.notify()
+                raise
+            self._notEmpty.notify()
+
+    def get(self, block = True, timeout = None):
+        """
+        Remove and return (prio,datum) for the highest priority entry,
+        waiting for one if the queue is empty
+        Parameters
+        - block - if False, never wait
+        - timeout - if block, the longest wait in seconds; None for no
+        limit
+        Returns
+        - (prio,datum) for the highest priority entry
+        Effects
+        - one fewer entries; one waiting producer is woken
+        Raises
+        - EmptyError if the queue is still empty when the wait ends
+        """
+        with self._notEmpty:
+            if self._queue._last == 0:
+                if not block or not self._notEmpty.wait_for(
+                        lambda: self._queue._last > 0, timeout):
+                    raise EmptyError('BlockingPrioQueue.get - queue is empty')
+            ans = self._queue.removeMin()
+            self._notFull.notify()
+            return ans
+
+    def drain(self, k, block = True, timeout = None):
+        """
+        Remove and return up to k of the highest priority entries at once,
+        waiting only until at least one is available
+        Parameters
+        - k - the most entries to return, >= 1
+        - block - if False, never wait
+        - timeout - if block, the longest wait in seconds; None for no
+        limit
+        Returns
+        - numpy 1D array of (prio,datum) tuples in priority order, with
+        between 1 and k entries
+        Effects
+        - that many fewer entries; waiting producers are woken
+        Raises
+        - EmptyError if the queue is still empty when the wait ends
+        """
+        with self._notEmpty:
+            if self._queue._last == 0:
+                if not block or not self._notEmpty.wait_for(
+                        lambda: self._queue._last > 0, timeout):
+                    raise EmptyError(
+                        'BlockingPrioQueue.drain - queue is empty')
+            ans = self._queue.removeMinMany(k)
+            self._notFull.notify(len(ans))
+            return ans
+
+    def insert(self, prio, datum):
+        """
+        Insert (prio, datum) without waiting; see put
+        Raises
+        - FullError if the queue is full
+        - TypeError if type(datum) is different from _dtype
+        """
+        self.put(prio, datum, block=False)
+
+    def min(self):
+        """
+        Return (prio,datum) for the highest priority entry in the PrioQueue
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        with self._lock:
+            if self._queue._last == 0:
+                raise EmptyError('BlockingPrioQueue.min - queue is empty')
+            return self._queue.min()
+
+    def removeMin(self):
+        """
+        Remove and return (prio,datum) for the highest priority entry
+        without waiting; see get
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        return self.get(block=False)
+
+    def isEmpty(self):
+        """
+        Indicate if the PrioQueue is empty
+        Returns
+        - True if the PrioQueue has no elements
+        - False otherwise
+        """
+        with self._lock:
+            return self._queue._last == 0
+
+    def size(self):
+        """
+        Return the number of elements in the PrioQueue
+        Returns
+        - the number of elements in the PrioQueue, >= 0
+        """
+        with self._lock:
+            return self._queue._last
+
+    def toArray(self):
+        """
+        Return a snapshot of the (prio,datum) entries in priority order
+        Returns
+        - numpy 1D array of (prio,datum) tuples
+        """
+        with self._lock:
+            return self._queue.toArray()
+
+    def itCreate(self):
+        """
+        returns iterator over a snapshot of the (prio,datum) elements, in
+        priority order, so other threads may keep using the queue
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of array fails
+        """
+        x = self.toArray()
+        return it.Iterator(len(x), x)
@@ -0,0 +1,448 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+from hashmap import HashMap
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class CacheMap(MapABC):
+    """
+    Bounded Map ADT that evicts entries once full, for use as a cache
+    Keys are located through a HashMap built with the caller's hashfxn;
+    the entries themselves live in fixed arrays of maxSize slots, linked
+    into circular doubly-linked lists through _prev/_next.
+    Eviction policies
+    - 'lru' - evict the least recently used entry
+    - 'lfu' - evict the least frequently used entry, least recently used
+    among equals
+    - 'clock' - second-chance approximation of LRU
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _maxSize (int) - maximum number of entries
+    - _size (int) - number of entries in the Map
+    - _policy (str) - one of POLICIES
+    - _onEvict (function) - called as onEvict(key, value) after an entry
+    is evicted, or None
+    - _index (HashMap) - maps each key to its slot
+    - _keys (numpy 1D object array) - key in each slot
+    - _values (numpy 1D array of _dtype) - value in each slot
+    - _prev, _next (numpy 1D int64 arrays) - list links for each slot
+    - _head (int) - head slot of the LRU list, -1 if empty
+    - _freq (numpy 1D int64 array) - use count of each slot (lfu)
+    - _freqHead (dict) - use count -> head slot of that count's list (lfu)
+    - _minFreq (int) - smallest use count with a non-empty list (lfu)
+    - _ref (numpy 1D bool array) - referenced bit of each slot (clock)
+    - _hand (int) - next slot the clock hand examines (clock)
+    - _free (list) - slots released by remove
+    - _hits, _misses, _evictions (int) - counters reported by stats()
+    """
+    DEFAULT_MAX_SIZE = 1024
+    POLICIES = ('lru', 'lfu', 'clock')
+
+    def __init__(self, maxSize = DEFAULT_MAX_SIZE, hashfxn = hash,
+                 dtype = type(int()), policy = 'lru', onEvict = None):
+        """
+        Constructor for bounded cache Map
+        Parameters
+        - maxSize: maximum number of entries, default DEFAULT_MAX_SIZE
+        - hashfxn: function that hashes key to yield an int
+        - dtype: type of data in the map, default type(int())
+        - policy: eviction policy, one of POLICIES, default 'lru'
+        - onEvict: function called as onEvict(key, value) for each evicted
+        entry, default None
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - ValueError if maxSize < 1 or policy is not one of POLICIES
+        - MemoryError if allocation of the slot arrays fails
+        """
+        if maxSize < 1:
+            raise ValueError('CacheMap - maxSize must be >= 1')
+        if policy not in CacheMap.POLICIES:
+            raise ValueError('CacheMap - unknown policy {}'.format(policy))
+        self._dtype = typemap(dtype)
+        self._maxSize = maxSize
+        self._policy = policy
+        self._onEvict = onEvict
+        self._index = HashMap(hashfxn=hashfxn, dtype=type(int()),
+                              capacity=min(maxSize, HashMap.MAX_CAPACITY))
+        try:
+            self._keys = np.full(maxSize, None, dtype=object)
+            self._values = np.empty(maxSize, dtype=self._dtype)
+            self._prev = np.full(maxSize, -1, dtype=np.int64)
+            self._next = np.full(maxSize, -1, dtype=np.int64)
+            self._freq = np.zeros(maxSize, dtype=np.int64)
+            self._ref = np.zeros(maxSize, dtype=bool)
+        except:
+            raise MemoryError('CacheMap - unable to allocate slot arrays')
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._reset_()
+
+    def _reset_(self):
+        """Forget all entries, keeping the counters"""
+        self._size = 0
+        self._head = -1
+        self._freqHead = {}
+        self._minFreq = 0
+        self._hand = 0
+        self._free = []
+        self._keys[:] = None
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'CacheMap - maxSize: {}, size:{}, policy:{}, dtype:{}'.format(
+            self._maxSize, self._size, self._policy, self._dtype)
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, isEmpty() invoked on the map returns True
+        - the hit/miss/eviction counters are not reset
+        """
+        self._index.clear()
+        self._reset_()
+
+    def stats(self):
+        """
+        Return the cache counters
+        Returns
+        - dict with the number of 'hits', 'misses' and 'evictions'
+        """
+        return {'hits': self._hits, 'misses': self._misses,
+                'evictions': self._evictions}
+
+    def _link_(self, head, i):
+        """
+        Insert slot i at the front of the circular list starting at head
+        Returns
+        - the new head of the list, i
+        """
+        if head < 0:
+            self._prev[i] = i
+            self._next[i] = i
+        else:
+            tail = self._prev[head]
+            self._prev[i] = tail
+            self._next[i] = head
+            self._next[tail] = i
+            self._prev[head] = i
+        return i
+
+    def _unlink_(self, head, i):
+        """
+        Remove slot i from the circular list starting at head
+        Returns
+        - the new head of the list, -1 if the list is now empty
+        """
+        nxt = self._next[i]
+        if nxt == i:
+            return -1
+        prv = self._prev[i]
+        self._next[prv] = nxt
+        self._prev[nxt] = prv
+        if head == i:
+            head = int(nxt)
+        return head
+
+    def _unlinkFreq_(self, i):
+        """Remove slot i from the list for its use count (lfu)"""
+        f = int(self._freq[i])
+        head = self._unlink_(self._freqHead[f], i)
+        if head < 0:
+            del self._freqHead[f]
+        else:
+            self._freqHead[f] = head
+
+    def _linkFreq_(self, i, f):
+        """Set the use count of slot i to f and link it into that list"""
+        self._freq[i] = f
+        self._freqHead[f] = self._link_(self._freqHead.get(f, -1), i)
+
+    def _touch_(self, i):
+        """
+        Record a use of the entry in slot i
+        Effects
+        - lru: slot moves to the front of the list
+        - lfu: slot moves to the list for its use count + 1
+        - clock: slot's referenced bit is set
+        """
+        if self._policy == 'lru':
+            self._head = self._link_(self._unlink_(self._head, i), i)
+        elif self._policy == 'lfu':
+            f = int(self._freq[i])
+            self._unlinkFreq_(i)
+            if self._minFreq == f and f not in self._freqHead:
+                self._minFreq = f + 1
+            self._linkFreq_(i, f + 1)
+        else:
+            self._ref[i] = True
+
+    def _victim_(self):
+        """
+        Choose the slot to evict; the cache is full, so all slots are live
+        Returns
+        - slot index of the entry to evict
+        """
+        if self._policy == 'lru':
+            return int(self._prev[self._head])
+        elif self._policy == 'lfu':
+            if self._minFreq not in self._freqHead:
+                self._minFreq = min(self._freqHead)
+            return int(self._prev[self._freqHead[self._minFreq]])
+        else:
+            while self._ref[self._hand]:
+                self._ref[self._hand] = False
+                self._hand = (self._hand + 1) % self._maxSize
+            i = self._hand
+            self._hand = (self._hand + 1) % self._maxSize
+            return i
+
+    def _release_(self, i):
+        """
+        Unlink the entry in slot i from the map and free the slot
+        Returns
+        - (key, value) of the released entry
+        """
+        key = self._keys[i]
+        value = self._values[i]
+        if self._policy == 'lru':
+            self._head = self._unlink_(self._head, i)
+        elif self._policy == 'lfu':
+            self._unlinkFreq_(i)
+        self._index.remove(key)
+        self._keys[i] = None
+        self._size -= 1
+        return (key, value)
+
+    def _slot_(self, key):
+        """
+        Return the slot holding key, or -1 if key is not in the map
+        """
+        try:
+            return self._index.get(key)
+        except KeyError:
+            return -1
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map
+        Does not count as a use of the entry, nor as a hit or miss
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - True if an entry with key is in the Map
+        - False otherwise
+        """
+        return self._index.containsKey(key)
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - value associated with key
+        Effects
+        - counts a hit and a use of the entry, or a miss
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        i = self._slot_(key)
+        if i < 0:
+            self._misses += 1
+            raise KeyError('CacheMap.get - invalid key')
+        self._hits += 1
+        self._touch_(i)
+        return self._values[i]
+
+    def _insertNewEntry_(self, key, value):
+        """
+        Insert a new entry, evicting one first if the cache is full
+        Parameters
+        - key - key associated with entry
+        - value - value associated with key
+        Effects
+        - entry for (key, value) added to map
+        - if the map was full, an entry was evicted and onEvict called
+        - This code assumes the caller has guaranteed that an entry with
+        key does not already exist in the map
+        """
+        evicted = None
+        if self._free:
+            i = self._free.pop()
+        elif self._size < self._maxSize:
+            i = self._size
+        else:
+            i = self._victim_()
+            evicted = self._release_(i)
+            self._evictions += 1
+        self._keys[i] = key
+        self._values[i] = value
+        self._index.put(key, i)
+        self._size += 1
+        if self._policy == 'lru':
+            self._head = self._link_(self._head, i)
+        elif self._policy == 'lfu':
+            self._linkFreq_(i, 1)
+            self._minFreq = 1
+        else:
+            self._ref[i] = False
+        if evicted is not None and self._onEvict is not None:
+            self._onEvict(*evicted)
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - if containsKey(key) is True, the value associated with it will be
+        replaced by the value parameter, and this counts as a use
+        - if not, (key,value) will be added to the map, evicting an entry
+        chosen by the policy if the map was full
+        Raises
+        - TypeError if type(value) is not equal to _dtype
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'CacheMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        i = self._slot_(key)
+        if i >= 0:
+            self._values[i] = value
+            self._touch_(i)
+        else:
+            self._insertNewEntry_(key, value)
+
+    def putUnique(self, key, value):
+        """
+        Store (key,value) into the map iff key not already in map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - (key,value) will be added to the map, evicting an entry chosen
+        by the policy if the map was full
+        Raises
+        - KeyError if there is already an entry using key
+        - TypeError if type(value) is not equal to _dtype
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'CacheMap.putUnique - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        if self._index.containsKey(key):
+            raise KeyError('CacheMap.putUnique - key already exists')
+        self._insertNewEntry_(key, value)
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key
+        Removal is not an eviction; onEvict is not called
+        Parameters
+        - key - the key in which we are interested
+        Effects
+        - entry associated with key removed from the map
+        - there is one fewer entry in the map
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        i = self._slot_(key)
+        if i < 0:
+            raise KeyError('CacheMap.remove - key does not exist')
+        self._release_(i)
+        self._free.append(i)
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if the map has no entries
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the number of entries in the map, >= 0
+        """
+        return self._size
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - an unordered numpy 1D array of keys in the map
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        return self._index.keyArray()
+
+    def _genArray_(self):
+        """
+        Return an unordered array of (key,value) tuples
+        Returns
+        - numpy 1D array of (key,value) tuples
+        Raises
+        - MemoryError if array allocation fails
+        """
+        n = self._size
+        try:
+            x = np.empty(n, dtype=type(tuple))
+        except:
+            raise MemoryError('CacheMap._genArray_ - unable to allocate array')
+        j = 0
+        for key, i in self._index:
+            x[j] = (key, self._values[i])
+            j += 1
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return in unordered iterator over the map entries
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of the array of entries fails
+        """
+        n = self._size
+        x = self._genArray_()
+        return it.Iterator(n, x)
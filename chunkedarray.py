@@ -0,0 +1,233 @@
+# list implemented as a directory of fixed-size numpy chunks
+from listABC import ListABC
+import numpy as np
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class ChunkedArray(ListABC):
+    """
+    Segmented version of the List ADT
+    Elements live in numpy chunks of _chunkSize cells, a power of 2, found
+    through a directory list; element i is at
+    _chunks[i >> _chunkBits][i & _chunkMask].  Growing allocates one more
+    chunk and never moves existing elements, so add is O(1) in the worst
+    case (apart from the directory, a list of one pointer per chunk), no
+    reallocation ever needs twice the memory, and get/set are O(1).
+    toArray concatenates the chunks on demand; chunks() walks them
+    without copying.
+    Attributes
+    - _dtype - data type of array elements, default is type(int())
+    - _chunkBits (int) - log2 of the chunk size
+    - _chunkSize (int) - number of cells in each chunk
+    - _chunkMask (int) - _chunkSize - 1
+    - _size (int) - number of elements in the list
+    - _chunks (list of numpy 1D arrays) - the chunk directory
+    """
+    DEFAULT_CHUNK = 65536
+
+    def __init__(self, chunkSize = DEFAULT_CHUNK, dtype = type(int())):
+        """
+        Construct segmented list
+        Parameters
+        - chunkSize (int) - cells per chunk, rounded up to a power of 2,
+        default DEFAULT_CHUNK
+        - dtype (a class) - type of elements in the list, default type(int())
+        Effects
+        - object instance ready to act like a list
+        Raises
+        - ValueError if chunkSize < 1
+        """
+        if chunkSize < 1:
+            raise ValueError(
+                'ChunkedArray - chunkSize {} < 1'.format(chunkSize))
+        self._dtype = typemap(dtype)
+        self._chunkBits = (chunkSize - 1).bit_length()
+        self._chunkSize = 1 << self._chunkBits
+        self._chunkMask = self._chunkSize - 1
+        self._size = 0
+        self._chunks = []
+
+    def __str__(self):
+        """Document metadata about the list object"""
+        return 'ChunkedArray - chunks: {} x {}, size: {}, dtype: {}'.format(
+            len(self._chunks), self._chunkSize, self._size, self._dtype)
+
+    def clear(self):
+        """
+        Empty the list
+        Effects
+        - after return, isEmpty() invoked on the list returns True
+        - all chunks are released
+        """
+        self._size = 0
+        self._chunks = []
+
+    def _newChunk_(self):
+        """
+        Append an empty chunk to the directory
+        Raises
+        - MemoryError if allocation of the chunk fails
+        """
+        try:
+            self._chunks.append(np.empty(self._chunkSize, dtype=self._dtype))
+        except:
+            raise MemoryError('ChunkedArray - unable to allocate chunk')
+
+    def add(self, datum):
+        """
+        Append datum to the list
+        Parameters
+        - datum - instance of the type specified when the list was created
+        Effects
+        - the list is larger by one element; a new chunk has been added
+        if upon entry the last chunk was full
+        Raises
+        - TypeError if the type of datum is not the same as _dtype
+        - MemoryError if allocation of a new chunk fails
+        """
+        if typemap(type(datum)) != self._dtype:
+            raise TypeError(
+                'ChunkedArray.add - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        offset = self._size & self._chunkMask
+        if offset == 0 and self._size >> self._chunkBits == len(self._chunks):
+            self._newChunk_()
+        self._chunks[self._size >> self._chunkBits][offset] = datum
+        self._size += 1
+
+    def extend(self, data):
+        """
+        Append every element of data to the list
+        Parameters
+        - data - numpy 1D array of _dtype, or an iterable of instances of
+        the type specified when the list was created
+        Effects
+        - the list is larger by len(data) elements, copied into the chunks
+        in blocks
+        Raises
+        - TypeError if the elements are not of type _dtype; in that case
+        the list is unchanged
+        - MemoryError if allocation of a new chunk fails
+        """
+        if isinstance(data, np.ndarray) and data.dtype != object:
+            if data.dtype != self._dtype:
+                raise TypeError(
+                    'ChunkedArray.extend - data.dtype {} != {}'.format(
+                        data.dtype, self._dtype))
+        else:
+            data = list(data)
+            for t in set(map(type, data)):
+                if typemap(t) != self._dtype:
+                    raise TypeError(
+                        'ChunkedArray.extend - type(datum) {} != {}'.format(
+                            t, self._dtype))
+        m = len(data)
+        j = 0
+        while j < m:
+            c = self._size >> self._chunkBits
+            offset = self._size & self._chunkMask
+            if c == len(self._chunks):
+                self._newChunk_()
+            k = min(m - j, self._chunkSize - offset)
+            self._chunks[c][offset:offset + k] = data[j:j + k]
+            self._size += k
+            j += k
+
+    def get(self, index):
+        """
+        Obtain value contained at index in the list
+        Parameters
+        - index - an index into the list, 0 <= index < _size
+        Returns
+        - the value at that index
+        Raises
+        - IndexError if index < 0 or index >= _size
+        """
+        if index < 0 or index >= self._size:
+            raise IndexError(
+                'ChunkedArray.get - illegal index {}'.format(index))
+        return self._chunks[index >> self._chunkBits][index & self._chunkMask]
+
+    def isEmpty(self):
+        """
+        Indicate if the list is empty
+        Returns
+        - True if the list has no elements
+        - False otherwise
+        """
+        return self._size == 0
+
+    def set(self, index, datum):
+        """
+        Store a new datum at a particular index
+        Parameters
+            - index - integer in the range [0,_size)
+            - datum - instance of the correct type
+        Effects
+            - datum now the value stored at index
+        Raises
+            - TypeError if type mismatch between datum and _dtype
+            - IndexError if index < 0 or index >= _size
+        """
+        if typemap(type(datum)) != self._dtype:
+            raise TypeError('ChunkedArray.set - type(datum) {} != {}'.format(
+                type(datum), self._dtype))
+        if index < 0 or index >= self._size:
+            raise IndexError('ChunkedArray.set - bad index {}'.format(index))
+        self._chunks[index >> self._chunkBits][index & self._chunkMask] = datum
+
+    def size(self):
+        """
+        Return the number of elements in the list
+        Returns
+        - the number of elements in the list, >= 0
+        """
+        return self._size
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by the chunks
+        """
+        return sum(chunk.nbytes for chunk in self._chunks)
+
+    def slack(self):
+        """
+        Return the number of bytes held by unused cells, all in the last
+        chunk
+        """
+        if not self._chunks:
+            return 0
+        return self.nbytes() - self._size * self._chunks[0].itemsize
+
+    def chunks(self):
+        """
+        Generator over the chunks in index order, each a numpy view of
+        its live cells; nothing is copied
+        """
+        n = self._size
+        for chunk in self._chunks:
+            if n <= 0:
+                break
+            yield chunk[0:min(n, self._chunkSize)]
+            n -= self._chunkSize
+
+    def toArray(self):
+        """
+        Return a new numpy 1D array of the elements, concatenating the
+        chunks
+        """
+        if self._size == 0:
+            return np.empty(0, dtype=self._dtype)
+        return np.concatenate(list(self.chunks()))
+
+    def itCreate(self):
+        """
+        Returns iterator over list elements in index order, walking the
+        chunks without copying them
+        Returns
+        - generator
+        """
+        for chunk in self.chunks():
+            yield from chunk
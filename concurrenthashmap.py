@@ -0,0 +1,322 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+from hashmap import HashMap
+import numpy as np
+import threading
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class ConcurrentHashMap(MapABC):
+    """
+    Thread-safe Map ADT built from lock-striped HashMap shards
+    Each key belongs to one shard, chosen from the high bits of a
+    Fibonacci-mixed hash so shards and buckets use different bits.  Every
+    operation holds only the lock of the shard it touches, so threads
+    working on different shards do not contend.  Single-key operations,
+    including the read-modify-write operations compute, computeIfAbsent
+    and merge, are atomic.  size, keyArray, toArray and iteration visit
+    the shards one at a time and are not a snapshot of the whole map.
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _hash (function) - applied to a key yields an integer
+    - _bits (int) - log2 of the number of shards
+    - _shards (list of HashMap) - the shards
+    - _locks (list of threading.RLock) - one lock per shard
+    """
+    DEFAULT_SHARDS = 16
+    _M64 = 0xFFFFFFFFFFFFFFFF
+    _GOLDEN = 0x9E3779B97F4A7C15
+
+    def __init__(self, hashfxn = hash, dtype = type(int()),
+                 capacity = HashMap.DEFAULT_CAPACITY,
+                 loadFactor = HashMap.DEFAULT_LOAD_FACTOR,
+                 shards = DEFAULT_SHARDS):
+        """
+        Constructor for concurrent Map
+        Parameters
+        - hashfxn: function that hashes key to yield an int
+        - dtype: type of data in the map, default type(int())
+        - capacity: initial number of buckets in each shard
+        - loadFactor: target load factor of each shard
+        - shards: number of shards, rounded up to a power of 2, default
+        DEFAULT_SHARDS
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - MemoryError if allocation of a shard fails
+        """
+        self._dtype = typemap(dtype)
+        self._hash = hashfxn
+        self._bits = 0
+        while (1 << self._bits) < shards:
+            self._bits += 1
+        n = 1 << self._bits
+        self._shards = [HashMap(hashfxn=hashfxn, dtype=dtype,
+                                capacity=capacity, loadFactor=loadFactor)
+                        for i in range(n)]
+        self._locks = [threading.RLock() for i in range(n)]
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'ConcurrentHashMap - shards: {}, size:{}, dtype:{}'.format(
+            len(self._shards), self.size(), self._dtype)
+
+    def _shardIndex_(self, key):
+        """
+        Return the index of the shard that owns key
+        """
+        if self._bits == 0:
+            return 0
+        h = (self._hash(key) * ConcurrentHashMap._GOLDEN) & \
+            ConcurrentHashMap._M64
+        return h >> (64 - self._bits)
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, each shard has been emptied under its lock
+        """
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - True if an entry with key is in the Map
+        - False otherwise
+        """
+        i = self._shardIndex_(key)
+        with self._locks[i]:
+            return self._shards[i].containsKey(key)
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - value associated with key
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        i = self._shardIndex_(key)
+        with self._locks[i]:
+            return self._shards[i].get(key)
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Raises
+        - TypeError if type(value) is not equal to _dtype
+        """
+        i = self._shardIndex_(key)
+        with self._locks[i]:
+            self._shards[i].put(key, value)
+
+    def putUnique(self, key, value):
+        """
+        Atomically store (key,value) into the map iff key not already in map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Raises
+        - KeyError if there is already an entry using key
+        - TypeError if type(value) is not equal to _dtype
+        """
+        i = self._shardIndex_(key)
+        with self._locks[i]:
+            self._shards[i].putUnique(key, value)
+
+    def remove(self, key):
+        """
+        Atomically remove the entry associated with key
+        Parameters
+        - key - the key in which we are interested
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        i = self._shardIndex_(key)
+        with self._locks[i]:
+            self._shards[i].remove(key)
+
+    def compute(self, key, fxn):
+        """
+        Atomically replace the entry for key with fxn(key, oldValue)
+        Parameters
+        - key - the key for this entry
+        - fxn - called as fxn(key, oldValue), with oldValue None if key is
+        not in the map, while the shard lock is held; it must not use
+        this map
+        Returns
+        - the new value, or None if the entry was removed
+        Effects
+        - if fxn returns None the entry for key, if any, is removed;
+        otherwise its result is stored for key
+        Raises
+        - TypeError if fxn returns a value whose type is not _dtype
+        """
+        i = self._shardIndex_(key)
+        shard = self._shards[i]
+        with self._locks[i]:
+            node = shard._findKey_(key)[1]
+            old = None if node is None else node._value
+            new = fxn(key, old)
+            if new is None:
+                if node is not None:
+                    shard.remove(key)
+            else:
+                shard.put(key, new)
+            return new
+
+    def computeIfAbsent(self, key, fxn):
+        """
+        Atomically store fxn(key) for key unless key is already in the map
+        Parameters
+        - key - the key for this entry
+        - fxn - called as fxn(key) while the shard lock is held, only if
+        key is not in the map; it must not use this map
+        Returns
+        - the value now associated with key
+        Raises
+        - TypeError if fxn returns a value whose type is not _dtype
+        """
+        i = self._shardIndex_(key)
+        shard = self._shards[i]
+        with self._locks[i]:
+            node = shard._findKey_(key)[1]
+            if node is not None:
+                return node._value
+            value = fxn(key)
+            shard.put(key, value)
+            return value
+
+    def merge(self, key, value, fxn):
+        """
+        Atomically combine value into the entry for key
+        Parameters
+        - key - the key for this entry
+        - value - value stored as-is if key is not in the map
+        - fxn - called as fxn(oldValue, value) while the shard lock is
+        held if key is in the map; it must not use this map
+        Returns
+        - the value now associated with key, or None if it was removed
+        Effects
+        - if fxn returns None the entry for key is removed
+        Raises
+        - TypeError if the stored value's type is not _dtype
+        """
+        i = self._shardIndex_(key)
+        shard = self._shards[i]
+        with self._locks[i]:
+            node = shard._findKey_(key)[1]
+            new = value if node is None else fxn(node._value, value)
+            if new is None:
+                shard.remove(key)
+            else:
+                shard.put(key, new)
+            return new
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if every shard was empty when visited
+        - False otherwise
+        """
+        return self.size() == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the sum of the shard sizes, each read under its lock
+        """
+        n = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                n += shard.size()
+        return n
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - an unordered numpy 1D array of keys, each shard's keys copied
+        under its lock
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        parts = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                parts.append(shard.keyArray())
+        try:
+            x = np.concatenate(parts)
+        except MemoryError:
+            raise MemoryError(
+                'ConcurrentHashMap.keyArray - unable to allocate array')
+        return x
+
+    def _genArray_(self):
+        """
+        Return an unordered array of (key,value) tuples
+        Raises
+        - MemoryError if array allocation fails
+        """
+        parts = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                parts.append(shard.toArray())
+        try:
+            x = np.concatenate(parts)
+        except MemoryError:
+            raise MemoryError(
+                'ConcurrentHashMap._genArray_ - unable to allocate array')
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return in unordered iterator over the map entries
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of the array of entries fails
+        """
+        x = self._genArray_()
+        return it.Iterator(len(x), x)
@@ -29,6 +29,9 @@ import numpy as np
 import ADTiterator as it
 from ADTexceptions import *
 from ADTtypemap import typemap
+from growthpolicy import DEFAULT_POLICY
+import weakref
+import warnings
 import pdb
 
 class DynamicArray(ListABC):
@@ -39,23 +42,37 @@ class DynamicArray(ListABC):
     - _dtype - data type of array elements, default is type(int())
     - _size (int) - number of elements in the list
     - _array - numpy 1D array, size _capacity, cells for _dtype elements
+    - _growth (GrowthPolicy) - decides the capacity when resizing
+    - _generation (int) - incremented whenever _array is reallocated
+    - _views (list of weakrefs) - views and memoryviews of _array handed
+    out by slicing, toArray, __array__ and toBuffer; on reallocation
+    they are made read-only (ndarrays) or released (memoryviews)
+    Views derived from those objects (a slice of a slice, a slice of
+    the memoryview) are not tracked and keep writing to the old array
+    after a reallocation; isCurrent, which compares against _array, is
+    the way to detect a stale view of either kind
     """
     DEFAULT_CAPACITY = 25
     
-    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int())):
+    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int()),
+                 growth = DEFAULT_POLICY):
         """
         Construct array-based list
         Parameters
         - capacity (int) - initial capacity for the list, default 25
         - dtype (a class) - type of elements in the list, default type(int())
+        - growth (GrowthPolicy) - resizing policy, default doubling
         Effects
         - object instance readdy to act like a list
         Raises
         - MemoryError - allocation of _array fails
         """
         self._dtype = typemap(dtype)
+        self._growth = growth
         self._capacity = capacity
         self._size = 0
+        self._generation = 0
+        self._views = []
         try:
             self._array = np.empty(self._capacity, dtype=self._dtype)
         except:
@@ -72,7 +89,22 @@ class DynamicArray(ListABC):
         Effects
         - after return, isEmpty() invoked on the list returns True
         """
+        self._modify_()
         self._size = 0
+        self._shrink_()
+
+    def _modify_(self):
+        """
+        Hook called by clear, add, extend and set once their arguments
+        have been validated, before the list changes; does nothing here
+        """
+        pass
+
+    def _shrink_(self):
+        """Shrink _array if the growth policy calls for it"""
+        new_capacity = self._growth.shrink(self._capacity, self._size)
+        if new_capacity:
+            self._resize_(new_capacity)
         
     def add(self, datum):
         """
@@ -80,8 +112,8 @@ class DynamicArray(ListABC):
         Parameters
         - datum - instance of the type specified when the list was created
         Effects
-        - the list is larger by one element; array has doubled in size if
-        upon entry the list was full
+        - the list is larger by one element; array has grown as the growth
+        policy decides if upon entry the list was full
         Raises
         - TypeError if the type of datum is not the same as _dtype
         - MemoryError if allocation of a larger array fails
@@ -92,19 +124,151 @@ class DynamicArray(ListABC):
                     type(datum), self._dtype
                 )
             )
+        self._modify_()
         if self._size >= self._capacity:
-            new_capacity = 2 * self._capacity
-            try:
-                new_array = np.empty(new_capacity, dtype=self._dtype)
-                for i in range(self._capacity):
-                    new_array[i] = self._array[i]
-                self._capacity = new_capacity
-                self._array = new_array
-            except:
-                raise MemoryError('DynamicArray.add - unable to grow array')
+            self._resize_(self._growth.grow(self._capacity, self._size + 1))
         self._array[self._size] = datum
         self._size += 1
 
+    def _resize_(self, new_capacity):
+        """
+        Reallocate _array with new_capacity cells, copying the elements in
+        one block
+        Raises
+        - MemoryError if allocation of the new array fails
+        """
+        try:
+            new_array = np.empty(new_capacity, dtype=self._dtype)
+        except:
+            raise MemoryError('DynamicArray - unable to resize array')
+        new_array[0:self._size] = self._array[0:self._size]
+        self._invalidate_()
+        self._capacity = new_capacity
+        self._array = new_array
+
+    def _invalidate_(self):
+        """
+        Retire the views handed out before _array is replaced
+        Effects
+        - _generation is incremented; exported ndarray views become
+        read-only and exported memoryviews are released
+        - a memoryview that still has buffer exports cannot be released;
+        it stays usable and a RuntimeWarning is issued
+        """
+        self._generation += 1
+        for ref in self._views:
+            view = ref()
+            if view is None:
+                continue
+            if isinstance(view, memoryview):
+                try:
+                    view.release()
+                except BufferError:
+                    warnings.warn(
+                        'DynamicArray - a memoryview from toBuffer is still'
+                        ' exported and refers to the old array',
+                        RuntimeWarning)
+            else:
+                view.flags.writeable = False
+        self._views = []
+
+    def _export_(self, view):
+        """
+        Record a view of _array handed out to the caller
+        Returns
+        - view
+        """
+        views = self._views
+        if len(views) >= 64 and len(views) & (len(views) - 1) == 0:
+            views[:] = [ref for ref in views if ref() is not None]
+        views.append(weakref.ref(view))
+        return view
+
+    def isCurrent(self, view):
+        """
+        Indicate whether a view from slicing, toArray, __array__ or
+        toBuffer still refers to the list's array
+        Returns
+        - False if the list has reallocated its array since view was made
+        """
+        if isinstance(view, memoryview):
+            try:
+                view = view.obj
+            except ValueError:
+                return False
+        return view is self._array or view.base is self._array
+
+    def reserve(self, n):
+        """
+        Make room for at least n elements without further reallocation
+        Parameters
+        - n (int) - number of elements to make room for
+        Effects
+        - _capacity >= n; the array is reallocated only if it was smaller
+        Raises
+        - MemoryError if allocation of a larger array fails
+        """
+        if n > self._capacity:
+            self._resize_(n)
+
+    def shrinkToFit(self):
+        """
+        Release unused capacity
+        Effects
+        - _capacity == max(_size, 1)
+        Raises
+        - MemoryError if allocation of the smaller array fails
+        """
+        n = max(self._size, 1)
+        if n != self._capacity:
+            self._resize_(n)
+
+    def extend(self, data):
+        """
+        Append every element of data to the list
+        Parameters
+        - data - numpy 1D array of _dtype, or an iterable of instances of
+        the type specified when the list was created
+        Effects
+        - the list is larger by len(data) elements, copied in one block;
+        the array is reallocated at most once, as the growth policy decides
+        Raises
+        - TypeError if the elements are not of type _dtype; in that case
+        the list is unchanged
+        - MemoryError if allocation of a larger array fails
+        """
+        if isinstance(data, np.ndarray) and data.dtype != object:
+            if data.dtype != self._dtype:
+                raise TypeError(
+                    'DynamicArray.extend - data.dtype {} != {}'.format(
+                        data.dtype, self._dtype))
+        else:
+            data = list(data)
+            for t in set(map(type, data)):
+                if typemap(t) != self._dtype:
+                    raise TypeError(
+                        'DynamicArray.extend - type(datum) {} != {}'.format(
+                            t, self._dtype))
+        self._modify_()
+        m = len(data)
+        n = self._size + m
+        if n > self._capacity:
+            self._resize_(self._growth.grow(self._capacity, n))
+        self._array[self._size:n] = data
+        self._size = n
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by _array
+        """
+        return self._array.nbytes
+
+    def slack(self):
+        """
+        Return the number of bytes held by unused cells of _array
+        """
+        return self._array.nbytes - self._size * self._array.itemsize
+
     def get(self, index):
         """
         Obtain value contained at index in the list250 APPENDIX A. GENERIC IMPLEMENTATIONS
@@ -148,6 +312,7 @@ class DynamicArray(ListABC):
             
         if index < 0 or index >= self._size:
             raise IndexError('DynamicArray.set - bad index {}'.format(index))
+        self._modify_()
         self._array[index] = datum
 
 
@@ -161,17 +326,78 @@ class DynamicArray(ListABC):
 
     def toArray(self):
         """
-        Returns [o,_size] slice of _array.
+        Returns [o,_size] slice of _array, a view that is made read-only
+        if the list reallocates
+        """
+        return self._export_(self._array[0:self._size])
+
+    def __getitem__(self, index):
+        """
+        Return the element at an integer index, as get does, or a numpy
+        view of the live region for a slice
+        Parameters
+        - index - an integer in the range [0,_size), or a slice, which is
+        interpreted as for a numpy array of _size elements
+        Returns
+        - the element, or a view sharing memory with the list; the view is
+        made read-only if the list reallocates (see isCurrent)
+        Raises
+        - IndexError if an integer index is out of range
+        """
+        if isinstance(index, slice):
+            return self._export_(self._array[0:self._size][index])
+        return self.get(index)
+
+    def __array__(self, dtype = None, copy = None):
+        """
+        Support np.asarray(list) without copying
+        Returns
+        - a view of the live region, or a copy if copy is True or dtype
+        differs from _dtype
+        Raises
+        - ValueError if copy is False and dtype differs from _dtype
         """
-        return self._array[0:self._size]
+        live = self._array[0:self._size]
+        if dtype is not None and np.dtype(dtype) != live.dtype:
+            if copy is False:
+                raise ValueError(
+                    'DynamicArray.__array__ - dtype {} needs a copy'.format(
+                        dtype))
+            return live.astype(dtype)
+        if copy:
+            return live.copy()
+        return self._export_(live)
+
+    def toBuffer(self):
+        """
+        Export the live region through the buffer protocol
+        Returns
+        - memoryview of the live region, released if the list reallocates;
+        slices taken from it are not released
+        """
+        view = memoryview(self._array[0:self._size])
+        return self._export_(view)
+
+    def __buffer__(self, flags):
+        """
+        Buffer protocol hook (Python 3.12 and later); see toBuffer
+        """
+        return self.toBuffer()
 
     def itCreate(self):
         """
-        Returns iterator over list elements in index order
+        Returns iterator over list elements in index order, reading
+        _array in place
         Returns
-        - Iterator instance
+        - generator
+        Raises
+        - RuntimeError if the list reallocates during iteration
         """
-        n = self._size
-        x = self._array[0:n].copy()
-        return it.Iterator(n, x)
+        generation = self._generation
+        array = self._array
+        for i in range(self._size):
+            if self._generation != generation:
+                raise RuntimeError(
+                    'DynamicArray - list reallocated during iteration')
+            yield array[i]
         
@@ -0,0 +1,147 @@
+# growth and shrink policies for the array-backed containers
+import math
+from abc import ABC, abstractmethod
+
+class GrowthPolicy(ABC):
+    """
+    Decides the capacity an array-backed container reallocates to
+    DynamicArray, ArrayStack, ArrayQueue and HeapPrioQueue (and the
+    classes built on them) take a policy when constructed and consult it
+    whenever they are full, and after removals.  Subclasses implement
+    _step_, the capacity to grow to from a full array; grow never returns
+    less than what is needed.  Shrinking is off unless shrinkBelow > 0:
+    once occupancy falls below shrinkBelow, the array is shrunk so that
+    occupancy is 2*shrinkBelow.  The gap between the two thresholds is the
+    hysteresis that keeps a container near a boundary from reallocating
+    on every operation.
+    Attributes
+    - _shrinkBelow (float) - occupancy below which to shrink, 0 for never
+    - _minCapacity (int) - capacity never shrunk below
+    """
+
+    def __init__(self, shrinkBelow = 0.0, minCapacity = 1):
+        """
+        Parameters
+        - shrinkBelow (float) - occupancy below which to shrink, in
+        [0, 0.5); the default 0 never shrinks
+        - minCapacity (int) - capacity never shrunk below, default 1
+        Raises
+        - ValueError if shrinkBelow is out of range or minCapacity < 1
+        """
+        if not 0 <= shrinkBelow < 0.5:
+            raise ValueError(
+                'GrowthPolicy - shrinkBelow {} not in [0, 0.5)'.format(
+                    shrinkBelow))
+        if minCapacity < 1:
+            raise ValueError(
+                'GrowthPolicy - minCapacity {} < 1'.format(minCapacity))
+        self._shrinkBelow = shrinkBelow
+        self._minCapacity = minCapacity
+
+    @abstractmethod
+    def _step_(self, capacity):
+        """
+        Derived class must return the capacity to grow to from a full
+        array of capacity cells
+        """
+        pass
+
+    def grow(self, capacity, needed):
+        """
+        Return the capacity to reallocate to
+        Parameters
+        - capacity (int) - current capacity
+        - needed (int) - number of cells required
+        Returns
+        - a capacity >= needed and > capacity
+        """
+        return max(needed, self._step_(capacity), capacity + 1)
+
+    def shrink(self, capacity, size):
+        """
+        Return the capacity to shrink to, or 0 to leave the array alone
+        Parameters
+        - capacity (int) - current capacity
+        - size (int) - number of cells in use
+        """
+        if size >= self._shrinkBelow * capacity:
+            return 0
+        target = max(self._minCapacity,
+                     math.ceil(size / (2 * self._shrinkBelow)))
+        return target if target < capacity else 0
+
+class GeometricGrowth(GrowthPolicy):
+    """
+    Grow by a constant factor, giving amortized O(1) appends; the default
+    policy, with factor 2
+    """
+
+    def __init__(self, factor = 2.0, shrinkBelow = 0.0, minCapacity = 1):
+        """
+        Parameters
+        - factor (float) - growth factor, > 1, default 2.0
+        - shrinkBelow, minCapacity - see GrowthPolicy
+        Raises
+        - ValueError if factor <= 1
+        """
+        if factor <= 1:
+            raise ValueError(
+                'GeometricGrowth - factor {} <= 1'.format(factor))
+        GrowthPolicy.__init__(self, shrinkBelow, minCapacity)
+        self._factor = factor
+
+    def _step_(self, capacity):
+        return int(capacity * self._factor)
+
+class ChunkGrowth(GrowthPolicy):
+    """
+    Grow by a fixed number of cells, so slack is bounded by chunk; appends
+    cost O(n / chunk) amortized, so chunk should be large
+    """
+
+    def __init__(self, chunk, shrinkBelow = 0.0, minCapacity = 1):
+        """
+        Parameters
+        - chunk (int) - cells added per growth, >= 1
+        - shrinkBelow, minCapacity - see GrowthPolicy
+        Raises
+        - ValueError if chunk < 1
+        """
+        if chunk < 1:
+            raise ValueError('ChunkGrowth - chunk {} < 1'.format(chunk))
+        GrowthPolicy.__init__(self, shrinkBelow, minCapacity)
+        self._chunk = chunk
+
+    def _step_(self, capacity):
+        return capacity + self._chunk
+
+class CappedGrowth(GrowthPolicy):
+    """
+    Grow geometrically until capacity reaches cap, then by cap at a
+    time, so slack never exceeds cap cells
+    """
+
+    def __init__(self, cap, factor = 2.0, shrinkBelow = 0.0,
+                 minCapacity = 1):
+        """
+        Parameters
+        - cap (int) - capacity at which growth turns linear, >= 1
+        - factor (float) - growth factor below cap, > 1, default 2.0
+        - shrinkBelow, minCapacity - see GrowthPolicy
+        Raises
+        - ValueError if cap < 1 or factor <= 1
+        """
+        if cap < 1:
+            raise ValueError('CappedGrowth - cap {} < 1'.format(cap))
+        if factor <= 1:
+            raise ValueError('CappedGrowth - factor {} <= 1'.format(factor))
+        GrowthPolicy.__init__(self, shrinkBelow, minCapacity)
+        self._cap = cap
+        self._factor = factor
+
+    def _step_(self, capacity):
+        if capacity < self._cap:
+            return min(int(capacity * self._factor), self._cap)
+        return capacity + self._cap
+
+DEFAULT_POLICY = GeometricGrowth()
@@ -25,7 +25,6 @@ POSSIBILITY OF SUCH DAMAGE.
 """
 from mapABC import MapABC
 import numpy as np
-import ADTiterator as it
 from ADTexceptions import *
 from ADTtypemap import typemap
 
@@ -37,29 +36,46 @@ class HashMap(MapABC):
     - _size (int) - number of entries in the Map
     - _hash (function) - applied to a key yields an integer
     - _capacity (int) - number of hash buckets
+    - _minCapacity (int) - the map never shrinks below this many buckets
     - _changes (int) - number of changes in entries since last resize check
     - _load (float) - current load (entries/buckets)
     - _loadFactor (float) - target load
     - _increment (float) - change in load with each put or remove
     - _buckets (numpy 1D array) - hash buckets
+    - _oldBuckets (numpy 1D array) - buckets being migrated into _buckets
+    during an incremental rehash, None otherwise
+    - _oldCapacity (int) - number of buckets in _oldBuckets
+    - _migrated (int) - buckets [0, _migrated) of _oldBuckets have been
+    moved into _buckets
+    - _modCount (int) - incremented whenever entries are added, removed
+    or moved between buckets; iterators use it to fail fast
+    - _iterating (int) - number of live iterators; while non-zero, get()
+    does not advance an incremental rehash
     """
     DEFAULT_CAPACITY = 16
     DEFAULT_LOAD_FACTOR = 0.75
     MAX_CAPACITY = 134217728
     TRIGGER = 100
+    REHASH_STEP = 8
+    NO_DEFAULT = object()
+    DEFAULT_CHUNK = 65536
     class Entry:
         """key/value object"""
-        def __init__(self, key, value):
+        def __init__(self, key, value, hashval = 0):
             """
             Constructor for entry
             Parameters
             - key - the key to be associated with this entry
             - value - the value to be associated with this key
+            - hashval - the hash of key, kept so rehashing need not
+            recompute it
             Effects
             - object instance ready to act like an Entry
             """
             self._key = key
             self._value = value
+            self._hash = hashval
+            self._next = None
             
     class Node:
         """Node for bucket linked lists"""
@@ -92,29 +108,44 @@ class HashMap(MapABC):
         self._dtype = typemap(dtype)
         self._size = 0
         self._hash = hashfxn
-        self._capacity = capacity
+        self._capacity = max(capacity, 1)
         if capacity > HashMap.MAX_CAPACITY:
             self._capacity = HashMap.MAX_CAPACITY
+        self._minCapacity = self._capacity
         self._changes = 0
         self._load = 0.0
         self._loadFactor = loadFactor
         if loadFactor < 0.001:
             self._loadFactor = HashMap.DEFAULT_LOAD_FACTOR
         self._increment = 1.0 / self._capacity
-        n = self._capacity
-        try:
-            x = np.empty(n, dtype=type(HashMap.Node))
-        except:
-            raise MemoryError('HashMap - unable to allocate bucket array')
-
-        for i in range(n):
-            x[i] = None
-        self._buckets = x
+        self._buckets = self._allocBuckets_(self._capacity)
+        self._oldBuckets = None
+        self._oldCapacity = 0
+        self._migrated = 0
+        self._modCount = 0
+        self._iterating = 0
         
     def __str__(self):
         """Document metadata about the map object"""
         return 'HashMap - buckets: {}, size:{}, dtype:{}'.format(
             self._capacity, self._size, self._dtype)
+
+    @staticmethod
+    def _allocBuckets_(n):
+        """
+        Allocate an array of n empty buckets
+        Parameters
+        - n - number of buckets
+        Returns
+        - numpy 1D object array of n None's
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        try:
+            x = np.full(n, None, dtype=object)
+        except:
+            raise MemoryError('HashMap - unable to allocate bucket array')
+        return x
     
     def clear(self):
         """
@@ -125,8 +156,111 @@ class HashMap(MapABC):
         self._size = 0
         self._load = 0.0
         self._changes = 0
-        for i in range(self._capacity):
-            self._buckets[i] = None
+        self._buckets[:] = None
+        self._oldBuckets = None
+        self._oldCapacity = 0
+        self._migrated = 0
+        self._modCount += 1
+
+    def _startRehash_(self, new_capacity):
+        """
+        Begin migrating the entries into a table of new_capacity buckets
+        Parameters
+        - new_capacity - number of buckets in the new table
+        Effects
+        - the current table becomes _oldBuckets; a new, empty table of
+        new_capacity buckets becomes _buckets
+        - entries are moved across REHASH_STEP old buckets at a time by
+        subsequent calls to _rehashStep_()
+        Assumptions
+        - no rehash is in progress
+        Raises
+        - MemoryError if allocation of the new table fails
+        """
+        new_buckets = self._allocBuckets_(new_capacity)
+        self._oldBuckets = self._buckets
+        self._oldCapacity = self._capacity
+        self._migrated = 0
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._increment = 1.0 / new_capacity
+        self._load = self._size * self._increment
+
+    def _rehashStep_(self, nbuckets = REHASH_STEP):
+        """
+        Move the entries of up to nbuckets old buckets into the new table
+        Parameters
+        - nbuckets - maximum number of old buckets to migrate
+        Effects
+        - when the last old bucket has been migrated, _oldBuckets is
+        released and the rehash is complete
+        """
+        old = self._oldBuckets
+        if old is None:
+            return
+        buckets = self._buckets
+        cap = self._capacity
+        self._modCount += 1
+        i = self._migrated
+        stop = min(i + nbuckets, self._oldCapacity)
+        while i < stop:
+            node = old[i]
+            old[i] = None
+            while node != None:
+                nxt = node._next
+                bi = node._hash % cap
+                node._next = buckets[bi]
+                buckets[bi] = node
+                node = nxt
+            i += 1
+        self._migrated = i
+        if i >= self._oldCapacity:
+            self._oldBuckets = None
+            self._oldCapacity = 0
+            self._migrated = 0
+
+    def _checkResize_(self):
+        """
+        Apply the growth policy after an entry was added or removed
+        Effects
+        - if the load exceeds _loadFactor, a rehash into twice as many
+        buckets (at most MAX_CAPACITY) is started
+        - every TRIGGER changes, if the load has fallen below a quarter
+        of _loadFactor, a rehash is started into just enough buckets (at
+        least _minCapacity) to bring the load back to half of _loadFactor
+        - nothing is decided while a rehash is in progress, so no single
+        call has to finish migrating the old table
+        """
+        if self._oldBuckets is not None:
+            return
+        if self._load > self._loadFactor:
+            if self._capacity < HashMap.MAX_CAPACITY:
+                self._startRehash_(
+                    min(2 * self._capacity, HashMap.MAX_CAPACITY))
+        elif self._changes >= HashMap.TRIGGER:
+            self._changes = 0
+            if (self._load < self._loadFactor / 4 and
+                self._capacity > self._minCapacity):
+                self._startRehash_(max(
+                    int(2 * self._size / self._loadFactor) + 1,
+                    self._minCapacity))
+
+    def _chains_(self, h):
+        """
+        Return the bucket chains in which an entry with hash h may live
+        Parameters
+        - h - the hash of a key
+        Returns
+        - list of (bucketArray, bucketIndex) pairs; during an incremental
+        rehash an unmigrated old bucket precedes the new bucket
+        """
+        chains = []
+        if self._oldBuckets is not None:
+            obi = h % self._oldCapacity
+            if obi >= self._migrated:
+                chains.append((self._oldBuckets, obi))
+        chains.append((self._buckets, h % self._capacity))
+        return chains
 
     def _findKey_(self, key):
         """
@@ -134,17 +268,25 @@ class HashMap(MapABC):
         Parameters
         - key - the key in which we are interested
         Returns
-        - (bucketIndex, Node)
-        + bucketIndex the index into _buckets to which the key hashes
-        + Node - the node in that bucket which matched key OR None
+        - (hashval, Entry)
+        + hashval - the hash of key
+        + Entry - the entry which matched key OR None
         """
-        bi = self._hash(key) % self._capacity
-        node = self._buckets[bi]
+        h = self._hash(key)
+        if self._oldBuckets is not None:
+            obi = h % self._oldCapacity
+            if obi >= self._migrated:
+                node = self._oldBuckets[obi]
+                while node != None:
+                    if MapABC._equal_(key, node._key):
+                        return (h, node)
+                    node = node._next
+        node = self._buckets[h % self._capacity]
         while node != None:
             if MapABC._equal_(key, node._key):
                 break
             node = node._next
-        return (bi, node)
+        return (h, node)
     
     def containsKey(self, key):
         """
@@ -167,21 +309,24 @@ class HashMap(MapABC):
         Raises
         - KeyError if containsKey(key) == False
         """
+        if not self._iterating:
+            self._rehashStep_()
         node = self._findKey_(key)[1]
         if node == None:
             raise KeyError('HashMap.get - invalid key')
         return node._value
     
-    def _insertNewEntry_(self, key, value, bi):
+    def _insertNewEntry_(self, key, value, h):
         """
         Insert a new entry into the map
         Parameters
         - key - key associated with entry
         - value - value associated with key
-        - bi - bucket index to which key hashes to
+        - h - the hash of key
         Effects
         - entry for (key, value) added to map
         - one more entry in the map
+        - a resize may have been started
         Raises
         - TypeError if type(value) not equal to _dtype
         - This code assumes the caller has guaranteed that an entry with
@@ -189,16 +334,19 @@ class HashMap(MapABC):
         """
         if type(value) != self._dtype:
             raise TypeError(
-                'HashMap.put - type(datum) {} != {}'.format(
-                    type(datum), self._dtype
+                'HashMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
                 )
             )
-        node = HashMap.Entry(key, value)
+        bi = h % self._capacity
+        node = HashMap.Entry(key, value, h)
         node._next = self._buckets[bi]
         self._buckets[bi] = node
         self._size += 1
         self._load += self._increment
         self._changes += 1
+        self._modCount += 1
+        self._checkResize_()
         
     def put(self, key, value):
         """
@@ -218,14 +366,15 @@ class HashMap(MapABC):
         if type(value) != self._dtype:
             raise TypeError(
                 'HashMap.put - type(value) {} != {}'.format(
-                    type(datum), self._dtype
+                    type(value), self._dtype
                 )
             )
-        bi, node = self._findKey_(key)
+        self._rehashStep_()
+        h, node = self._findKey_(key)
         if node != None:
             node._value = value
         else:
-            self._insertNewEntry_(key, value, bi)
+            self._insertNewEntry_(key, value, h)
 
     def putUnique(self, key, value):
         """
@@ -240,12 +389,197 @@ class HashMap(MapABC):
         - KeyError if there is already an entry using key
         - TypeError if type(value) is not equal to _dtype
         """
-        bi, node = self._findKey_(key)
+        self._rehashStep_()
+        h, node = self._findKey_(key)
         if node == None:
-            self._insertNewEntry_(key, value, bi)
+            self._insertNewEntry_(key, value, h)
         else:
             raise KeyError('HashMap,putUnique - key already exists')
         
+    def _hashMany_(self, keys):
+        """
+        Hash a batch of keys in one step
+        Parameters
+        - keys - numpy 1D array or sequence of keys
+        Returns
+        - (keys, hashes)
+        + keys - list of the keys as Python objects
+        + hashes - numpy 1D int64 array of key hashes
+        """
+        if isinstance(keys, np.ndarray):
+            keys = keys.tolist()
+        else:
+            keys = list(keys)
+        hashes = np.fromiter(map(self._hash, keys), dtype=np.int64,
+                             count=len(keys))
+        return (keys, hashes)
+
+    def _bucketMany_(self, hashes):
+        """
+        Select the buckets for a batch of hashes in one step
+        Parameters
+        - hashes - numpy 1D int64 array of key hashes
+        Returns
+        - (oldIndex, newIndex) lists
+        + oldIndex - the unmigrated old bucket for each hash, or -1 if the
+        key can only live in _buckets
+        + newIndex - the bucket in _buckets for each hash
+        """
+        newIndex = hashes % self._capacity
+        if self._oldBuckets is not None:
+            oldIndex = hashes % self._oldCapacity
+            oldIndex[oldIndex < self._migrated] = -1
+        else:
+            oldIndex = np.full(len(hashes), -1, dtype=np.int64)
+        return (oldIndex.tolist(), newIndex.tolist())
+
+    def _findMany_(self, keys):
+        """
+        Find the entries associated with a batch of keys
+        Parameters
+        - keys - numpy 1D array or sequence of keys
+        Returns
+        - list with the Entry for each key, or None if it is not in the map
+        """
+        keys, hashes = self._hashMany_(keys)
+        oldIndex, newIndex = self._bucketMany_(hashes)
+        old = self._oldBuckets
+        buckets = self._buckets
+        equal = MapABC._equal_
+        found = [None] * len(keys)
+        for j, (key, obi, bi) in enumerate(zip(keys, oldIndex, newIndex)):
+            node = None
+            if obi >= 0:
+                node = old[obi]
+                while node is not None:
+                    if equal(key, node._key):
+                        break
+                    node = node._next
+            if node is None:
+                node = buckets[bi]
+                while node is not None:
+                    if equal(key, node._key):
+                        break
+                    node = node._next
+            found[j] = node
+        return found
+
+    def putMany(self, keys, values):
+        """
+        Store a batch of (key,value) pairs into the map
+        Parameters
+        - keys - numpy 1D array or sequence of keys
+        - values - numpy 1D array or sequence of values, same length as keys
+        Effects
+        - equivalent to put(keys[i], values[i]) for each i in order, but
+        the buckets are grown at most once, up front, and hashing, bucket
+        selection and type validation each run over the whole batch
+        Raises
+        - ValueError if keys and values differ in length
+        - TypeError if the values are not all of type _dtype; in that case
+        the map is unchanged
+        - MemoryError if allocation of larger buckets fails
+        """
+        keys, hashes = self._hashMany_(keys)
+        if not isinstance(self._dtype, np.dtype):
+            values = list(values)
+            if any(type(v) != self._dtype for v in values):
+                raise TypeError(
+                    'HashMap.putMany - values must all be {}'.format(
+                        self._dtype))
+        else:
+            values = np.asarray(values)
+            if values.size and values.dtype != self._dtype:
+                raise TypeError(
+                    'HashMap.putMany - values.dtype {} != {}'.format(
+                        values.dtype, self._dtype))
+            values = values.tolist()
+        n = len(values)
+        if len(keys) != n:
+            raise ValueError('HashMap.putMany - len(keys) != len(values)')
+        new_capacity = self._capacity
+        while (self._size + n > self._loadFactor * new_capacity and
+               new_capacity < HashMap.MAX_CAPACITY):
+            new_capacity = min(2 * new_capacity, HashMap.MAX_CAPACITY)
+        if new_capacity != self._capacity:
+            # the batch is O(n) anyway, so it pays to finish a pending
+            # rehash before starting the next
+            self._rehashStep_(self._oldCapacity)
+            self._startRehash_(new_capacity)
+        self._rehashStep_(n * HashMap.REHASH_STEP)
+        oldIndex, newIndex = self._bucketMany_(hashes)
+        old = self._oldBuckets
+        buckets = self._buckets
+        equal = MapABC._equal_
+        added = 0
+        for key, value, h, obi, bi in zip(keys, values, hashes.tolist(),
+                                          oldIndex, newIndex):
+            node = None
+            if obi >= 0:
+                node = old[obi]
+                while node is not None:
+                    if equal(key, node._key):
+                        break
+                    node = node._next
+            if node is None:
+                node = buckets[bi]
+                while node is not None:
+                    if equal(key, node._key):
+                        break
+                    node = node._next
+            if node is not None:
+                node._value = value
+            else:
+                node = HashMap.Entry(key, value, h)
+                node._next = buckets[bi]
+                buckets[bi] = node
+                added += 1
+        self._size += added
+        self._load = self._size * self._increment
+        self._changes += added
+        self._modCount += added
+        self._checkResize_()
+
+    def getMany(self, keys, default = NO_DEFAULT):
+        """
+        Return the values associated with a batch of keys
+        Parameters
+        - keys - numpy 1D array or sequence of keys
+        - default - value returned for keys not in the map; it must be
+        storable in a numpy array of _dtype.  If omitted, a missing key
+        raises KeyError
+        Returns
+        - numpy 1D array of _dtype, the value for each key in order
+        Raises
+        - KeyError if a key is not in the map and no default was given
+        """
+        found = self._findMany_(keys)
+        out = [None] * len(found)
+        for j, node in enumerate(found):
+            if node is not None:
+                out[j] = node._value
+            elif default is HashMap.NO_DEFAULT:
+                raise KeyError('HashMap.getMany - invalid key')
+            else:
+                out[j] = default
+        try:
+            x = np.array(out, dtype=self._dtype)
+        except MemoryError:
+            raise MemoryError('HashMap.getMany - unable to allocate array')
+        return x
+
+    def containsMany(self, keys):
+        """
+        Indicate which of a batch of keys are resident in the map
+        Parameters
+        - keys - numpy 1D array or sequence of keys
+        Returns
+        - numpy 1D bool array, True where the key has an entry in the map
+        """
+        found = self._findMany_(keys)
+        return np.fromiter((node is not None for node in found), dtype=bool,
+                           count=len(found))
+
     def remove(self, key):
         """
         Remove the entry associated with key
@@ -254,25 +588,32 @@ class HashMap(MapABC):
         Effects
         - entry associated with key removed from the map
         - there is one fewer entry in the map
+        - a resize may have been started
         Raises
         - KeyError if containsKey(key) == False
         """
         
-        bi, node = self._findKey_(key)
+        self._rehashStep_()
+        h, node = self._findKey_(key)
         if node == None:
             raise KeyError('HashMap,remove - key does not exist')
-        p = None
-        q = self._buckets[bi]
-        while q != node:
-            p = q
-            q = p._next
-            if p == None:
-                self._buckets[bi] = q._next
-            else:
-                p._mext = q._next
+        for buckets, bi in self._chains_(h):
+            p = None
+            q = buckets[bi]
+            while q != None and q is not node:
+                p = q
+                q = q._next
+            if q != None:
+                break
+        if p is None:
+            buckets[bi] = q._next
+        else:
+            p._next = q._next
         self._size -= 1
         self._load -= self._increment
         self._changes += 1
+        self._modCount += 1
+        self._checkResize_()
         
     def isEmpty(self):
         """
@@ -290,6 +631,23 @@ class HashMap(MapABC):
         - the number of entries in the map, >= 0
         """
         return self._size
+
+    def _entries_(self):
+        """
+        Generator over every entry in the map, including entries still
+        waiting to be migrated by an incremental rehash
+        """
+        if self._oldBuckets is not None:
+            for i in range(self._migrated, self._oldCapacity):
+                node = self._oldBuckets[i]
+                while node != None:
+                    yield node
+                    node = node._next
+        for i in range(self._capacity):
+            node = self._buckets[i]
+            while node != None:
+                yield node
+                node = node._next
     
     def keyArray(self):
         """
@@ -305,17 +663,10 @@ class HashMap(MapABC):
             x = np.empty(n, dtype=object)
         except:
             raise MemoryError('HashMap.keyArray - unable to allocate array')
-        i = 0
         j = 0
-            
-        while i < self._capacity:
-            node = self._buckets[i]
-            
-            while node != None:
-                x[j] = node._key
-                j += 1
-                node = node._next
-            i += 1
+        for node in self._entries_():
+            x[j] = node._key
+            j += 1
         return x
 
     def _genArray_(self):
@@ -332,29 +683,121 @@ class HashMap(MapABC):
             x = np.empty(n, dtype=type(tuple))
         except:
             raise MemoryError('HashMap.__iter__ - unable to allocate array')
-        i = 0
         j = 0
-        while i < self._capacity:
-            node = self._buckets[i]
-            while node != None:
-                x[j] = (node._key, node._value)
-                j += 1
-                node = node._next
-                i += 1
+        for node in self._entries_():
+            x[j] = (node._key, node._value)
+            j += 1
         return x
     
     def toArray(self):
         return self._genArray_()
+
+    def _walk_(self):
+        """
+        Generator over the entries of the map, failing fast on change
+        Returns
+        - generator already advanced past its setup, so _modCount is
+        captured and _iterating counts it from the time of the call
+        Raises
+        - RuntimeError if entries are added, removed or moved between
+        buckets after the call
+        """
+        walk = self._walkFrom_()
+        next(walk)
+        return walk
+
+    def _walkFrom_(self):
+        """
+        Generator behind _walk_; its first next() only does the setup
+        """
+        expected = self._modCount
+        self._iterating += 1
+        try:
+            yield None
+            for node in self._entries_():
+                if self._modCount != expected:
+                    raise RuntimeError(
+                        'HashMap - map changed during iteration')
+                yield node
+        finally:
+            self._iterating -= 1
+
+    def keys(self):
+        """
+        Return a lazy generator over the keys in the map, unordered
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return (node._key for node in self._walk_())
+
+    def values(self):
+        """
+        Return a lazy generator over the values in the map, unordered
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return (node._value for node in self._walk_())
+
+    def items(self):
+        """
+        Return a lazy generator over the (key,value) tuples in the map,
+        unordered
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return ((node._key, node._value) for node in self._walk_())
+
+    def itemChunks(self, size = DEFAULT_CHUNK):
+        """
+        Generator over the entries of the map in blocks
+        Parameters
+        - size - number of entries per block; the last block may be shorter
+        Returns
+        - generator of (keys, values) pairs of numpy 1D arrays, keys of
+        dtype object and values of dtype _dtype
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return self._chunks_(self._walk_(), size)
+
+    def _chunks_(self, walk, size):
+        """
+        Generator behind itemChunks, blocking the entries from walk
+        """
+        keys = np.empty(size, dtype=object)
+        values = []
+        for node in walk:
+            keys[len(values)] = node._key
+            values.append(node._value)
+            if len(values) == size:
+                yield (keys, np.array(values, dtype=self._dtype))
+                keys = np.empty(size, dtype=object)
+                values = []
+        if values:
+            yield (keys[:len(values)], np.array(values, dtype=self._dtype))
+
+    def keyChunks(self, size = DEFAULT_CHUNK):
+        """
+        Generator over the keys of the map in numpy 1D object arrays of
+        size keys; the last block may be shorter
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return (keys for keys, values in self.itemChunks(size))
+
+    def valueChunks(self, size = DEFAULT_CHUNK):
+        """
+        Generator over the values of the map in numpy 1D arrays of _dtype
+        holding size values; the last block may be shorter
+        Raises
+        - RuntimeError if the map changes after the call
+        """
+        return (values for keys, values in self.itemChunks(size))
     
     def itCreate(self):
         """
         Return in unordered iterator over the map entries
         Returns
-        - Iterator instance
-        Raises
-        - MemoryError if allocation of the array of entries fails
+        - lazy generator over (key,value) tuples, see items()
         """
-
-        n = self._size
-        x = self._genArray_()
-        return it.Iterator(n, x)
+        return self.items()
@@ -1,10 +1,11 @@
 # priority queue implemented using a min-heap
 from prioqueueABC import PrioQueueABC
 import numpy as np
-import ADTiterator as it
 from ADTexceptions import *
 from ADTtypemap import typemap
+from growthpolicy import DEFAULT_POLICY
 import copy
+import heapq
 
 class HeapPrioQueue(PrioQueueABC):
     """
@@ -16,8 +17,14 @@ class HeapPrioQueue(PrioQueueABC):
     - _last (int) - the last occupied index in the min-heap array
     - _sequenceNo (int) - the next sequence number to assign to an entry
     - _array (numpy 1D array) - an array of Nodes managed as a min-heap
+    - _arity (int) - children per heap node, default 2; with the root at
+    index 1, node i has children _arity*(i-1)+2 .. _arity*i+1
+    - _growth (GrowthPolicy) - decides the capacity when resizing
+    - _modCount (int) - incremented by every insertion or removal;
+    iterators use it to fail fast
     """
     DEFAULT_CAPACITY = 25
+    DEFAULT_ARITY = 2
     
     class Node:
         """Nodes in the min-heap"""
@@ -39,8 +46,8 @@ class HeapPrioQueue(PrioQueueABC):
     def duplicatePrioQueue(cls, prioQueue):
         """
         Duplicate an existing PrioQueue
-        Used by __iter__ to guarantee the correct ordering of (prio,datum)
-        tuples (by priority)
+        No longer used by __iter__, which walks the heap in place; see
+        orderedItems()
         Parameters
         - prioQueue - the existing priority queue
         Returns
@@ -49,24 +56,34 @@ class HeapPrioQueue(PrioQueueABC):
         newq = copy.deepcopy(prioQueue)
         return newq
 
-    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int())):
+    def __init__(self, capacity = DEFAULT_CAPACITY, dtype = type(int()),
+                 arity = DEFAULT_ARITY, growth = DEFAULT_POLICY):
         """
         Construct heap-based priority queue ADT
         Parameters
         - capacity (int) - initial capacity for the min-heap, default of 25
         - dtype (class) - element type in the min-heap, default type(int())
+        - arity (int) - children per heap node, default 2; a wider heap is
+        shallower, so insert does fewer comparisons and removeMin more
+        - growth (GrowthPolicy) - resizing policy, default doubling
         Effects
         - empty prio queue object ready to act line one
         Raises
+        - ValueError if arity < 2
         - Memory Error if allocation of _array fails
         while all of the other ADT implementation classes delegate setting
         _dtype to the abstract base class, cannot do this here because of the
         shallow copy class method above; thus, directly set _dtype here
         """
+        if arity < 2:
+            raise ValueError('HeapPrioQueue - arity {} < 2'.format(arity))
         self._dtype = typemap(dtype)
+        self._arity = arity
+        self._growth = growth
         self._capacity = capacity
         self._last = 0
         self._sequenceNo = 1
+        self._modCount = 0
         try:
             theType = type(HeapPrioQueue.Node(0,0,0))
             self._array = np.empty(self._capacity, dtype=theType)
@@ -86,6 +103,8 @@ class HeapPrioQueue(PrioQueueABC):
         - after return, isEmpty() invoked on the PrioQueue returns True
         """
         self._last = 0
+        self._modCount += 1
+        self._shrink_()
 
     def _realCompare_(self, n1, n2):
         """
@@ -112,8 +131,9 @@ class HeapPrioQueue(PrioQueueABC):
         array, heap(1, n) will be true upon return
         """
         i = self._last
+        d = self._arity
         while i > 1:
-            p = i // 2
+            p = (i - 2) // d + 1
             if self._realCompare_(self._array[p], self._array[i]) <= 0:
                 break
             tmpnode = self._array[p]
@@ -121,6 +141,40 @@ class HeapPrioQueue(PrioQueueABC):
             self._array[i] = tmpnode
             i = p
 
+    def _resize_(self, new_capacity):
+        """
+        Move the min-heap into an array of new_capacity cells
+        Raises
+        - MemoryError if allocation of the new array fails
+        """
+        try:
+            theType = type(HeapPrioQueue.Node(0,0,0))
+            new_array = np.empty(new_capacity, dtype=theType)
+        except:
+            raise MemoryError('HeapPrioQueue - unable to allocate array')
+        k = self._last + 1
+        new_array[1:k] = self._array[1:k]
+        self._capacity = new_capacity
+        self._array = new_array
+
+    def _shrink_(self):
+        """Shrink _array if the growth policy calls for it"""
+        new_capacity = self._growth.shrink(self._capacity, self._last + 1)
+        if new_capacity:
+            self._resize_(new_capacity)
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by _array, not counting the Nodes
+        """
+        return self._array.nbytes
+
+    def slack(self):
+        """
+        Return the number of bytes held by unused cells of _array
+        """
+        return self._array.nbytes - self._last * self._array.itemsize
+
     def insert(self, prio, datum):
         """
         Insert (prio, datum) into the correct place in the PrioQueue
@@ -142,20 +196,12 @@ class HeapPrioQueue(PrioQueueABC):
             )
         i = self._last + 1
         if i >= self._capacity:
-            new_capacity = 2 * self._capacity
-            try:
-                theType = type(HeapPrioQueue.Node(0,0,0))
-                new_array = np.empty(new_capacity, dtype=theType)
-            except:
-                raise MemoryError('HeapPrioQueue - unable to allocate array')
-            for j in range(1,i):
-                new_array[j] = self._array[j]
-            self._capacity = new_capacity
-            self._array = new_array
+            self._resize_(self._growth.grow(self._capacity, i + 1))
         node = HeapPrioQueue.Node(prio, datum, self._sequenceNo)
         self._sequenceNo += 1
         self._last = i
         self._array[i] = node
+        self._modCount += 1
         self._siftup_()
 
     def min(self):
@@ -171,28 +217,32 @@ class HeapPrioQueue(PrioQueueABC):
         return (self._array[1]._prio, self._array[1]._datum)
 
 
-    def _siftdown_(self):
+    def _siftdown_(self, i = 1):
         """
         Re-establishes heap property of min-heap array
+        Parameters
+        - i - root of the subtree to repair, default 1
         Effects
-        - if heap(2, n) is true, the the value at index n is moved to
+        - if the subtrees below i are heaps, heap(i, n) will be true upon
+        return; with the default i, if the value at index n is moved to
         index 1, heap(1, n-1) will be true upon return
         """
-        i = 1
+        a = self._array
+        last = self._last
+        d = self._arity
         while True:
-            c = 2 * i
-
-            if (c > self._last):
+            first = d * (i - 1) + 2
+            if first > last:
                 break
-            c2 = c + 1
-            if (c2 <= self._last and
-                self._realCompare_(self._array[c2], self._array[c]) < 0):
-                c = c2
-            if self._realCompare_(self._array[i], self._array[c]) <= 0:
+            c = first
+            for c2 in range(first + 1, min(first + d, last + 1)):
+                if self._realCompare_(a[c2], a[c]) < 0:
+                    c = c2
+            if self._realCompare_(a[i], a[c]) <= 0:
                 break
-            tmpnode = self._array[i]
-            self._array[i] = self._array[c]
-            self._array[c] = tmpnode
+            tmpnode = a[i]
+            a[i] = a[c]
+            a[c] = tmpnode
             i = c
 
     def removeMin(self):
@@ -212,9 +262,112 @@ class HeapPrioQueue(PrioQueueABC):
         node = self._array[1]
         self._array[1] = self._array[self._last]
         self._last -= 1
+        self._modCount += 1
         self._siftdown_()
+        self._shrink_()
         return (node._prio, node._datum)
 
+    def insertMany(self, prios, data):
+        """
+        Insert a batch of (prio, datum) pairs
+        Parameters
+        - prios - numpy 1D array or sequence of priorities
+        - data - numpy 1D array or sequence of data, same length as prios
+        Effects
+        - equivalent to insert(prios[i], data[i]) for each i in order,
+        including FIFO order among equal priorities
+        - the array is resized at most once, as the growth policy decides
+        - if the batch is at least as large as the queue already was, the
+        heap is rebuilt bottom-up in O(n); otherwise each new entry is
+        sifted up
+        Raises
+        - ValueError if prios and data differ in length
+        - TypeError if the data are not all of type _dtype; in that case
+        the queue is unchanged
+        - MemoryError if allocation of a larger array fails
+        """
+        if isinstance(prios, np.ndarray):
+            prios = prios.tolist()
+        if isinstance(data, np.ndarray):
+            data = data.tolist()
+        prios = list(prios)
+        data = list(data)
+        m = len(data)
+        if len(prios) != m:
+            raise ValueError(
+                'HeapPrioQueue.insertMany - len(prios) != len(data)')
+        for datum in data:
+            if type(datum) != self._dtype:
+                raise TypeError(
+                    'HeapPrioQueue.insertMany - type(datum) {} != {}'.format(
+                        type(datum), self._dtype
+                    )
+                )
+        n = self._last
+        if n + m >= self._capacity:
+            self._resize_(self._growth.grow(self._capacity, n + m + 1))
+        seq = self._sequenceNo
+        self._array[n + 1:n + m + 1] = [
+            HeapPrioQueue.Node(prios[j], data[j], seq + j) for j in range(m)]
+        self._sequenceNo += m
+        self._modCount += 1
+        if m >= n:
+            self._last = n + m
+            for i in range((self._last - 2) // self._arity + 1, 0, -1):
+                self._siftdown_(i)
+        else:
+            for j in range(m):
+                self._last += 1
+                self._siftup_()
+
+    @classmethod
+    def fromArrays(cls, prios, data, dtype = type(int()),
+                   arity = DEFAULT_ARITY):
+        """
+        Build a priority queue from arrays of priorities and data in O(n)
+        Parameters
+        - prios - numpy 1D array or sequence of priorities
+        - data - numpy 1D array or sequence of data, same length as prios
+        - dtype (class) - element type in the min-heap, default type(int())
+        - arity (int) - children per heap node, default 2
+        Returns
+        - HeapPrioQueue holding the pairs; equal priorities leave in the
+        order they appear in the arrays
+        Raises
+        - as for insertMany
+        """
+        pq = cls(capacity=len(data) + 1, dtype=dtype, arity=arity)
+        pq.insertMany(prios, data)
+        return pq
+
+    def removeMinMany(self, k):
+        """
+        Remove and return the k highest priority entries
+        Parameters
+        - k - number of entries to remove, >= 0
+        Returns
+        - numpy 1D array of (prio,datum) tuples in priority order; it has
+        fewer than k entries if the PrioQueue held fewer than k
+        Effects
+        - that many fewer entries in the PrioQueue
+        """
+        k = min(k, self._last)
+        self._modCount += 1
+        try:
+            x = np.empty(k, dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'HeapPrioQueue.removeMinMany - unable to allocate array')
+        a = self._array
+        for j in range(k):
+            node = a[1]
+            x[j] = (node._prio, node._datum)
+            a[1] = a[self._last]
+            self._last -= 1
+            self._siftdown_()
+        self._shrink_()
+        return x
+
     def isEmpty(self):
 
         """
@@ -233,6 +386,47 @@ class HeapPrioQueue(PrioQueueABC):
         """
         return self._last
 
+    def orderedItems(self):
+        """
+        Lazy generator over the (prio,datum) entries in priority order
+        The min-heap array is left untouched; a small auxiliary heap of
+        candidate indices is grown from the root, so taking the first k
+        entries costs O(k log k) and copies no data
+        Raises
+        - RuntimeError if the PrioQueue changes during iteration
+        """
+        expected = self._modCount
+        a = self._array
+        last = self._last
+        d = self._arity
+        frontier = []
+        if last >= 1:
+            frontier.append((a[1]._prio, a[1]._seqno, 1))
+        while frontier:
+            if self._modCount != expected:
+                raise RuntimeError(
+                    'HeapPrioQueue - queue changed during iteration')
+            prio, seqno, i = heapq.heappop(frontier)
+            yield (prio, a[i]._datum)
+            first = d * (i - 1) + 2
+            for c in range(first, min(first + d, last + 1)):
+                heapq.heappush(frontier, (a[c]._prio, a[c]._seqno, c))
+
+    def rawItems(self):
+        """
+        Lazy generator over the (prio,datum) entries in heap-array order,
+        which is not priority order
+        Raises
+        - RuntimeError if the PrioQueue changes during iteration
+        """
+        expected = self._modCount
+        a = self._array
+        for i in range(1, self._last + 1):
+            if self._modCount != expected:
+                raise RuntimeError(
+                    'HeapPrioQueue - queue changed during iteration')
+            yield (a[i]._prio, a[i]._datum)
+
     def _genArray_(self):
         """
         Generate an array of (prio,value) tuples ordered by priority
@@ -241,9 +435,7 @@ class HeapPrioQueue(PrioQueueABC):
         Raises
         - Memory Error if array allocation failure
         """
-
-        pq = HeapPrioQueue.duplicatePrioQueue(self)
-        n = pq._last
+        n = self._last
         try:
             x = np.empty(n, dtype=type(tuple))
         except:
@@ -251,13 +443,9 @@ class HeapPrioQueue(PrioQueueABC):
                 'HeapPrioQueue._genArray_ - unable to allocate array'
             )
         j = 0
-        for i in range(1, self._last+1):
-            node = pq._array[1]
-            x[j] = (node._prio, node._datum)
+        for item in self.orderedItems():
+            x[j] = item
             j += 1
-            pq._array[1] = pq._array[pq._last]
-            pq._last -= 1
-            pq._siftdown_()
         return x
 
     def toArray(self):
@@ -267,10 +455,6 @@ class HeapPrioQueue(PrioQueueABC):
         """
         returns iterator over the (prio,datum) elements, in priority order
         Returns
-        - Iterator instance
-        Raises
-        - MemoryError if allocation of array fails
+        - lazy generator, see orderedItems()
         """
-        n = self._last
-        x = self._genArray_()
-        return it.Iterator(n, x)
+        return self.orderedItems()
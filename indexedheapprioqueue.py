@@ -0,0 +1,175 @@
+# priority queue with handles, implemented using a min-heap
+from heapprioqueue import HeapPrioQueue
+
+class IndexedHeapPrioQueue(HeapPrioQueue):
+    """
+    Priority Queue whose entries can be reprioritized or cancelled
+    insert returns a handle (the entry's heap node).  Every node records
+    its index in the min-heap array in _pos, kept up to date by
+    _siftup_ and _siftdown_, so a handle is located in O(1) and
+    changePriority and remove run in O(log n).  Equal priorities keep
+    FIFO order by original insertion, including after changePriority.
+    Attributes (in addition to those of HeapPrioQueue)
+    - each Node has _pos (int) - its index in _array
+    """
+
+    def __str__(self):
+        """Document metadata about the PrioQueue"""
+        return 'IndexedHeapPrioQueue - capacity:{}, size:{}, dtype:{}'.format(
+            self._capacity, self._last, self._dtype)
+
+    def _siftup_(self, i = None):
+        """
+        Re-establishes heap property of min-heap array, moving the node at
+        index i (default _last) towards the root
+        Effects
+        - every node moved has its _pos updated
+        """
+        if i is None:
+            i = self._last
+        a = self._array
+        d = self._arity
+        node = a[i]
+        while i > 1:
+            p = (i - 2) // d + 1
+            if self._realCompare_(a[p], node) <= 0:
+                break
+            a[i] = a[p]
+            a[i]._pos = i
+            i = p
+        a[i] = node
+        node._pos = i
+
+    def _siftdown_(self, i = 1):
+        """
+        Re-establishes heap property of min-heap array, moving the node at
+        index i (default 1) towards the leaves
+        Effects
+        - every node moved has its _pos updated
+        """
+        a = self._array
+        last = self._last
+        d = self._arity
+        node = a[i]
+        while True:
+            first = d * (i - 1) + 2
+            if first > last:
+                break
+            c = first
+            for c2 in range(first + 1, min(first + d, last + 1)):
+                if self._realCompare_(a[c2], a[c]) < 0:
+                    c = c2
+            if self._realCompare_(node, a[c]) <= 0:
+                break
+            a[i] = a[c]
+            a[i]._pos = i
+            i = c
+        a[i] = node
+        node._pos = i
+
+    def insert(self, prio, datum):
+        """
+        Insert (prio, datum) into the correct place in the PrioQueue
+        Parameters
+        - prio - priority for this entry
+        - datum - datum associated with this priority in this entry
+        Returns
+        - handle for the entry, for changePriority, remove and contains
+        Raises
+        - TypeError if type(datum) is different from _dtype
+        - MemoryError if allocation of a larger array fails
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'IndexedHeapPrioQueue.insert - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        i = self._last + 1
+        if i >= self._capacity:
+            self._resize_(self._growth.grow(self._capacity, i + 1))
+        node = HeapPrioQueue.Node(prio, datum, self._sequenceNo)
+        self._sequenceNo += 1
+        self._last = i
+        self._array[i] = node
+        self._modCount += 1
+        self._siftup_()
+        return node
+
+    def insertMany(self, prios, data):
+        """
+        Insert a batch of (prio, datum) pairs; see HeapPrioQueue.insertMany
+        Returns
+        - list of handles, one per pair, in the order given
+        Effects
+        - the positions of all nodes are refreshed, O(n + m) overall
+        """
+        first = self._sequenceNo
+        HeapPrioQueue.insertMany(self, prios, data)
+        a = self._array
+        handles = [None] * (self._sequenceNo - first)
+        for i in range(1, self._last + 1):
+            node = a[i]
+            node._pos = i
+            if node._seqno >= first:
+                handles[node._seqno - first] = node
+        return handles
+
+    def contains(self, handle):
+        """
+        Indicate whether handle refers to an entry still in the PrioQueue
+        """
+        pos = getattr(handle, '_pos', 0)
+        return 1 <= pos <= self._last and self._array[pos] is handle
+
+    def changePriority(self, handle, prio):
+        """
+        Give the entry for handle a new priority
+        Parameters
+        - handle - value returned by insert
+        - prio - the new priority
+        Effects
+        - the entry is moved to its place under the new priority; among
+        equal priorities it keeps its original insertion order
+        Raises
+        - KeyError if handle is not in the PrioQueue
+        """
+        if not self.contains(handle):
+            raise KeyError('IndexedHeapPrioQueue.changePriority - bad handle')
+        old = handle._prio
+        handle._prio = prio
+        self._modCount += 1
+        if prio < old:
+            self._siftup_(handle._pos)
+        else:
+            self._siftdown_(handle._pos)
+
+    def remove(self, handle):
+        """
+        Remove the entry for handle
+        Parameters
+        - handle - value returned by insert
+        Returns
+        - (prio,datum) of the removed entry
+        Effects
+        - one fewer entries in the PrioQueue
+        Raises
+        - KeyError if handle is not in the PrioQueue
+        """
+        if not self.contains(handle):
+            raise KeyError('IndexedHeapPrioQueue.remove - bad handle')
+        a = self._array
+        i = handle._pos
+        last = a[self._last]
+        self._last -= 1
+        self._modCount += 1
+        if last is not handle:
+            a[i] = last
+            last._pos = i
+            if self._realCompare_(last, handle) < 0:
+                self._siftup_(i)
+            else:
+                self._siftdown_(i)
+        handle._pos = 0
+        self._shrink_()
+        return (handle._prio, handle._datum)
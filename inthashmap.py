@@ -0,0 +1,586 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class IntHashMap(MapABC):
+    """
+    Map ADT specialized for integer keys
+    Keys are stored unboxed in a numpy int64 array and values in a numpy
+    array of typemap(dtype), so an entry costs a few bytes instead of a
+    Python object.  Keys are hashed with the splitmix64 finalizer, which is
+    applied to whole arrays of keys at once by the *Many methods.
+    Collisions are resolved by linear probing; removal shifts later
+    entries of the probe run back, so no tombstones are left behind.
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _size (int) - number of entries in the Map
+    - _capacity (int) - number of slots, always a power of 2
+    - _minCapacity (int) - the map never shrinks below this many slots
+    - _changes (int) - number of changes in entries since last resize check
+    - _loadFactor (float) - target load
+    - _used (numpy 1D bool array) - True where a slot holds an entry
+    - _keys (numpy 1D int64 array) - key in each slot
+    - _values (numpy 1D array of _dtype) - value in each slot
+    """
+    DEFAULT_CAPACITY = 16
+    DEFAULT_LOAD_FACTOR = 0.5
+    MAX_LOAD_FACTOR = 0.9
+    MAX_CAPACITY = 1 << 34
+    TRIGGER = 100
+    NO_DEFAULT = object()
+    _M64 = 0xFFFFFFFFFFFFFFFF
+
+    @staticmethod
+    def _mix_(keys):
+        """
+        splitmix64 finalizer applied elementwise
+        Parameters
+        - keys - numpy 1D int64 array
+        Returns
+        - numpy 1D uint64 array of well-mixed hashes
+        """
+        z = keys.astype(np.uint64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+        return z ^ (z >> np.uint64(31))
+
+    @classmethod
+    def _mixOne_(cls, key):
+        """
+        splitmix64 finalizer for a single key, equal to _mix_ on an array
+        Parameters
+        - key - an integer in the int64 range
+        Returns
+        - the mixed hash as a non-negative int
+        """
+        z = int(key) & cls._M64
+        z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & cls._M64
+        z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & cls._M64
+        return z ^ (z >> 31)
+
+    def __init__(self, hashfxn = None, dtype = type(int()),
+                 capacity = DEFAULT_CAPACITY,
+                 loadFactor = DEFAULT_LOAD_FACTOR):
+        """
+        Constructor for integer-keyed Map
+        Parameters
+        - hashfxn: accepted so the constructor matches HashMap; keys are
+        always hashed with the built-in integer mixer
+        - dtype: type of data in the map, default type(int())
+        - capacity: initial number of slots, rounded up to a power of 2,
+        default DEFAULT_CAPACITY
+        - loadFactor: target load factor, default DEFAULT_LOAD_FACTOR;
+        values above MAX_LOAD_FACTOR are clamped to it
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - MemoryError if allocation of the slot arrays fails
+        """
+        self._dtype = typemap(dtype)
+        self._size = 0
+        n = 1
+        while n < capacity and n < IntHashMap.MAX_CAPACITY:
+            n *= 2
+        self._capacity = n
+        self._minCapacity = n
+        self._changes = 0
+        self._loadFactor = min(loadFactor, IntHashMap.MAX_LOAD_FACTOR)
+        if loadFactor < 0.001:
+            self._loadFactor = IntHashMap.DEFAULT_LOAD_FACTOR
+        self._allocSlots_(n)
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'IntHashMap - slots: {}, size:{}, dtype:{}'.format(
+            self._capacity, self._size, self._dtype)
+
+    def _allocSlots_(self, n):
+        """
+        Replace the slot arrays with n empty slots
+        Parameters
+        - n - number of slots, a power of 2
+        Raises
+        - MemoryError if allocation of the arrays fails
+        """
+        try:
+            used = np.zeros(n, dtype=bool)
+            keys = np.zeros(n, dtype=np.int64)
+            values = np.zeros(n, dtype=self._dtype)
+        except:
+            raise MemoryError('IntHashMap - unable to allocate slot arrays')
+        self._used = used
+        self._keys = keys
+        self._values = values
+        self._capacity = n
+
+    def nbytes(self):
+        """
+        Return the number of bytes held by the slot arrays
+        """
+        return self._used.nbytes + self._keys.nbytes + self._values.nbytes
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, isEmpty() invoked on the map returns True
+        """
+        self._size = 0
+        self._changes = 0
+        self._used[:] = False
+
+    @staticmethod
+    def _checkKey_(key):
+        """
+        Raise TypeError unless key is an integer
+        """
+        if not isinstance(key, (int, np.integer)):
+            raise TypeError(
+                'IntHashMap - type(key) {} is not an integer'.format(
+                    type(key)))
+
+    def _findSlot_(self, key):
+        """
+        Find the slot holding key
+        Parameters
+        - key - the integer key in which we are interested
+        Returns
+        - (index, found)
+        + index - slot holding key, or the empty slot ending its probe run
+        + found - True if key is in the map
+        """
+        used = self._used
+        keys = self._keys
+        mask = self._capacity - 1
+        i = IntHashMap._mixOne_(key) & mask
+        while used[i]:
+            if keys[i] == key:
+                return (i, True)
+            i = (i + 1) & mask
+        return (i, False)
+
+    def _slotsMany_(self, keys):
+        """
+        Find the slots holding a batch of keys, probing all keys in step
+        Parameters
+        - keys - numpy 1D int64 array
+        Returns
+        - numpy 1D int64 array with the slot of each key, or -1 for keys
+        not in the map
+        """
+        mask = np.uint64(self._capacity - 1)
+        pos = (IntHashMap._mix_(keys) & mask).astype(np.int64)
+        out = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        mask = self._capacity - 1
+        while pending.size:
+            p = pos[pending]
+            used = self._used[p]
+            hit = used & (self._keys[p] == keys[pending])
+            out[pending[hit]] = p[hit]
+            more = used & ~hit
+            pending = pending[more]
+            pos[pending] = (p[more] + 1) & mask
+        return out
+
+    def _placeMany_(self, keys, values):
+        """
+        Insert a batch of distinct keys known not to be in the map
+        Parameters
+        - keys - numpy 1D int64 array of distinct keys
+        - values - numpy 1D array of _dtype, same length as keys
+        Effects
+        - each key is stored in the first free slot of its probe run; the
+        capacity must already be large enough for all of them
+        """
+        mask = np.uint64(self._capacity - 1)
+        pos = (IntHashMap._mix_(keys) & mask).astype(np.int64)
+        pending = np.arange(len(keys))
+        mask = self._capacity - 1
+        while pending.size:
+            p = pos[pending]
+            free = ~self._used[p]
+            slots, first = np.unique(p[free], return_index=True)
+            winners = pending[free][first]
+            self._used[slots] = True
+            self._keys[slots] = keys[winners]
+            self._values[slots] = values[winners]
+            # keys that found their slot taken move on; keys that lost a
+            # race for a free slot retry it and see it is now in use
+            busy = ~free
+            pos[pending[busy]] = (p[busy] + 1) & mask
+            placed = np.zeros(len(keys), dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+
+    def _rehash_(self, new_capacity):
+        """
+        Rebuild the slot arrays with new_capacity slots
+        Parameters
+        - new_capacity - number of slots, a power of 2
+        Raises
+        - MemoryError if allocation of the new arrays fails
+        """
+        keys = self._keys[self._used]
+        values = self._values[self._used]
+        self._allocSlots_(new_capacity)
+        self._placeMany_(keys, values)
+
+    def _grownCapacity_(self, n):
+        """
+        Return the capacity needed to hold n entries at _loadFactor
+        """
+        new_capacity = self._capacity
+        while (n > self._loadFactor * new_capacity and
+               new_capacity < IntHashMap.MAX_CAPACITY):
+            new_capacity *= 2
+        if n >= new_capacity:
+            raise MemoryError('IntHashMap - map is full')
+        return new_capacity
+
+    def _checkResize_(self):
+        """
+        Apply the growth policy after entries were added or removed
+        Effects
+        - if the load exceeds _loadFactor the slot arrays double in size,
+        up to MAX_CAPACITY
+        - every TRIGGER changes, if the load has fallen below a quarter of
+        _loadFactor the slot arrays halve, down to _minCapacity
+        """
+        if self._size > self._loadFactor * self._capacity:
+            self._rehash_(self._grownCapacity_(self._size))
+        elif self._changes >= IntHashMap.TRIGGER:
+            self._changes = 0
+            if (self._size < self._loadFactor * self._capacity / 4 and
+                self._capacity > self._minCapacity):
+                self._rehash_(self._capacity // 2)
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map
+        Parameters
+        - key - the integer key in which we are interested
+        Returns
+        - True if an entry with key is in the Map
+        - False otherwise
+        Raises
+        - TypeError if key is not an integer
+        """
+        IntHashMap._checkKey_(key)
+        return self._findSlot_(key)[1]
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the integer key in which we are interested
+        Returns
+        - value associated with key
+        Raises
+        - KeyError if containsKey(key) == False
+        - TypeError if key is not an integer
+        """
+        IntHashMap._checkKey_(key)
+        i, found = self._findSlot_(key)
+        if not found:
+            raise KeyError('IntHashMap.get - invalid key')
+        return self._values[i]
+
+    def _insertNewEntry_(self, key, value, i):
+        """
+        Insert a new entry into the map
+        Parameters
+        - key - integer key associated with entry
+        - value - value associated with key
+        - i - the empty slot that ended the probe run for key
+        Effects
+        - entry for (key, value) added to map
+        - one more entry in the map
+        - This code assumes the caller has guaranteed that an entry with
+        key does not already exist in the map
+        """
+        self._used[i] = True
+        self._keys[i] = key
+        self._values[i] = value
+        self._size += 1
+        self._changes += 1
+        self._checkResize_()
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the integer key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - if containsKey(key) is True, the value associated with it will be
+        replaced by the value parameter
+        - if not, (key,value) will be added to the map, and the map will
+        be larger by one more entry
+        Raises
+        - TypeError if key is not an integer or type(value) is not equal
+        to _dtype
+        """
+        IntHashMap._checkKey_(key)
+        if type(value) != self._dtype:
+            raise TypeError(
+                'IntHashMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        i, found = self._findSlot_(key)
+        if found:
+            self._values[i] = value
+        else:
+            self._insertNewEntry_(key, value, i)
+
+    def putUnique(self, key, value):
+        """
+        Store (key,value) into the map iff key not already in map
+        Parameters
+        - key - the integer key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - (key,value) will be added to the map, and the map will
+        be larger by one more entry
+        Raises
+        - KeyError if there is already an entry using key
+        - TypeError if key is not an integer or type(value) is not equal
+        to _dtype
+        """
+        IntHashMap._checkKey_(key)
+        if type(value) != self._dtype:
+            raise TypeError(
+                'IntHashMap.putUnique - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        i, found = self._findSlot_(key)
+        if found:
+            raise KeyError('IntHashMap.putUnique - key already exists')
+        self._insertNewEntry_(key, value, i)
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key
+        Parameters
+        - key - the integer key in which we are interested
+        Effects
+        - entry associated with key removed from the map; later entries
+        of its probe run that may legally move are shifted back
+        - there is one fewer entry in the map
+        Raises
+        - KeyError if containsKey(key) == False
+        - TypeError if key is not an integer
+        """
+        IntHashMap._checkKey_(key)
+        i, found = self._findSlot_(key)
+        if not found:
+            raise KeyError('IntHashMap.remove - key does not exist')
+        used = self._used
+        keys = self._keys
+        mask = self._capacity - 1
+        j = i
+        while True:
+            j = (j + 1) & mask
+            if not used[j]:
+                break
+            home = IntHashMap._mixOne_(keys[j]) & mask
+            # the entry at j may fill hole i only if its home slot does
+            # not lie cyclically within (i, j]
+            if (j > i and (home <= i or home > j)) or \
+               (j < i and (home <= i and home > j)):
+                keys[i] = keys[j]
+                self._values[i] = self._values[j]
+                i = j
+        used[i] = False
+        self._size -= 1
+        self._changes += 1
+        self._checkResize_()
+
+    def putMany(self, keys, values):
+        """
+        Store a batch of (key,value) pairs into the map
+        Parameters
+        - keys - numpy 1D array or sequence of integer keys
+        - values - numpy 1D array or sequence of values, same length as keys
+        Effects
+        - equivalent to put(keys[i], values[i]) for each i in order; the
+        slot arrays grow at most once and all keys are probed in step
+        Raises
+        - ValueError if keys and values differ in length
+        - TypeError if the keys are not integers or the values are not of
+        type _dtype; in that case the map is unchanged
+        - MemoryError if allocation of larger slot arrays fails
+        """
+        keys = np.asarray(keys)
+        if keys.size and keys.dtype.kind not in 'iu':
+            raise TypeError('IntHashMap.putMany - keys must be integers')
+        if not isinstance(self._dtype, np.dtype):
+            values = np.array(list(values), dtype=object)
+            if any(type(v) != self._dtype for v in values):
+                raise TypeError(
+                    'IntHashMap.putMany - values must all be {}'.format(
+                        self._dtype))
+        else:
+            values = np.asarray(values)
+            if values.size and values.dtype != self._dtype:
+                raise TypeError(
+                    'IntHashMap.putMany - values.dtype {} != {}'.format(
+                        values.dtype, self._dtype))
+        if len(keys) != len(values):
+            raise ValueError('IntHashMap.putMany - len(keys) != len(values)')
+        keys = keys.astype(np.int64, copy=False)
+        values = values.astype(self._dtype, copy=False)
+        # the last occurrence of a repeated key wins, as with put
+        n = len(keys)
+        last = n - 1 - np.unique(keys[::-1], return_index=True)[1]
+        keys = keys[last]
+        values = values[last]
+        slots = self._slotsMany_(keys)
+        found = slots >= 0
+        self._values[slots[found]] = values[found]
+        new = ~found
+        m = int(np.count_nonzero(new))
+        if m:
+            new_capacity = self._grownCapacity_(self._size + m)
+            if new_capacity != self._capacity:
+                self._rehash_(new_capacity)
+            self._placeMany_(keys[new], values[new])
+            self._size += m
+            self._changes += m
+            self._checkResize_()
+
+    def getMany(self, keys, default = NO_DEFAULT):
+        """
+        Return the values associated with a batch of keys
+        Parameters
+        - keys - numpy 1D array or sequence of integer keys
+        - default - value returned for keys not in the map; it must be
+        storable in a numpy array of _dtype.  If omitted, a missing key
+        raises KeyError
+        Returns
+        - numpy 1D array of _dtype, the value for each key in order
+        Raises
+        - KeyError if a key is not in the map and no default was given
+        - TypeError if the keys are not integers
+        """
+        keys = np.asarray(keys)
+        if keys.size and keys.dtype.kind not in 'iu':
+            raise TypeError('IntHashMap.getMany - keys must be integers')
+        slots = self._slotsMany_(keys.astype(np.int64, copy=False))
+        x = self._values[slots]
+        missing = slots < 0
+        if missing.any():
+            if default is IntHashMap.NO_DEFAULT:
+                raise KeyError('IntHashMap.getMany - invalid key')
+            x[missing] = default
+        return x
+
+    def containsMany(self, keys):
+        """
+        Indicate which of a batch of keys are resident in the map
+        Parameters
+        - keys - numpy 1D array or sequence of integer keys
+        Returns
+        - numpy 1D bool array, True where the key has an entry in the map
+        Raises
+        - TypeError if the keys are not integers
+        """
+        keys = np.asarray(keys)
+        if keys.size and keys.dtype.kind not in 'iu':
+            raise TypeError('IntHashMap.containsMany - keys must be integers')
+        return self._slotsMany_(keys.astype(np.int64, copy=False)) >= 0
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if the map has no entries
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the number of entries in the map, >= 0
+        """
+        return self._size
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - an unordered numpy 1D int64 array of keys in the map
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        try:
+            x = self._keys[self._used]
+        except:
+            raise MemoryError('IntHashMap.keyArray - unable to allocate array')
+        return x
+
+    def _genArray_(self):
+        """
+        Return an unordered array of (key,value) tuples
+        Returns
+        - numpy 1D array of (key,value) tuples
+        Raises
+        - MemoryError if array allocation fails
+        """
+        n = self._size
+        try:
+            x = np.empty(n, dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'IntHashMap._genArray_ - unable to allocate array')
+        keys = self._keys[self._used].tolist()
+        values = self._values[self._used].tolist()
+        for j in range(n):
+            x[j] = (keys[j], values[j])
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return in unordered iterator over the map entries
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of the array of entries fails
+        """
+        n = self._size
+        x = self._genArray_()
+        return it.Iterator(n, x)
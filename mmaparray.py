@@ -0,0 +1,261 @@
+# list whose elements live in a memory-mapped file
+from dynamicarray import DynamicArray
+from growthpolicy import ChunkGrowth
+import numpy as np
+import os
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class MmapArray(DynamicArray):
+    """
+    Persistent DynamicArray whose elements live in a file
+    The file holds a HEADER_SIZE-byte header followed by the element
+    array, mapped with np.memmap, so opening an existing list costs
+    nothing beyond mapping the file, and processes opening it with mode
+    'r' share its pages.  The file grows in whole extents of _extent
+    bytes; growing only lengthens the file and remaps it, so the elements
+    are never copied and the slack is sparse on most filesystems.
+    Crash detection is as in MmapHashMap: the first change after a flush
+    increments the header's begin counter, flush() sets end = begin, and
+    opening a file whose counters differ raises CorruptError.
+    Elements must have a fixed-size numpy dtype (no str or object).
+    clear, add, extend and set raise PermissionError if the list was
+    opened read-only.
+    Attributes (in addition to those of DynamicArray)
+    - _path (str) - the file backing the list
+    - _readOnly (bool) - True if the list was opened with mode 'r'
+    - _extent (int) - the file grows by multiples of this many bytes
+    - _header (numpy memmap) - one HEADER_DTYPE record at offset 0
+    - _dirty (bool) - True if the list changed since the last flush
+    """
+    MAGIC = b'ADTMARR1'
+    VERSION = 1
+    HEADER_SIZE = 4096
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<i8'),
+                             ('capacity', '<i8'), ('size', '<i8'),
+                             ('extent', '<i8'), ('begin', '<i8'),
+                             ('end', '<i8'), ('dtype', 'S16')])
+    DEFAULT_EXTENT = 1 << 24
+
+    def __init__(self, path, dtype = None,
+                 capacity = DynamicArray.DEFAULT_CAPACITY, mode = None,
+                 extent = None):
+        """
+        Create or open a file-backed list
+        Parameters
+        - path: the file backing the list
+        - dtype: type of elements in a new list, default type(int());
+        when opening an existing list it must be None or match the file
+        - capacity: initial capacity of a new list, rounded up to whole
+        extents; ignored when opening an existing list
+        - mode: 'w+' creates a new list, replacing any file at path; 'r+'
+        opens an existing list for update; 'r' opens it read-only.  The
+        default is 'r+' if path exists, 'w+' otherwise
+        - extent: growth increment of the file in bytes; a new list
+        defaults to DEFAULT_EXTENT (16 MiB), an existing one to the extent
+        stored in its file
+        Effects
+        - object instance ready to act like a list
+        Raises
+        - CorruptError if the file is not a list or was not flushed after
+        its last change
+        - TypeError if dtype does not match an existing list, or is not a
+        fixed-size numpy type
+        - MemoryError if creation of the file fails
+        """
+        if mode is None:
+            mode = 'r+' if os.path.exists(path) else 'w+'
+        if mode not in ('r', 'r+', 'w+'):
+            raise ValueError('MmapArray - unknown mode {}'.format(mode))
+        self._path = path
+        self._readOnly = mode == 'r'
+        self._dirty = False
+        self._array = None
+        self._generation = 0
+        self._views = []
+        if mode == 'w+':
+            if dtype is None:
+                dtype = type(int())
+            if not isinstance(typemap(dtype), np.dtype) or \
+               typemap(dtype).hasobject:
+                raise TypeError(
+                    'MmapArray - dtype {} has no fixed size'.format(dtype))
+            self._dtype = typemap(dtype)
+            self._extent = extent or MmapArray.DEFAULT_EXTENT
+            self._size = 0
+            self._create_()
+            self._mapArray_(self._roundUp_(capacity))
+            self._dirty = True
+            self.flush()
+        else:
+            self._open_(dtype, mode)
+            if extent:
+                self._extent = extent
+        # remapping never copies, so growing one extent at a time is cheap
+        self._growth = ChunkGrowth(self._roundUp_(1))
+
+    def _create_(self):
+        """
+        Write a new file holding only the header
+        Raises
+        - MemoryError if the file cannot be created
+        """
+        try:
+            with open(self._path, 'wb') as f:
+                f.truncate(MmapArray.HEADER_SIZE)
+            self._header = np.memmap(self._path, dtype=MmapArray.HEADER_DTYPE,
+                                     mode='r+', shape=(1,))
+        except OSError:
+            raise MemoryError(
+                'MmapArray - unable to create {}'.format(self._path))
+        h = self._header
+        h['magic'] = MmapArray.MAGIC
+        h['version'] = MmapArray.VERSION
+        h['dtype'] = self._dtype.str.encode()
+        h['begin'] = 1
+        h['end'] = 0
+
+    def _open_(self, dtype, mode):
+        """
+        Map an existing file
+        Raises
+        - CorruptError if the header is invalid, the counters differ or
+        the file is shorter than its header says
+        - TypeError if dtype is given and does not match the file
+        """
+        length = os.path.getsize(self._path)
+        # np.memmap zero-extends a short file in mode 'r+', so the length
+        # is checked before anything is mapped
+        if length < MmapArray.HEADER_SIZE:
+            raise CorruptError(
+                'MmapArray - {} is not a list file'.format(self._path))
+        header = np.memmap(self._path, dtype=MmapArray.HEADER_DTYPE,
+                           mode=mode, shape=(1,))
+        h = header[0]
+        if h['magic'] != MmapArray.MAGIC or \
+           h['version'] != MmapArray.VERSION:
+            raise CorruptError(
+                'MmapArray - {} is not a list file'.format(self._path))
+        if h['begin'] != h['end']:
+            raise CorruptError(
+                'MmapArray - {} was not flushed after its last change'
+                .format(self._path))
+        stored = np.dtype(h['dtype'].decode())
+        if dtype is not None and typemap(dtype) != stored:
+            raise TypeError('MmapArray - dtype {} != {} in file'.format(
+                typemap(dtype), stored))
+        if length < MmapArray.HEADER_SIZE + \
+           int(h['capacity']) * stored.itemsize:
+            raise CorruptError(
+                'MmapArray - {} is truncated'.format(self._path))
+        self._dtype = stored
+        self._header = header
+        self._capacity = int(h['capacity'])
+        self._size = int(h['size'])
+        self._extent = int(h['extent'])
+        self._array = np.memmap(self._path, dtype=stored, mode=mode,
+                                offset=MmapArray.HEADER_SIZE,
+                                shape=(self._capacity,))
+
+    def _roundUp_(self, n):
+        """Return n cells rounded up to a whole number of extents"""
+        per = max(1, self._extent // self._dtype.itemsize)
+        return max(1, -(-n // per)) * per
+
+    def _mapArray_(self, n):
+        """
+        Resize the file to hold n cells and map them
+        Raises
+        - MemoryError if the file cannot be resized
+        """
+        if self._array is not None:
+            self._array.flush()
+            # views of the old mapping are retired as for a reallocated
+            # DynamicArray; reading one past the end of a shortened file
+            # faults, so check isCurrent before using an old view
+            self._invalidate_()
+            self._array = None
+        try:
+            with open(self._path, 'r+b') as f:
+                f.truncate(MmapArray.HEADER_SIZE + n * self._dtype.itemsize)
+            self._array = np.memmap(self._path, dtype=self._dtype, mode='r+',
+                                    offset=MmapArray.HEADER_SIZE, shape=(n,))
+        except OSError:
+            raise MemoryError(
+                'MmapArray - unable to resize {}'.format(self._path))
+        self._capacity = n
+
+    def _resize_(self, new_capacity):
+        """
+        Lengthen or shorten the file to new_capacity cells, rounded up to
+        whole extents; the elements stay where they are
+        Raises
+        - PermissionError if the list was opened read-only
+        - MemoryError if the file cannot be resized
+        """
+        self._modify_()
+        n = self._roundUp_(max(new_capacity, self._size))
+        if n != self._capacity:
+            self._mapArray_(n)
+
+    def __str__(self):
+        """Document metadata about the list object"""
+        st = 'MmapArray - path: {}, capacity: {}, size: {}, dtype: {}'
+        return st.format(self._path, self._capacity, self._size, self._dtype)
+
+    def _modify_(self):
+        """
+        Prepare for a change to the list; clear, add, extend and set call
+        this only after validating their arguments, so a rejected call
+        leaves the file clean
+        Effects
+        - on the first change since the last flush, the header's begin
+        counter is incremented and written to disk
+        Raises
+        - PermissionError if the list was opened read-only
+        """
+        if self._readOnly:
+            raise PermissionError(
+                'MmapArray - {} is open read-only'.format(self._path))
+        if not self._dirty:
+            self._dirty = True
+            self._header['begin'] += 1
+            self._header.flush()
+
+    def flush(self):
+        """
+        Write all changes back to the file
+        Effects
+        - the element array is flushed, then the header is marked clean
+        """
+        if not self._dirty:
+            return
+        self._array.flush()
+        h = self._header
+        h['capacity'] = self._capacity
+        h['size'] = self._size
+        h['extent'] = self._extent
+        h['end'] = h['begin']
+        h.flush()
+        self._dirty = False
+
+    def close(self):
+        """
+        Flush the list, if writable, and unmap the file
+        Effects
+        - the list object must not be used afterwards
+        """
+        if not self._readOnly:
+            self.flush()
+        self._header = self._array = None
+
+    def itCreate(self):
+        """
+        Returns iterator over list elements in index order, reading the
+        file a block at a time instead of copying it whole
+        Returns
+        - generator
+        """
+        block = max(1, self._extent // self._dtype.itemsize)
+        for start in range(0, self._size, block):
+            yield from self._array[start:min(self._size, start + block)]
@@ -0,0 +1,306 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from inthashmap import IntHashMap
+import numpy as np
+import os
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class MmapHashMap(IntHashMap):
+    """
+    Persistent integer-keyed Map whose slot arrays live in a file
+    The file holds a HEADER_SIZE-byte header followed by the _used, _keys
+    and _values arrays of an IntHashMap, each mapped with np.memmap, so
+    opening an existing map costs nothing beyond mapping the file, and
+    processes opening it with mode 'r' share its pages.
+    Crash detection: the header holds two counters, _begin and _end.  The
+    first change after a flush increments _begin on disk; flush() writes
+    the arrays back and then sets _end = _begin.  A file whose counters
+    differ was not flushed after its last change, and opening it raises
+    CorruptError.  Resizing writes a complete new file beside the old one
+    and renames it into place.
+    Values must have a fixed-size numpy dtype (no str or object values).
+    Attributes (in addition to those of IntHashMap)
+    - _path (str) - the file backing the map
+    - _readOnly (bool) - True if the map was opened with mode 'r'
+    - _header (numpy memmap) - one HEADER_DTYPE record at offset 0
+    - _dirty (bool) - True if the map changed since the last flush
+    """
+    MAGIC = b'ADTMMAP1'
+    VERSION = 1
+    HEADER_SIZE = 4096
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<i8'),
+                             ('capacity', '<i8'), ('size', '<i8'),
+                             ('minCapacity', '<i8'), ('loadFactor', '<f8'),
+                             ('begin', '<i8'), ('end', '<i8'),
+                             ('dtype', 'S16')])
+
+    def __init__(self, path, hashfxn = None, dtype = None,
+                 capacity = IntHashMap.DEFAULT_CAPACITY,
+                 loadFactor = IntHashMap.DEFAULT_LOAD_FACTOR, mode = None):
+        """
+        Create or open a file-backed Map
+        Parameters
+        - path: the file backing the map
+        - hashfxn: accepted so the constructor matches HashMap
+        - dtype: type of data in a new map, default type(int()); when
+        opening an existing map it must be None or match the file
+        - capacity, loadFactor: as for IntHashMap; ignored when opening
+        an existing map
+        - mode: 'w+' creates a new map, replacing any file at path; 'r+'
+        opens an existing map for update; 'r' opens it read-only.  The
+        default is 'r+' if path exists, 'w+' otherwise
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - CorruptError if the file is not a map or was not flushed after
+        its last change
+        - TypeError if dtype does not match an existing map, or is not a
+        fixed-size numpy type
+        - MemoryError if creation of the file fails
+        """
+        if mode is None:
+            mode = 'r+' if os.path.exists(path) else 'w+'
+        if mode not in ('r', 'r+', 'w+'):
+            raise ValueError('MmapHashMap - unknown mode {}'.format(mode))
+        self._path = path
+        self._readOnly = mode == 'r'
+        self._dirty = False
+        if mode == 'w+':
+            if dtype is None:
+                dtype = type(int())
+            if not isinstance(typemap(dtype), np.dtype) or \
+               typemap(dtype).hasobject:
+                raise TypeError(
+                    'MmapHashMap - dtype {} has no fixed size'.format(dtype))
+            IntHashMap.__init__(self, hashfxn, dtype, capacity, loadFactor)
+            self._commit_()
+        else:
+            self._open_(dtype, mode)
+
+    def _open_(self, dtype, mode):
+        """
+        Map an existing file
+        Raises
+        - CorruptError if the header is invalid, the counters differ or
+        the file is shorter than its header says
+        - TypeError if dtype is given and does not match the file
+        """
+        length = os.path.getsize(self._path)
+        # np.memmap zero-extends a short file in mode 'r+', so the length
+        # is checked before anything is mapped
+        if length < MmapHashMap.HEADER_SIZE:
+            raise CorruptError(
+                'MmapHashMap - {} is not a map file'.format(self._path))
+        header = np.memmap(self._path, dtype=MmapHashMap.HEADER_DTYPE,
+                           mode=mode, shape=(1,))
+        h = header[0]
+        if h['magic'] != MmapHashMap.MAGIC or \
+           h['version'] != MmapHashMap.VERSION:
+            raise CorruptError(
+                'MmapHashMap - {} is not a map file'.format(self._path))
+        if h['begin'] != h['end']:
+            raise CorruptError(
+                'MmapHashMap - {} was not flushed after its last change'
+                .format(self._path))
+        stored = np.dtype(h['dtype'].decode())
+        if dtype is not None and typemap(dtype) != stored:
+            raise TypeError('MmapHashMap - dtype {} != {} in file'.format(
+                typemap(dtype), stored))
+        if length < self._fileSize_(int(h['capacity']), stored):
+            raise CorruptError(
+                'MmapHashMap - {} is truncated'.format(self._path))
+        self._dtype = stored
+        self._header = header
+        self._capacity = int(h['capacity'])
+        self._size = int(h['size'])
+        self._minCapacity = int(h['minCapacity'])
+        self._loadFactor = float(h['loadFactor'])
+        self._changes = 0
+        self._mapArrays_(self._path, self._capacity, mode)
+
+    def _fileSize_(self, n, dtype):
+        """Return the length in bytes of an n-slot file of dtype values"""
+        return (MmapHashMap.HEADER_SIZE + (n + 7) // 8 * 8 + 8 * n +
+                dtype.itemsize * n)
+
+    def _mapArrays_(self, path, n, mode):
+        """
+        Map the _used, _keys and _values arrays of an n-slot file
+        """
+        used = MmapHashMap.HEADER_SIZE
+        keys = used + (n + 7) // 8 * 8
+        values = keys + 8 * n
+        self._used = np.memmap(path, dtype=bool, mode=mode,
+                               offset=used, shape=(n,))
+        self._keys = np.memmap(path, dtype=np.int64, mode=mode,
+                               offset=keys, shape=(n,))
+        self._values = np.memmap(path, dtype=self._dtype, mode=mode,
+                                 offset=values, shape=(n,))
+
+    def _allocSlots_(self, n):
+        """
+        Write an empty n-slot map to path + '.tmp' and map its arrays
+        The caller fills the slots and then calls _commit_()
+        Raises
+        - MemoryError if the file cannot be created
+        """
+        tmp = self._path + '.tmp'
+        total = self._fileSize_(n, self._dtype)
+        try:
+            with open(tmp, 'wb') as f:
+                f.truncate(total)
+            self._header = np.memmap(tmp, dtype=MmapHashMap.HEADER_DTYPE,
+                                     mode='r+', shape=(1,))
+            self._mapArrays_(tmp, n, 'r+')
+        except OSError:
+            raise MemoryError(
+                'MmapHashMap - unable to create {}'.format(tmp))
+        h = self._header
+        h['magic'] = MmapHashMap.MAGIC
+        h['version'] = MmapHashMap.VERSION
+        h['dtype'] = self._dtype.str.encode()
+        h['begin'] = 1
+        h['end'] = 0
+        self._capacity = n
+
+    def _commit_(self):
+        """
+        Flush the freshly written path + '.tmp' and rename it onto path
+        """
+        self._dirty = True
+        self.flush()
+        os.replace(self._path + '.tmp', self._path)
+
+    def _rehash_(self, new_capacity):
+        """
+        Rebuild the map in a new file of new_capacity slots
+        Effects
+        - the new file is complete and flushed before it replaces the old
+        one, so a crash leaves one of the two intact
+        """
+        IntHashMap._rehash_(self, new_capacity)
+        self._commit_()
+        # the caller is part-way through a change to the new file
+        self._modify_()
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'MmapHashMap - path: {}, slots: {}, size:{}, dtype:{}'.format(
+            self._path, self._capacity, self._size, self._dtype)
+
+    def _modify_(self):
+        """
+        Prepare for a change to the map
+        Effects
+        - on the first change since the last flush, the header's begin
+        counter is incremented and written to disk
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        if self._readOnly:
+            raise PermissionError(
+                'MmapHashMap - {} is open read-only'.format(self._path))
+        if not self._dirty:
+            self._dirty = True
+            self._header['begin'] += 1
+            self._header.flush()
+
+    def flush(self):
+        """
+        Write all changes back to the file
+        Effects
+        - the slot arrays are flushed, then the header is marked clean
+        """
+        if not self._dirty:
+            return
+        self._used.flush()
+        self._keys.flush()
+        self._values.flush()
+        h = self._header
+        h['capacity'] = self._capacity
+        h['size'] = self._size
+        h['minCapacity'] = self._minCapacity
+        h['loadFactor'] = self._loadFactor
+        h['end'] = h['begin']
+        h.flush()
+        self._dirty = False
+
+    def close(self):
+        """
+        Flush the map, if writable, and unmap the file
+        Effects
+        - the map object must not be used afterwards
+        """
+        if not self._readOnly:
+            self.flush()
+        self._header = self._used = self._keys = self._values = None
+
+    def clear(self):
+        """
+        Empty the map
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        self._modify_()
+        IntHashMap.clear(self)
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map; see IntHashMap.put
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        self._modify_()
+        IntHashMap.put(self, key, value)
+
+    def putUnique(self, key, value):
+        """
+        Store (key,value) iff key not already in map; see
+        IntHashMap.putUnique
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        self._modify_()
+        IntHashMap.putUnique(self, key, value)
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key; see IntHashMap.remove
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        self._modify_()
+        IntHashMap.remove(self, key)
+
+    def putMany(self, keys, values):
+        """
+        Store a batch of (key,value) pairs; see IntHashMap.putMany
+        Raises
+        - PermissionError if the map was opened read-only
+        """
+        self._modify_()
+        IntHashMap.putMany(self, keys, values)
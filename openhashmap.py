@@ -0,0 +1,425 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class OpenHashMap(MapABC):
+    """
+    Open-addressing implementation of the Map ADT
+    Entries live in parallel numpy arrays rather than in per-entry objects;
+    collisions are resolved by linear probing with Robin Hood displacement,
+    and removal shifts the following entries back so no tombstones are
+    left behind.
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _size (int) - number of entries in the Map
+    - _hash (function) - applied to a key yields an integer
+    - _capacity (int) - number of slots, always a power of 2
+    - _minCapacity (int) - the map never shrinks below this many slots
+    - _changes (int) - number of changes in entries since last resize check
+    - _loadFactor (float) - target load
+    - _dist (numpy 1D int32 array) - 1 + probe distance of the entry in
+    each slot, 0 if the slot is empty
+    - _hashes (numpy 1D int64 array) - hash of the key in each slot
+    - _keys (numpy 1D object array) - key in each slot
+    - _values (numpy 1D array of _dtype) - value in each slot
+    """
+    DEFAULT_CAPACITY = 16
+    DEFAULT_LOAD_FACTOR = 0.75
+    MAX_LOAD_FACTOR = 0.95
+    MAX_CAPACITY = 134217728
+    TRIGGER = 100
+    HASH_MASK = 0x7FFFFFFFFFFFFFFF
+
+    def __init__(self, hashfxn = hash, dtype = type(int()),
+                 capacity = DEFAULT_CAPACITY,
+                 loadFactor = DEFAULT_LOAD_FACTOR):
+        """
+        Constructor for open-addressing Map
+        Parameters
+        - hashfxn: function that hashes key to yield an int
+        - dtype: type of data in the map, default type(int())
+        - capacity: initial number of slots, rounded up to a power of 2,
+        default DEFAULT_CAPACITY
+        - loadFactor: target load factor, default DEFAULT_LOAD_FACTOR;
+        values above MAX_LOAD_FACTOR are clamped to it
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - MemoryError if allocation of the slot arrays fails
+        """
+        self._dtype = typemap(dtype)
+        self._size = 0
+        self._hash = hashfxn
+        n = 1
+        while n < capacity and n < OpenHashMap.MAX_CAPACITY:
+            n *= 2
+        self._capacity = n
+        self._minCapacity = n
+        self._changes = 0
+        self._loadFactor = min(loadFactor, OpenHashMap.MAX_LOAD_FACTOR)
+        if loadFactor < 0.001:
+            self._loadFactor = OpenHashMap.DEFAULT_LOAD_FACTOR
+        self._allocSlots_(n)
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'OpenHashMap - slots: {}, size:{}, dtype:{}'.format(
+            self._capacity, self._size, self._dtype)
+
+    def _allocSlots_(self, n):
+        """
+        Replace the slot arrays with n empty slots
+        Parameters
+        - n - number of slots, a power of 2
+        Raises
+        - MemoryError if allocation of the arrays fails
+        """
+        try:
+            dist = np.zeros(n, dtype=np.int32)
+            hashes = np.zeros(n, dtype=np.int64)
+            keys = np.full(n, None, dtype=object)
+            values = np.empty(n, dtype=self._dtype)
+        except:
+            raise MemoryError('OpenHashMap - unable to allocate slot arrays')
+        self._dist = dist
+        self._hashes = hashes
+        self._keys = keys
+        self._values = values
+        self._capacity = n
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, isEmpty() invoked on the map returns True
+        """
+        self._size = 0
+        self._changes = 0
+        self._dist[:] = 0
+        self._keys[:] = None
+
+    def _findSlot_(self, key, h):
+        """
+        Find the slot holding key
+        Parameters
+        - key - the key in which we are interested
+        - h - the masked hash of key
+        Returns
+        - index of the slot holding key, or -1 if key is not in the map
+        """
+        dist = self._dist
+        hashes = self._hashes
+        keys = self._keys
+        mask = self._capacity - 1
+        i = h & mask
+        d = 1
+        while True:
+            di = dist[i]
+            if di < d:
+                return -1
+            if hashes[i] == h and MapABC._equal_(key, keys[i]):
+                return i
+            i = (i + 1) & mask
+            d += 1
+
+    def _place_(self, key, value, h):
+        """
+        Robin Hood insertion of an entry known not to be in the map
+        Parameters
+        - key - key for the entry
+        - value - value associated with key
+        - h - the masked hash of key
+        Effects
+        - entry stored; entries closer to their home slot than the one
+        being placed are displaced further along the probe sequence
+        """
+        dist = self._dist
+        hashes = self._hashes
+        keys = self._keys
+        values = self._values
+        mask = self._capacity - 1
+        i = h & mask
+        d = 1
+        while True:
+            di = dist[i]
+            if di == 0:
+                dist[i] = d
+                hashes[i] = h
+                keys[i] = key
+                values[i] = value
+                return
+            if di < d:
+                dist[i], d = d, int(di)
+                hashes[i], h = h, int(hashes[i])
+                keys[i], key = key, keys[i]
+                values[i], value = value, values[i]
+            i = (i + 1) & mask
+            d += 1
+
+    def _rehash_(self, new_capacity):
+        """
+        Rebuild the slot arrays with new_capacity slots
+        Parameters
+        - new_capacity - number of slots, a power of 2
+        Raises
+        - MemoryError if allocation of the new arrays fails
+        """
+        live = self._dist > 0
+        hashes = self._hashes[live]
+        keys = self._keys[live]
+        values = self._values[live]
+        self._allocSlots_(new_capacity)
+        for j in range(len(keys)):
+            self._place_(keys[j], values[j], int(hashes[j]))
+
+    def _checkResize_(self, adding = 0):
+        """
+        Apply the growth policy after an entry was removed, or before
+        entries are added
+        Parameters
+        - adding - number of entries about to be added, default 0
+        Effects
+        - if the load exceeds _loadFactor the slot arrays double in size,
+        up to MAX_CAPACITY
+        - every TRIGGER changes, if the load has fallen below a quarter of
+        _loadFactor the slot arrays halve, down to _minCapacity
+        Raises
+        - MemoryError if the map is full or the slot arrays cannot grow;
+        the map is unchanged
+        """
+        size = self._size + adding
+        if size > self._loadFactor * self._capacity:
+            if self._capacity < OpenHashMap.MAX_CAPACITY:
+                self._rehash_(2 * self._capacity)
+            elif size >= self._capacity:
+                raise MemoryError('OpenHashMap - map is full')
+        elif self._changes >= OpenHashMap.TRIGGER:
+            self._changes = 0
+            if (self._size < self._loadFactor * self._capacity / 4 and
+                self._capacity > self._minCapacity):
+                self._rehash_(self._capacity // 2)
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - True if an entry with key is in the Map
+        - False otherwise
+        """
+        h = self._hash(key) & OpenHashMap.HASH_MASK
+        return self._findSlot_(key, h) >= 0
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - value associated with key
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        h = self._hash(key) & OpenHashMap.HASH_MASK
+        i = self._findSlot_(key, h)
+        if i < 0:
+            raise KeyError('OpenHashMap.get - invalid key')
+        return self._values[i]
+
+    def _insertNewEntry_(self, key, value, h):
+        """
+        Insert a new entry into the map
+        Parameters
+        - key - key associated with entry
+        - value - value associated with key
+        - h - the masked hash of key
+        Effects
+        - entry for (key, value) added to map
+        - one more entry in the map
+        Raises
+        - TypeError if type(value) not equal to _dtype
+        - This code assumes the caller has guaranteed that an entry with
+        key does not already exist in the map
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'OpenHashMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        self._checkResize_(1)
+        self._place_(key, value, h)
+        self._size += 1
+        self._changes += 1
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - if containsKey(key) is True, the value associated with it will be
+        replaced by the value parameter
+        - if not, (key,value) will be added to the map, and the map will
+        be larger by one more entry
+        Raises
+        - TypeError if type(value) is not equal to _dtype
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'OpenHashMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        h = self._hash(key) & OpenHashMap.HASH_MASK
+        i = self._findSlot_(key, h)
+        if i >= 0:
+            self._values[i] = value
+        else:
+            self._insertNewEntry_(key, value, h)
+
+    def putUnique(self, key, value):
+        """
+        Store (key,value) into the map iff key not already in map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - (key,value) will be added to the map, and the map will
+        be larger by one more entry
+        Raises
+        - KeyError if there is already an entry using key
+        - TypeError if type(value) is not equal to _dtype
+        """
+        h = self._hash(key) & OpenHashMap.HASH_MASK
+        if self._findSlot_(key, h) >= 0:
+            raise KeyError('OpenHashMap.putUnique - key already exists')
+        self._insertNewEntry_(key, value, h)
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key
+        Parameters
+        - key - the key in which we are interested
+        Effects
+        - entry associated with key removed from the map; the entries
+        following it in its probe run are shifted back one slot
+        - there is one fewer entry in the map
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        h = self._hash(key) & OpenHashMap.HASH_MASK
+        i = self._findSlot_(key, h)
+        if i < 0:
+            raise KeyError('OpenHashMap.remove - key does not exist')
+        dist = self._dist
+        mask = self._capacity - 1
+        j = (i + 1) & mask
+        while dist[j] > 1:
+            dist[i] = dist[j] - 1
+            self._hashes[i] = self._hashes[j]
+            self._keys[i] = self._keys[j]
+            self._values[i] = self._values[j]
+            i = j
+            j = (j + 1) & mask
+        dist[i] = 0
+        self._keys[i] = None
+        self._size -= 1
+        self._changes += 1
+        self._checkResize_()
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if the map has no entries
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the number of entries in the map, >= 0
+        """
+        return self._size
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - an unordered numpy 1D array of keys in the map
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        try:
+            x = self._keys[self._dist > 0]
+        except:
+            raise MemoryError(
+                'OpenHashMap.keyArray - unable to allocate array')
+        return x
+
+    def _genArray_(self):
+        """
+        Return an unordered array of (key,value) tuples
+        Returns
+        - numpy 1D array of (key,value) tuples
+        Raises
+        - MemoryError if array allocation fails
+        """
+        n = self._size
+        live = np.flatnonzero(self._dist)
+        try:
+            x = np.empty(n, dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'OpenHashMap._genArray_ - unable to allocate array')
+        for j in range(n):
+            i = live[j]
+            x[j] = (self._keys[i], self._values[i])
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return in unordered iterator over the map entries
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of the array of entries fails
+        """
+        n = self._size
+        x = self._genArray_()
+        return it.Iterator(n, x)
@@ -0,0 +1,212 @@
+# priority queue for monotone integer priorities, implemented as a radix heap
+from prioqueueABC import PrioQueueABC
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+from collections import deque
+
+class RadixPrioQueue(PrioQueueABC):
+    """
+    Priority Queue for monotone integer priorities, implemented as a radix
+    heap: a priority may never be below the last minimum removed (or
+    returned by min()), as with timestamps or BFS levels.
+    Priorities are bucketed by their offset from _start, which is never
+    negative even when _start is.  Entry x lives in bucket
+    ((x - _start) ^ (_last - _start)).bit_length(), so bucket 0 holds
+    exactly the entries whose priority equals _last.  When bucket 0 runs
+    dry, the lowest non-empty bucket is scanned for its minimum, which
+    becomes the new _last, and its entries are redistributed into lower
+    buckets.  An entry can only move down, at most once per bit of its
+    priority, so insert is O(1) and removeMin is O(1) amortized for
+    priorities of bounded width.  Equal priorities always share a bucket
+    and redistribution keeps bucket order, so they leave in FIFO order,
+    as in HeapPrioQueue.
+    Attributes
+    - _dtype (a class) - type of data values associated with priorities
+    default is type(int())
+    - _start (int) - lowest priority that may ever be inserted
+    - _last (int) - the last minimum; every priority is >= _last
+    - _size (int) - number of entries in the PrioQueue
+    - _buckets (list of deques) - (prio, datum) entries by bucket
+    - _nonempty (int) - bit i is set if _buckets[i] is not empty
+    """
+
+    def __init__(self, dtype = type(int()), start = 0):
+        """
+        Construct radix-heap priority queue ADT
+        Parameters
+        - dtype (class) - element type in the queue, default type(int())
+        - start (int) - lowest priority that may be inserted, default 0
+        Effects
+        - empty prio queue object ready to act like one
+        """
+        self._dtype = typemap(dtype)
+        self._start = int(start)
+        self.clear()
+
+    def __str__(self):
+        """Document metadata about the PrioQueue"""
+        return 'RadixPrioQueue - last:{}, size:{}, dtype:{}'.format(
+            self._last, self._size, self._dtype)
+
+    def clear(self):
+        """
+        Empty the PrioQueue, restarting the priorities at start
+        Effects
+        - after return, isEmpty() invoked on the PrioQueue returns True
+        """
+        self._last = self._start
+        self._size = 0
+        self._buckets = [deque()]
+        self._nonempty = 0
+
+    def _place_(self, prio, entry):
+        """
+        Append entry to the bucket for prio relative to _last
+        """
+        b = ((prio - self._start) ^ (self._last - self._start)).bit_length()
+        buckets = self._buckets
+        while len(buckets) <= b:
+            buckets.append(deque())
+        buckets[b].append(entry)
+        self._nonempty |= 1 << b
+
+    def insert(self, prio, datum):
+        """
+        Insert (prio, datum) into the correct place in the PrioQueue
+        Parameters
+        - prio - integer priority for this entry, >= the last minimum
+        - datum - datum associated with this priority in this entry
+        Effects
+        - (prio,datum) is appended to its bucket
+        Raises
+        - TypeError if prio is not an integer or type(datum) is different
+        from _dtype
+        - ValueError if prio is below the last minimum
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'RadixPrioQueue.insert - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        if not isinstance(prio, (int, np.integer)):
+            raise TypeError(
+                'RadixPrioQueue.insert - prio {!r} is not an integer'.format(
+                    prio))
+        prio = int(prio)
+        if prio < self._last:
+            raise ValueError(
+                'RadixPrioQueue.insert - prio {} < last minimum {}'.format(
+                    prio, self._last))
+        self._place_(prio, (prio, datum))
+        self._size += 1
+
+    def _settle_(self):
+        """
+        Make bucket 0 non-empty, advancing _last to the minimum priority
+        Assumptions
+        - the PrioQueue is not empty
+        """
+        if self._nonempty & 1:
+            return
+        low = self._nonempty & -self._nonempty
+        b = low.bit_length() - 1
+        bucket = self._buckets[b]
+        self._buckets[b] = deque()
+        self._nonempty ^= low
+        self._last = min(entry[0] for entry in bucket)
+        for entry in bucket:
+            self._place_(entry[0], entry)
+
+    def min(self):
+        """
+        Return (prio,datum) for the highest priority entry in the PrioQueue
+        Returns
+        - (prio,datum) for the highest priority entry in the PrioQueue
+        Effects
+        - the last minimum becomes prio, so lower priorities may no longer
+        be inserted
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._size == 0:
+            raise EmptyError('RadixPrioQueue.min - queue is empty')
+        self._settle_()
+        return self._buckets[0][0]
+
+    def removeMin(self):
+        """
+        remove and return (prio,datum) for the highest priority entry in the
+        PrioQueue
+        Returns
+        - (prio,datum) for the highest priority entry in the PrioQueue
+        Effects
+        - one fewer entries in the PrioQueue
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._size == 0:
+            raise EmptyError('RadixPrioQueue.removeMin - queue is empty')
+        self._settle_()
+        bucket = self._buckets[0]
+        ans = bucket.popleft()
+        if not bucket:
+            self._nonempty ^= 1
+        self._size -= 1
+        return ans
+
+    def isEmpty(self):
+        """
+        Indicate if the PrioQueue is empty
+        Returns
+        - True if the PrioQueue has no elements
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of elements in the PrioQueue
+        Returns
+        - the number of elements in the PrioQueue, >= 0
+        """
+        return self._size
+
+    def _genArray_(self):
+        """
+        Generate an array of (prio,value) tuples ordered by priority
+        Returns
+        - numpy 1D array of (prio,value) tuples ordered by priority, with
+        FIFO order among equal priorities
+        Raises
+        - MemoryError if array allocation failure
+        """
+        entries = []
+        for bucket in self._buckets:
+            entries.extend(bucket)
+        entries.sort(key=lambda entry: entry[0])
+        try:
+            x = np.empty(len(entries), dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'RadixPrioQueue._genArray_ - unable to allocate array'
+            )
+        for j, entry in enumerate(entries):
+            x[j] = entry
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        returns iterator over the (prio,datum) elements, in priority order
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of array fails
+        """
+        x = self._genArray_()
+        return it.Iterator(len(x), x)
@@ -6,8 +6,11 @@ setup(
     py_modules=['ADTexceptions',
                 'ADTiterator',
                 'ADTtypemap',
+                'growthpolicy',
                 'arraystack',
                 'dynamicarray',
+                'chunkedarray',
+                'mmaparray',
                 'listABC',
                 'stackABC',
                 'dequeABC',
@@ -17,8 +20,22 @@ setup(
                 'queueABC',
                 'prioqueueABC',
                 'heapprioqueue',
+                'blockingprioqueue',
+                'asyncqueue',
+                'arrayheapprioqueue',
+                'indexedheapprioqueue',
+                'radixprioqueue',
+                'timerwheel',
+                'topkheap',
                 'mapABC',
-                'hashmap'
+                'hashmap',
+                'openhashmap',
+                'inthashmap',
+                'cachemap',
+                'ttlmap',
+                'concurrenthashmap',
+                'mmaphashmap',
+                'treemap'
     ] 
 ,
     install_requires=[],
@@ -4,6 +4,29 @@ from arraystack import ArrayStack
 from boundedarraystackint import  BoundedArrayStackInt 
 from arrayqueue import ArrayQueue
 from lliststack import LListStack
+from hashmap import HashMap
+from openhashmap import OpenHashMap
+from inthashmap import IntHashMap
+from cachemap import CacheMap
+from ttlmap import TTLMap
+from concurrenthashmap import ConcurrentHashMap
+import threading
+import os
+from mmaphashmap import MmapHashMap
+from ADTexceptions import CorruptError, EmptyError, FullError
+from treemap import TreeMap
+from heapprioqueue import HeapPrioQueue
+from arrayheapprioqueue import ArrayHeapPrioQueue
+from indexedheapprioqueue import IndexedHeapPrioQueue
+from radixprioqueue import RadixPrioQueue
+from blockingprioqueue import BlockingPrioQueue
+from asyncqueue import AsyncQueueBase, AsyncQueue, AsyncPrioQueue
+from timerwheel import TimerWheel
+from topkheap import TopKHeap
+from growthpolicy import GrowthPolicy, GeometricGrowth, ChunkGrowth, CappedGrowth
+from chunkedarray import ChunkedArray
+from mmaparray import MmapArray
+import asyncio
 
 
 def test_dynamic_array_capacity():
@@ -16,6 +39,22 @@ def test_dynamic_array_add():
     [dynarr.add(i) for i in range(4)]
     assert (dynarr.toArray()==np.array([0,1,2,3])).all()
 
+def test_dynamic_array_extend_reserve():
+    dynarr=DynamicArray(capacity=2)
+    dynarr.extend(np.arange(5))
+    dynarr.extend(range(5, 8))
+    assert dynarr._capacity==10
+    assert (dynarr.toArray()==np.arange(8)).all()
+    try:
+        dynarr.extend([8, 9.0])
+        assert False
+    except TypeError:
+        assert dynarr.size()==8
+    dynarr.reserve(100)
+    assert dynarr._capacity==100
+    dynarr.shrinkToFit()
+    assert dynarr._capacity==8 and dynarr.get(7)==7
+
 def test_dynamic_array_memerr():
     try:
         DynamicArray(capacity=int(1e13))
@@ -67,3 +106,635 @@ def test_llstack_dtype_exception():
 
    assert not (exc is None)
 
+
+
+def test_hashmap_grows():
+    hmap=HashMap()
+    [hmap.put(i, i*i) for i in range(1000)]
+    assert hmap._capacity >= 1000/hmap._loadFactor
+    assert [hmap.get(i) for i in range(1000)]==[i*i for i in range(1000)]
+    assert sorted(hmap.keyArray())==list(range(1000))
+
+def test_hashmap_shrinks_after_remove():
+    hmap=HashMap()
+    [hmap.put(i, i) for i in range(1000)]
+    grown=hmap._capacity
+    [hmap.remove(i) for i in range(990)]
+    [hmap.get(i) for i in range(990, 1000) for j in range(50)]
+    assert hmap._capacity < grown
+    assert hmap.size()==10
+    assert not hmap.containsKey(5)
+    assert sorted(k for k, v in hmap)==list(range(990, 1000))
+
+def test_hashmap_rehash_never_overlaps():
+    hmap=HashMap()
+    start=hmap._startRehash_
+    def checked(new_capacity):
+        assert hmap._oldBuckets is None
+        start(new_capacity)
+    hmap._startRehash_=checked
+    [hmap.put(i, i) for i in range(20000)]
+    grown=hmap._capacity
+    [hmap.remove(i) for i in range(19990)]
+    assert hmap._capacity < grown // 4
+    assert sorted(hmap.keyArray())==list(range(19990, 20000))
+
+def test_openhashmap_put_get():
+    hmap=OpenHashMap()
+    [hmap.put(i, i*i) for i in range(1000)]
+    hmap.put(7, 0)
+    assert hmap.get(7)==0
+    assert [hmap.get(i) for i in range(8, 1000)]==[i*i for i in range(8, 1000)]
+    assert sorted(k for k, v in hmap)==list(range(1000))
+
+def test_openhashmap_remove_collisions():
+    hmap=OpenHashMap(hashfxn=lambda k: k % 3)
+    [hmap.put(i, i) for i in range(30)]
+    [hmap.remove(i) for i in range(0, 30, 2)]
+    assert sorted(hmap.keyArray())==list(range(1, 30, 2))
+    assert not hmap.containsKey(4)
+    assert [hmap.get(i) for i in range(1, 30, 2)]==list(range(1, 30, 2))
+
+def test_openhashmap_failed_grow_leaves_size():
+    hmap=OpenHashMap()
+    i=0
+    while hmap.size() < hmap._loadFactor * hmap._capacity:
+        hmap.put(i, i)
+        i+=1
+    def fail(n):
+        raise MemoryError('OpenHashMap - unable to allocate slot arrays')
+    hmap._allocSlots_=fail
+    try:
+        hmap.put(i, i)
+        assert False
+    except MemoryError:
+        pass
+    assert hmap.size()==i and not hmap.containsKey(i)
+    assert sorted(hmap.keyArray())==list(range(i))
+
+def test_hashmap_putmany_getmany():
+    hmap=HashMap()
+    hmap.putMany([], [])
+    assert hmap.isEmpty()
+    hmap.put(3, -1)
+    hmap.putMany(np.arange(1000), np.arange(1000)*2)
+    assert hmap.size()==1000
+    assert (hmap.getMany([3, 10, 999])==np.array([6, 20, 1998])).all()
+    assert (hmap.getMany([5, 2000], default=-1)==np.array([10, -1])).all()
+    assert (hmap.containsMany([1, 1000])==np.array([True, False])).all()
+
+def test_hashmap_putmany_type_error():
+    hmap=HashMap()
+    exc=None
+    try:
+        hmap.putMany([1, 2], [1.5, 2.5])
+    except Exception as e:
+        exc=e
+    assert type(exc)==TypeError
+    assert hmap.isEmpty()
+
+def test_inthashmap_put_remove():
+    hmap=IntHashMap(dtype=float)
+    [hmap.put(i, i/2) for i in range(-500, 500)]
+    [hmap.remove(i) for i in range(-500, 500, 3)]
+    live=[i for i in range(-500, 500) if (i+500) % 3]
+    assert sorted(hmap.keyArray())==live
+    assert [hmap.get(i) for i in live]==[i/2 for i in live]
+
+def test_inthashmap_many():
+    hmap=IntHashMap()
+    hmap.putMany(np.array([5, 6, 5]), np.array([1, 2, 3]))
+    assert hmap.size()==2
+    assert (hmap.getMany([5, 6, 7], default=0)==np.array([3, 2, 0])).all()
+    assert (hmap.containsMany([6, 7])==np.array([True, False])).all()
+    assert len(hmap.getMany([]))==0
+    for many in (hmap.getMany, hmap.containsMany):
+        try:
+            many([1.5])
+            assert False
+        except TypeError:
+            pass
+
+def test_cachemap_lru_evicts_oldest():
+    evicted=[]
+    cache=CacheMap(maxSize=3, onEvict=lambda k, v: evicted.append(k))
+    [cache.put(i, i) for i in range(3)]
+    cache.get(0)
+    cache.put(3, 3)
+    assert evicted==[1]
+    assert sorted(cache.keyArray())==[0, 2, 3]
+    assert cache.stats()=={'hits': 1, 'misses': 0, 'evictions': 1}
+
+def test_cachemap_lfu_and_clock():
+    lfu=CacheMap(maxSize=2, policy='lfu')
+    lfu.put(1, 1); lfu.put(2, 2); lfu.get(1); lfu.put(3, 3)
+    assert sorted(lfu.keyArray())==[1, 3]
+    clock=CacheMap(maxSize=2, policy='clock')
+    clock.put(1, 1); clock.put(2, 2); clock.get(1); clock.put(3, 3)
+    assert sorted(clock.keyArray())==[1, 3]
+
+class FakeClock:
+    def __init__(self):
+        self.now=0.0
+    def __call__(self):
+        return self.now
+
+def test_ttlmap_lazy_expiry():
+    clock=FakeClock()
+    tmap=TTLMap(ttl=10, clock=clock)
+    tmap.put(1, 1)
+    tmap.put(2, 2, ttl=100)
+    clock.now=10.5
+    assert not tmap.containsKey(1)
+    assert tmap.get(2)==2
+
+def test_ttlmap_wheel_expiry():
+    clock=FakeClock()
+    tmap=TTLMap(ttl=5, clock=clock)
+    [tmap.put(i, i, ttl=i+1) for i in range(10000)]
+    clock.now=5000
+    assert tmap.expire()==5000
+    assert tmap.size()==5000
+    assert sorted(tmap.keyArray())==list(range(5000, 10000))
+
+def test_concurrenthashmap_merge_threads():
+    cmap=ConcurrentHashMap()
+    def work():
+        for i in range(2000):
+            cmap.merge(i % 50, 1, lambda old, new: old + new)
+    threads=[threading.Thread(target=work) for t in range(4)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert cmap.size()==50
+    assert all(v==160 for k, v in cmap)
+
+def test_concurrenthashmap_compute():
+    cmap=ConcurrentHashMap(shards=4)
+    cmap.put(1, 10)
+    assert cmap.compute(1, lambda k, v: v * 2)==20
+    assert cmap.computeIfAbsent(2, lambda k: 7)==7
+    assert cmap.computeIfAbsent(2, lambda k: 8)==7
+    cmap.compute(1, lambda k, v: None)
+    assert sorted(cmap.keyArray())==[2]
+
+def test_mmaphashmap_reopen(tmp_path):
+    path=str(tmp_path / 'map.bin')
+    hmap=MmapHashMap(path, dtype=float)
+    [hmap.put(i, i/4) for i in range(1000)]
+    hmap.close()
+    ro=MmapHashMap(path, mode='r')
+    assert ro.size()==1000
+    assert ro.get(999)==999/4
+
+def test_mmaphashmap_torn_write(tmp_path):
+    path=str(tmp_path / 'map.bin')
+    hmap=MmapHashMap(path)
+    hmap.put(1, 1)
+    hmap.flush()
+    hmap.put(2, 2)
+    exc=None
+    try:
+        MmapHashMap(path, mode='r')
+    except Exception as e:
+        exc=e
+    assert type(exc)==CorruptError
+
+def test_mmaphashmap_truncated(tmp_path):
+    path=str(tmp_path / 'map.bin')
+    hmap=MmapHashMap(path)
+    [hmap.put(i, i) for i in range(1000)]
+    hmap.close()
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+    for mode in ('r', 'r+'):
+        try:
+            MmapHashMap(path, mode=mode)
+            assert False
+        except CorruptError:
+            pass
+
+def test_hashmap_lazy_iteration():
+    hmap=HashMap()
+    [hmap.put(i, i) for i in range(100)]
+    assert sorted(hmap.keys())==list(range(100))
+    assert sum(hmap.values())==sum(range(100))
+    chunks=list(hmap.itemChunks(32))
+    assert [len(k) for k, v in chunks]==[32, 32, 32, 4]
+    assert sorted(np.concatenate([v for k, v in chunks]))==list(range(100))
+
+def test_hashmap_iteration_fails_fast():
+    hmap=HashMap()
+    [hmap.put(i, i) for i in range(100)]
+    exc=None
+    try:
+        for k in hmap.keys():
+            hmap.get(k)
+            if k == 50:
+                hmap.remove(k)
+    except Exception as e:
+        exc=e
+    assert type(exc)==RuntimeError
+    for walk in (hmap.keys, hmap.items, lambda: hmap.keyChunks(8)):
+        g=walk()
+        hmap.put(1000, 0)
+        hmap.remove(1000)
+        try:
+            list(g)
+            assert False
+        except RuntimeError:
+            pass
+    assert hmap._iterating==0
+
+def test_treemap_order_and_range():
+    tmap=TreeMap()
+    [tmap.put(i, i) for i in np.random.permutation(1000).tolist()]
+    [tmap.remove(i) for i in range(0, 1000, 2)]
+    assert list(tmap.keyArray())==list(range(1, 1000, 2))
+    assert list(tmap.rangeKeys(100, 110))==[101, 103, 105, 107, 109]
+    assert tmap.floorKey(100)==99
+    assert tmap.ceilingKey(100)==101
+    assert tmap.rank(101)==50
+    assert tmap.select(50)==101
+
+def test_treemap_load_sorted():
+    tmap=TreeMap()
+    tmap.loadSorted(np.arange(0, 10000, 5), np.arange(2000))
+    assert tmap.size()==2000
+    assert tmap.get(9995)==1999
+    assert tmap.firstKey()==0 and tmap.lastKey()==9995
+    tmap.put(7, 7)
+    assert tmap.rank(10)==3
+
+def test_arrayheapprioqueue_fifo_ties():
+    pq=ArrayHeapPrioQueue(capacity=2)
+    [pq.insert(i % 3, i) for i in range(12)]
+    out=[pq.removeMin() for i in range(12)]
+    assert [d for p, d in out]==[0, 3, 6, 9, 1, 4, 7, 10, 2, 5, 8, 11]
+
+def test_arrayheapprioqueue_toarray():
+    pq=ArrayHeapPrioQueue()
+    [pq.insert(-i, i) for i in range(50)]
+    assert [d for p, d in pq.toArray()]==list(range(49, -1, -1))
+    assert pq.size()==50
+
+def test_heapprioqueue_fromarrays_stable():
+    pq=HeapPrioQueue.fromArrays(np.array([2, 1, 2, 1, 0]), np.arange(5))
+    pq.insertMany([1, 0], [5, 6])
+    assert pq.size()==7
+    assert [d for p, d in pq.removeMinMany(4)]==[4, 6, 1, 3]
+    assert [d for p, d in pq.removeMinMany(10)]==[5, 0, 2]
+    assert pq.isEmpty()
+
+def test_heapprioqueue_insertmany_resizes_once():
+    pq=HeapPrioQueue(capacity=2)
+    pq.insertMany(np.random.random(1000), np.arange(1000))
+    assert pq._capacity==1001
+    prios=[p for p, d in pq.toArray()]
+    assert prios==sorted(prios)
+
+def test_heapprioqueue_ordered_iteration_in_place():
+    pq=HeapPrioQueue()
+    [pq.insert(i % 4, i) for i in range(20)]
+    it=iter(pq)
+    assert [next(it) for i in range(3)]==[(0, 0), (0, 4), (0, 8)]
+    assert pq.size()==20
+    assert sorted(d for p, d in pq.rawItems())==list(range(20))
+    assert [d for p, d in pq]==[d for p, d in pq.removeMinMany(20)]
+
+def test_indexedheapprioqueue_change_priority():
+    pq=IndexedHeapPrioQueue(capacity=2)
+    h=[pq.insert(10 + i, i) for i in range(10)]
+    pq.changePriority(h[7], 0)
+    pq.changePriority(h[0], 50)
+    pq.changePriority(h[3], 12)
+    assert [d for p, d in pq.removeMinMany(10)]==[7, 1, 2, 3, 4, 5, 6, 8, 9, 0]
+    assert not pq.contains(h[7])
+
+def test_indexedheapprioqueue_remove():
+    pq=IndexedHeapPrioQueue()
+    h=pq.insertMany([i % 5 for i in range(20)], list(range(20)))
+    assert pq.remove(h[5])==(0, 5)
+    assert not pq.contains(h[5]) and pq.contains(h[6])
+    try:
+        pq.remove(h[5])
+        assert False
+    except KeyError:
+        pass
+    assert [d for p, d in pq][:4]==[0, 10, 15, 1]
+
+def test_heapprioqueue_arity():
+    for d in (3, 4, 8):
+        pq=HeapPrioQueue.fromArrays([i % 5 for i in range(40)], list(range(40)), arity=d)
+        [pq.insert(i % 7, 40 + i) for i in range(30)]
+        out=[pq.removeMin() for i in range(70)]
+        assert out==sorted(out)
+
+def test_radixprioqueue_fifo_ties():
+    pq=RadixPrioQueue()
+    [pq.insert(i % 4, i) for i in range(12)]
+    assert [pq.removeMin() for i in range(5)]==[(0, 0), (0, 4), (0, 8), (1, 1), (1, 5)]
+    pq.insert(1, 12)
+    pq.insert(70, 13)
+    assert [d for p, d in pq]==[9, 12, 2, 6, 10, 3, 7, 11, 13]
+
+def test_radixprioqueue_monotone():
+    pq=RadixPrioQueue(start=5)
+    pq.insert(9, 0)
+    assert pq.removeMin()==(9, 0)
+    try:
+        pq.insert(8, 1)
+        assert False
+    except ValueError:
+        pass
+    assert pq.isEmpty()
+
+def test_radixprioqueue_negative_start():
+    pq=RadixPrioQueue(start=-8)
+    pq.insert(5, 0)
+    pq.insert(-3, 1)
+    pq.insert(-8, 2)
+    pq.insert(0, 3)
+    assert [pq.removeMin() for i in range(4)]==[(-8, 2), (-3, 1), (0, 3),
+                                                (5, 0)]
+
+def test_blockingprioqueue_backpressure():
+    pq=BlockingPrioQueue(maxsize=2)
+    pq.put(2, 0)
+    pq.put(1, 1)
+    try:
+        pq.put(0, 2, timeout=0.01)
+        assert False
+    except FullError:
+        pass
+    t=threading.Timer(0.05, pq.get)
+    t.start()
+    pq.put(0, 3, timeout=5)
+    t.join()
+    assert [d for p, d in pq.drain(10)]==[3, 0]
+    try:
+        pq.get(timeout=0.01)
+        assert False
+    except EmptyError:
+        pass
+
+def test_blockingprioqueue_put_type_error_does_not_wait():
+    pq=BlockingPrioQueue(maxsize=1)
+    pq.put(0, 0)
+    try:
+        pq.put(1, 1.5)
+        assert False
+    except TypeError:
+        pass
+    assert pq.size()==1
+
+def test_blockingprioqueue_mpmc():
+    pq=BlockingPrioQueue(maxsize=8)
+    out=[]
+    def produce(t):
+        for i in range(250):
+            pq.put(i, 1000 * t + i)
+    def consume():
+        for i in range(500):
+            out.append(pq.get(timeout=5)[1])
+    threads=[threading.Thread(target=produce, args=(t,)) for t in range(4)]
+    threads+=[threading.Thread(target=consume) for t in range(2)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert sorted(out)==sorted(1000 * t + i for t in range(4) for i in range(250))
+    assert pq.isEmpty()
+
+def test_asyncqueue_bounded():
+    async def main():
+        q=AsyncQueue(maxsize=2)
+        out=[]
+        async def consume():
+            for i in range(10):
+                out.append(await q.get())
+                await asyncio.sleep(0)
+        task=asyncio.ensure_future(consume())
+        for i in range(10):
+            await q.put(i)
+            assert q.size()<=2
+        await task
+        try:
+            q.get_nowait()
+            assert False
+        except EmptyError:
+            pass
+        return out
+    assert asyncio.run(main())==list(range(10))
+
+def test_asyncprioqueue_order():
+    async def main():
+        q=AsyncPrioQueue(maxsize=3)
+        [q.put_nowait(i % 2, i) for i in range(3)]
+        try:
+            q.put_nowait(0, 3)
+            assert False
+        except FullError:
+            pass
+        waiting=asyncio.ensure_future(q.put(0, 3))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        first=await q.get()
+        await waiting
+        return [first]+[await q.get() for i in range(3)]
+    assert asyncio.run(main())==[(0, 0), (0, 2), (0, 3), (1, 1)]
+
+def test_asyncqueuebase_abstract():
+    try:
+        AsyncQueueBase()
+        assert False
+    except TypeError:
+        pass
+
+def test_timerwheel_order_and_cancel():
+    w=TimerWheel(tick=0.5)
+    deadlines=[7.25, 3.0, 100000.0, 3.0, 0.1, 5000.0, 64.0, 4096.5]
+    h=[w.insert(d, i) for i, d in enumerate(deadlines)]
+    assert w.cancel(h[6]) and not w.cancel(h[6])
+    assert w.min()==(0.1, 4)
+    assert [d for p, d in w]==[4, 1, 3, 0, 7, 5, 2]
+    assert [d for p, d in w.advance(10)]==[4, 1, 3, 0]
+    w.insert(1.0, 8)
+    assert w.cancel(h[5])
+    assert [w.removeMin() for i in range(3)]==[(1.0, 8), (4096.5, 7), (100000.0, 2)]
+    assert w.isEmpty()
+
+def test_timerwheel_matches_heap():
+    w=TimerWheel()
+    pq=HeapPrioQueue()
+    rng=np.random.RandomState(3)
+    handles=[]
+    for d in rng.randint(0, 300000, size=500).tolist():
+        handles.append(w.insert(d, len(handles)))
+    for i in range(0, 500, 3):
+        w.cancel(handles[i])
+    [pq.insert(h._deadline, h._datum) for h in handles if w.contains(h)]
+    assert [w.removeMin() for i in range(w.size())]==[pq.removeMin() for i in range(pq.size())]
+
+def test_topkheap_descending_stable():
+    h=TopKHeap(4)
+    h.offerMany([5, 1, 5, 9, 3, 5, 7, 0], np.arange(8))
+    assert h.threshold()==5.0
+    assert not h.offer(5, 8)
+    assert [d for p, d in h]==[3, 6, 0, 2]
+
+def test_topkheap_ascending_offermany():
+    h=TopKHeap(10, order='ascending')
+    prios=np.random.RandomState(1).random_sample(10000)
+    for i in range(0, 10000, 1000):
+        h.offerMany(prios[i:i + 1000], np.arange(i, i + 1000))
+    assert [d for p, d in h]==np.argsort(prios)[:10].tolist()
+
+def test_growth_policies():
+    stack=ArrayStack(capacity=1, growth=ChunkGrowth(10))
+    [stack.push(i) for i in range(25)]
+    assert stack._capacity==31
+    assert stack.slack()==6 * stack._array.itemsize
+    dynarr=DynamicArray(capacity=1, growth=CappedGrowth(8))
+    [dynarr.add(i) for i in range(20)]
+    assert dynarr._capacity==24
+    assert (dynarr.toArray()==np.arange(20)).all()
+    try:
+        GrowthPolicy()
+        assert False
+    except TypeError:
+        pass
+
+def test_growth_shrink_hysteresis():
+    queue=ArrayQueue(capacity=4, growth=GeometricGrowth(shrinkBelow=0.25, minCapacity=4))
+    [queue.enqueue(i) for i in range(64)]
+    assert queue._capacity==64
+    [queue.dequeue() for i in range(48)]
+    assert queue._capacity==64
+    queue.dequeue()
+    assert queue._capacity==30
+    assert queue.nbytes()==30 * queue._array.itemsize
+    assert list(queue)==list(range(49, 64))
+    pq=HeapPrioQueue(capacity=2, growth=GeometricGrowth(shrinkBelow=0.25))
+    [pq.insert(i, i) for i in range(100)]
+    pq.removeMinMany(95)
+    assert pq._capacity==12 and [d for p, d in pq]==[95, 96, 97, 98, 99]
+
+def test_chunkedarray_add_get_set():
+    arr=ChunkedArray(chunkSize=3)
+    [arr.add(i) for i in range(10)]
+    assert arr._chunkSize==4 and len(arr._chunks)==3
+    first=arr._chunks[0]
+    arr.extend(np.arange(10, 30))
+    assert arr._chunks[0] is first
+    arr.set(13, -1)
+    assert arr.get(13)==-1 and arr.size()==30
+    try:
+        arr.get(30)
+        assert False
+    except IndexError:
+        pass
+
+def test_chunkedarray_toarray_and_chunks():
+    arr=ChunkedArray(chunkSize=8)
+    arr.extend(range(20))
+    assert [len(c) for c in arr.chunks()]==[8, 8, 4]
+    assert (arr.toArray()==np.arange(20)).all()
+    assert list(arr)==list(range(20))
+    arr.clear()
+    assert arr.toArray().size==0 and arr.isEmpty()
+
+def test_mmaparray_reopen_readonly(tmp_path):
+    path=str(tmp_path / 'list.bin')
+    arr=MmapArray(path, dtype=float, extent=4096)
+    [arr.add(i / 2) for i in range(600)]
+    arr.extend(np.arange(600, 1000) / 2)
+    assert arr._capacity==1024
+    arr.close()
+    ro=MmapArray(path, mode='r')
+    assert ro.size()==1000 and ro.get(999)==499.5
+    assert (ro.toArray()==np.arange(1000) / 2).all()
+    try:
+        ro.set(0, 1.0)
+        assert False
+    except PermissionError:
+        pass
+
+def test_mmaparray_dtype_and_torn_write(tmp_path):
+    path=str(tmp_path / 'list.bin')
+    arr=MmapArray(path)
+    arr.add(1)
+    try:
+        arr.add(1.0)
+        assert False
+    except TypeError:
+        pass
+    try:
+        MmapArray(path, mode='r')
+        assert False
+    except CorruptError:
+        pass
+    arr.flush()
+    assert list(MmapArray(path, mode='r'))==[1]
+    try:
+        arr.add(1.0)
+        assert False
+    except TypeError:
+        pass
+    assert list(MmapArray(path, mode='r'))==[1]
+
+def test_mmaparray_truncated(tmp_path):
+    path=str(tmp_path / 'list.bin')
+    arr=MmapArray(path, extent=4096)
+    arr.extend(np.arange(3000))
+    arr.close()
+    with open(path, 'r+b') as f:
+        f.truncate(MmapArray.HEADER_SIZE + 100 * 8)
+    for mode in ('r', 'r+'):
+        try:
+            MmapArray(path, mode=mode)
+            assert False
+        except CorruptError:
+            pass
+
+def test_dynamic_array_views_zero_copy():
+    dynarr=DynamicArray(capacity=8)
+    dynarr.extend(np.arange(8))
+    view=dynarr[2:6]
+    view[0]=-2
+    assert dynarr.get(2)==-2
+    assert np.asarray(dynarr).base is dynarr._array
+    buf=dynarr.toBuffer()
+    assert buf[2]==-2 and dynarr.isCurrent(buf)
+    assert (dynarr[::-2]==np.array([7, 5, 3, 1])).all()
+
+def test_dynamic_array_views_invalidated():
+    dynarr=DynamicArray(capacity=2)
+    dynarr.extend([0, 1])
+    view=dynarr[0:2]
+    buf=dynarr.toBuffer()
+    it=iter(dynarr)
+    next(it)
+    dynarr.add(2)
+    assert not dynarr.isCurrent(view) and not dynarr.isCurrent(buf)
+    try:
+        view[0]=5
+        assert False
+    except ValueError:
+        pass
+    try:
+        next(it)
+        assert False
+    except RuntimeError:
+        pass
+    assert list(dynarr)==[0, 1, 2]
+
+def test_dynamic_array_derived_views_not_retired():
+    dynarr=DynamicArray(capacity=12)
+    dynarr.extend(np.arange(12))
+    derived=dynarr[0:10][2:4]
+    buf=dynarr.toBuffer()
+    sub=buf[0:2]
+    dynarr.add(12)
+    assert not dynarr.isCurrent(buf)
+    assert not dynarr.isCurrent(derived) and not dynarr.isCurrent(sub)
+    derived[0]=-1
+    sub[0]=-1
+    assert dynarr.get(2)==2 and dynarr.get(0)==0
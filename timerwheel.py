@@ -0,0 +1,346 @@
+# timer scheduler implemented as a hierarchical timing wheel
+from prioqueueABC import PrioQueueABC
+import numpy as np
+import math
+import heapq
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class TimerWheel(PrioQueueABC):
+    """
+    Priority Queue of timers keyed by deadline, implemented as a
+    hierarchical timing wheel, for workloads where most timers are
+    cancelled before they fire
+    Deadlines are bucketed into ticks of width _tick.  The wheel has
+    LEVELS levels of SLOTS slots, as in TTLMap; a slot at level l spans
+    SLOTS**l ticks, and each slot is a dict so that a timer is removed in
+    O(1).  insert and cancel are O(1).  min and removeMin move a cursor
+    forward through the ticks, jumping over empty levels and cascading
+    slots down as their span is reached; timers whose tick has been
+    reached move to a small heap, _ready, so they leave in exact
+    (deadline, insertion) order, FIFO among equal deadlines.  advance(now)
+    removes every timer due by now.
+    Attributes
+    - _dtype (a class) - type of data values associated with deadlines
+    - _tick (float) - width of a level-0 slot, in deadline units
+    - _size (int) - number of pending timers
+    - _sequenceNo (int) - the next sequence number to assign to a timer
+    - _wheel (list of lists of dicts) - _wheel[level][slot] holds the
+    timers to be examined when that slot is reached
+    - _counts (list of int) - number of timers in each level
+    - _ready (list) - heap of (deadline, seqno, Timer) whose tick is at
+    most _now; cancelled timers are dropped from it lazily
+    - _now (int) - the last tick reached by the cursor
+    """
+    DEFAULT_TICK = 1.0
+    LEVELS = 4
+    SLOT_BITS = 6
+    SLOTS = 1 << SLOT_BITS
+
+    class Timer:
+        """handle for a pending timer"""
+        def __init__(self, deadline, datum, seqno, tick):
+            """
+            Constructor for timer
+            Parameters
+            - deadline - priority of the timer
+            - datum - datum associated with the timer
+            - seqno - sequence number for FIFO order among equal deadlines
+            - tick - wheel tick containing deadline
+            """
+            self._deadline = deadline
+            self._datum = datum
+            self._seqno = seqno
+            self._tick = tick
+            # wheel level and slot holding the timer; level -1 for _ready,
+            # None once the timer has fired or been cancelled
+            self._level = None
+            self._slot = None
+
+    def __init__(self, dtype = type(int()), tick = DEFAULT_TICK, start = 0):
+        """
+        Construct timing-wheel priority queue ADT
+        Parameters
+        - dtype (class) - element type in the queue, default type(int())
+        - tick (float) - resolution of the wheel, default DEFAULT_TICK
+        - start - deadline at which the cursor starts, default 0; earlier
+        deadlines are accepted but bypass the wheel
+        Effects
+        - empty prio queue object ready to act like one
+        Raises
+        - ValueError if tick is not positive
+        """
+        if tick <= 0:
+            raise ValueError('TimerWheel - tick must be positive')
+        self._dtype = typemap(dtype)
+        self._tick = tick
+        self._start = start
+        self._sequenceNo = 1
+        self.clear()
+
+    def __str__(self):
+        """Document metadata about the PrioQueue"""
+        return 'TimerWheel - tick:{}, size:{}, dtype:{}'.format(
+            self._tick, self._size, self._dtype)
+
+    def clear(self):
+        """
+        Empty the PrioQueue, restarting the cursor at start
+        Effects
+        - after return, isEmpty() invoked on the PrioQueue returns True
+        - handles of timers that were pending are no longer pending
+        """
+        if getattr(self, '_wheel', None) is not None:
+            for timer in self._timers_():
+                timer._level = None
+        self._wheel = [[{} for s in range(TimerWheel.SLOTS)]
+                       for l in range(TimerWheel.LEVELS)]
+        self._counts = [0] * TimerWheel.LEVELS
+        self._ready = []
+        self._size = 0
+        self._now = math.floor(self._start / self._tick)
+
+    def _schedule_(self, timer):
+        """
+        File timer in _ready if its tick has been reached, else in the
+        wheel slot that will be reached at, or on the way down to, its tick
+        """
+        d = timer._tick
+        delta = d - self._now
+        if delta <= 0:
+            timer._level = -1
+            heapq.heappush(self._ready,
+                           (timer._deadline, timer._seqno, timer))
+            return
+        level = 0
+        while (level < TimerWheel.LEVELS - 1 and
+               delta >= 1 << (TimerWheel.SLOT_BITS * (level + 1))):
+            level += 1
+        slot = (d >> (TimerWheel.SLOT_BITS * level)) & (TimerWheel.SLOTS - 1)
+        self._wheel[level][slot][timer] = None
+        self._counts[level] += 1
+        timer._level = level
+        timer._slot = slot
+
+    def _take_(self, level, slot):
+        """Empty a wheel slot, returning its timers"""
+        pending = self._wheel[level][slot]
+        if pending:
+            self._wheel[level][slot] = {}
+            self._counts[level] -= len(pending)
+        return pending
+
+    def _processTick_(self, t):
+        """
+        Move the cursor to tick t
+        Effects
+        - higher-level slots whose span starts at t are cascaded down
+        - timers in the level-0 slot for t are moved to _ready
+        """
+        self._now = t
+        mask = TimerWheel.SLOTS - 1
+        level = 1
+        while (level < TimerWheel.LEVELS and
+               (t >> (TimerWheel.SLOT_BITS * (level - 1))) & mask == 0):
+            for timer in self._take_(level, (t >> (TimerWheel.SLOT_BITS *
+                                                   level)) & mask):
+                self._schedule_(timer)
+            level += 1
+        for timer in self._take_(0, t & mask):
+            self._schedule_(timer)
+
+    def _settle_(self):
+        """
+        Make the head of _ready the live timer with the earliest deadline
+        Assumptions
+        - the PrioQueue is not empty
+        """
+        ready = self._ready
+        mask = TimerWheel.SLOTS - 1
+        level0 = self._wheel[0]
+        while True:
+            while ready and ready[0][2]._level is None:
+                heapq.heappop(ready)
+            if ready:
+                return
+            level = 0
+            while (level < TimerWheel.LEVELS - 1 and
+                   self._counts[level] == 0):
+                level += 1
+            if level > 0:
+                # every level below is empty: jump straight to the next
+                # tick at which a slot of this level is reached
+                span = 1 << (TimerWheel.SLOT_BITS * level)
+                t = (self._now // span + 1) * span
+            else:
+                t = self._now + 1
+                stop = t | mask
+                while t & mask and t < stop and not level0[t & mask]:
+                    t += 1
+            self._processTick_(t)
+
+    def insert(self, deadline, datum):
+        """
+        Schedule a timer for datum at deadline
+        Parameters
+        - deadline - numeric priority for this entry
+        - datum - datum associated with this priority in this entry
+        Returns
+        - handle for the timer, for cancel and contains
+        Raises
+        - TypeError if type(datum) is different from _dtype
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'TimerWheel.insert - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        timer = TimerWheel.Timer(deadline, datum, self._sequenceNo,
+                                 math.floor(deadline / self._tick))
+        self._sequenceNo += 1
+        self._schedule_(timer)
+        self._size += 1
+        return timer
+
+    def contains(self, handle):
+        """
+        Indicate whether handle is a timer that is still pending
+        """
+        return handle._level is not None
+
+    def cancel(self, handle):
+        """
+        Cancel a pending timer in O(1)
+        Parameters
+        - handle - value returned by insert
+        Returns
+        - True if the timer was pending, False if it had already been
+        removed or cancelled
+        Effects
+        - one fewer entries in the PrioQueue
+        """
+        level = handle._level
+        if level is None:
+            return False
+        if level >= 0:
+            del self._wheel[level][handle._slot][handle]
+            self._counts[level] -= 1
+        handle._level = None
+        self._size -= 1
+        return True
+
+    def min(self):
+        """
+        Return (deadline,datum) for the earliest pending timer
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._size == 0:
+            raise EmptyError('TimerWheel.min - queue is empty')
+        self._settle_()
+        timer = self._ready[0][2]
+        return (timer._deadline, timer._datum)
+
+    def removeMin(self):
+        """
+        remove and return (deadline,datum) for the earliest pending timer
+        Returns
+        - (deadline,datum) for the earliest pending timer
+        Effects
+        - one fewer entries in the PrioQueue
+        Raises
+        - EmptyError if the PrioQueue is empty
+        """
+        if self._size == 0:
+            raise EmptyError('TimerWheel.removeMin - queue is empty')
+        self._settle_()
+        timer = heapq.heappop(self._ready)[2]
+        timer._level = None
+        self._size -= 1
+        return (timer._deadline, timer._datum)
+
+    def advance(self, now):
+        """
+        Remove and return every timer whose deadline is at or before now
+        Parameters
+        - now - the current time, in deadline units
+        Returns
+        - numpy 1D array of (deadline,datum) tuples in deadline order
+        """
+        due = []
+        while self._size > 0:
+            self._settle_()
+            if self._ready[0][0] > now:
+                break
+            due.append(self.removeMin())
+        try:
+            x = np.empty(len(due), dtype=type(tuple))
+        except:
+            raise MemoryError('TimerWheel.advance - unable to allocate array')
+        for j, entry in enumerate(due):
+            x[j] = entry
+        return x
+
+    def isEmpty(self):
+        """
+        Indicate if the PrioQueue is empty
+        Returns
+        - True if the PrioQueue has no elements
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of elements in the PrioQueue
+        Returns
+        - the number of elements in the PrioQueue, >= 0
+        """
+        return self._size
+
+    def _timers_(self):
+        """Generator over the pending timers, in no particular order"""
+        for entry in self._ready:
+            if entry[2]._level is not None:
+                yield entry[2]
+        for level in self._wheel:
+            for slot in level:
+                yield from slot
+
+    def _genArray_(self):
+        """
+        Generate an array of (deadline,datum) tuples ordered by deadline
+        Returns
+        - numpy 1D array of (deadline,datum) tuples ordered by deadline,
+        with FIFO order among equal deadlines
+        Raises
+        - MemoryError if array allocation failure
+        """
+        timers = sorted(self._timers_(),
+                        key=lambda timer: (timer._deadline, timer._seqno))
+        try:
+            x = np.empty(len(timers), dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'TimerWheel._genArray_ - unable to allocate array'
+            )
+        for j, timer in enumerate(timers):
+            x[j] = (timer._deadline, timer._datum)
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        returns iterator over the (deadline,datum) elements, in deadline
+        order
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of array fails
+        """
+        x = self._genArray_()
+        return it.Iterator(len(x), x)
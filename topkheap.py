@@ -0,0 +1,314 @@
+# bounded heap keeping the k best entries of a stream
+import numpy as np
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class TopKHeap:
+    """
+    Bounded heap that keeps the k best (prio, datum) entries offered to it
+    With order 'descending' the best entries are those with the largest
+    priorities, with 'ascending' those with the smallest.  The entries are
+    held in parallel numpy arrays, as in ArrayHeapPrioQueue, managed as a
+    heap whose root is the worst entry kept, so the threshold a new entry
+    must beat is read in O(1) and a better entry replaces it in O(log k).
+    Among equal priorities the entry offered first is the better one, so
+    results are stable.  Memory is O(k) however long the stream.
+    Attributes
+    - _dtype (a class) - type of data values associated with priorities
+    - _prioType (numpy dtype) - type of the priorities, default float64
+    - _k (int) - number of entries to keep
+    - _sign (int) - 1 for 'descending', -1 for 'ascending'; entries are
+    kept by key = _sign * prio, larger keys being better
+    - _last (int) - the last occupied index in the heap arrays
+    - _offered (int) - number of entries offered so far
+    - _key (numpy 1D array of _prioType) - key of each heap entry
+    - _seqno (numpy 1D int64 array) - offer sequence number of each entry
+    - _datum (numpy 1D array of _dtype) - datum of each heap entry
+    """
+    ORDERS = ('descending', 'ascending')
+
+    def __init__(self, k, dtype = type(int()), prioType = type(float()),
+                 order = 'descending'):
+        """
+        Construct bounded heap
+        Parameters
+        - k (int) - number of entries to keep, >= 1
+        - dtype (class) - element type, default type(int())
+        - prioType (class) - signed numeric priority type, default
+        type(float())
+        - order (str) - 'descending' (the default) to keep the largest
+        priorities, 'ascending' to keep the smallest
+        Effects
+        - empty bounded heap ready to be offered entries
+        Raises
+        - ValueError if k < 1 or order is not one of ORDERS
+        - TypeError if prioType is not a signed numeric type
+        - MemoryError if allocation of the arrays fails
+        """
+        if k < 1:
+            raise ValueError('TopKHeap - k {} < 1'.format(k))
+        if order not in TopKHeap.ORDERS:
+            raise ValueError('TopKHeap - unknown order {!r}'.format(order))
+        self._dtype = typemap(dtype)
+        self._prioType = np.dtype(typemap(prioType))
+        if self._prioType.kind not in 'if':
+            raise TypeError(
+                'TopKHeap - prioType {} is not a signed numeric type'.format(
+                    prioType))
+        self._k = k
+        self._order = order
+        self._sign = 1 if order == 'descending' else -1
+        try:
+            self._key = np.empty(k + 1, dtype=self._prioType)
+            self._seqno = np.empty(k + 1, dtype=np.int64)
+            self._datum = np.empty(k + 1, dtype=self._dtype)
+        except:
+            raise MemoryError('TopKHeap - unable to allocate array')
+        self.clear()
+
+    def __str__(self):
+        """Document metadata about the bounded heap"""
+        return 'TopKHeap - k:{}, order:{}, size:{}, dtype:{}'.format(
+            self._k, self._order, self._last, self._dtype)
+
+    def clear(self):
+        """
+        Empty the bounded heap
+        Effects
+        - after return, isEmpty() invoked on the heap returns True
+        """
+        self._last = 0
+        self._offered = 0
+
+    def _worse_(self, key1, seq1, key2, seq2):
+        """Indicate if entry 1 is worse than entry 2"""
+        return key1 < key2 or (key1 == key2 and seq1 > seq2)
+
+    def _siftup_(self, i, k_i, s_i, d_i):
+        """
+        Place an entry by moving a hole at index i towards the root
+        Effects
+        - the entry is stored so that the worst entry is at the root
+        """
+        key = self._key
+        seqno = self._seqno
+        datum = self._datum
+        while i > 1:
+            p = i // 2
+            if not self._worse_(k_i, s_i, key[p], seqno[p]):
+                break
+            key[i] = key[p]
+            seqno[i] = seqno[p]
+            datum[i] = datum[p]
+            i = p
+        key[i] = k_i
+        seqno[i] = s_i
+        datum[i] = d_i
+
+    def _siftdown_(self, i, k_i, s_i, d_i):
+        """
+        Place an entry by moving a hole at index i towards the leaves
+        Effects
+        - the entry is stored so that the subtree at i has its worst entry
+        at i
+        """
+        key = self._key
+        seqno = self._seqno
+        datum = self._datum
+        last = self._last
+        while True:
+            c = 2 * i
+            if c > last:
+                break
+            if c < last and self._worse_(key[c + 1], seqno[c + 1],
+                                         key[c], seqno[c]):
+                c += 1
+            if not self._worse_(key[c], seqno[c], k_i, s_i):
+                break
+            key[i] = key[c]
+            seqno[i] = seqno[c]
+            datum[i] = datum[c]
+            i = c
+        key[i] = k_i
+        seqno[i] = s_i
+        datum[i] = d_i
+
+    def _accept_(self, key, seq, datum):
+        """
+        Keep (key, datum) if it is among the k best seen so far
+        Returns
+        - True if the entry was kept
+        """
+        if self._last < self._k:
+            self._last += 1
+            self._siftup_(self._last, key, seq, datum)
+            return True
+        # an entry offered later loses ties, so it must be strictly better
+        if key > self._key[1]:
+            self._siftdown_(1, key, seq, datum)
+            return True
+        return False
+
+    def offer(self, prio, datum):
+        """
+        Offer (prio, datum) to the bounded heap
+        Parameters
+        - prio - numeric priority for this entry
+        - datum - datum associated with this priority in this entry
+        Returns
+        - True if the entry is now among the k best, False if rejected
+        Effects
+        - if kept and the heap was full, the worst entry is dropped
+        Raises
+        - TypeError if type(datum) is different from _dtype
+        """
+        if type(datum) != self._dtype:
+            raise TypeError(
+                'TopKHeap.offer - type(datum) {} != {}'.format(
+                    type(datum), self._dtype
+                )
+            )
+        seq = self._offered
+        self._offered += 1
+        return self._accept_(self._sign * self._prioType.type(prio), seq,
+                             datum)
+
+    def offerMany(self, prios, data):
+        """
+        Offer a batch of (prio, datum) pairs
+        Parameters
+        - prios - numpy 1D array or sequence of priorities
+        - data - numpy 1D array or sequence of data, same length as prios
+        Returns
+        - the number of entries kept
+        Effects
+        - equivalent to offer(prios[i], data[i]) for each i in order; once
+        the heap is full, one vectorized comparison with the current
+        threshold rejects most of the batch, and at most k of the
+        survivors are sifted into the heap
+        Raises
+        - ValueError if prios and data differ in length
+        - TypeError if the data are not of type _dtype; in that case the
+        heap is unchanged
+        """
+        if not isinstance(self._dtype, np.dtype):
+            data = np.array(list(data), dtype=object)
+            if any(type(d) != self._dtype for d in data):
+                raise TypeError(
+                    'TopKHeap.offerMany - data must all be {}'.format(
+                        self._dtype))
+        else:
+            data = np.asarray(data)
+            if data.size and data.dtype != self._dtype:
+                raise TypeError(
+                    'TopKHeap.offerMany - data.dtype {} != {}'.format(
+                        data.dtype, self._dtype))
+        keys = np.asarray(prios).astype(self._prioType)
+        if len(keys) != len(data):
+            raise ValueError('TopKHeap.offerMany - len(prios) != len(data)')
+        if self._sign < 0:
+            keys = -keys
+        n = len(keys)
+        base = self._offered
+        self._offered += n
+        kept = 0
+        j = 0
+        while self._last < self._k and j < n:
+            self._accept_(keys[j], base + j, data[j])
+            kept += 1
+            j += 1
+        if j == n:
+            return kept
+        cand = np.flatnonzero(keys[j:] > self._key[1]) + j
+        if len(cand) > self._k:
+            # only the k best candidates can survive the batch; the stable
+            # sort lets earlier entries win ties
+            best = np.argsort(-keys[cand], kind='stable')[:self._k]
+            cand = np.sort(cand[best])
+        for i in cand.tolist():
+            if self._accept_(keys[i], base + i, data[i]):
+                kept += 1
+        return kept
+
+    def threshold(self):
+        """
+        Return the priority a new entry must beat to be kept
+        Returns
+        - priority of the worst entry kept, or None while fewer than k
+        entries are kept
+        """
+        if self._last < self._k:
+            return None
+        return self._sign * self._key[1]
+
+    def full(self):
+        """Indicate if k entries are kept"""
+        return self._last == self._k
+
+    def isEmpty(self):
+        """
+        Indicate if the bounded heap is empty
+        Returns
+        - True if the heap has no entries
+        - False otherwise
+        """
+        return self._last == 0
+
+    def size(self):
+        """
+        Return the number of entries kept
+        Returns
+        - the number of entries, between 0 and k
+        """
+        return self._last
+
+    def __len__(self):
+        """
+        Synonym for size
+        """
+        return self.size()
+
+    def _genArray_(self):
+        """
+        Generate an array of (prio,value) tuples, best first
+        Returns
+        - numpy 1D array of (prio,value) tuples, best first, with the
+        entry offered first leading among equal priorities
+        Raises
+        - MemoryError if array allocation failure
+        """
+        n = self._last
+        k = n + 1
+        order = np.lexsort((self._seqno[1:k], -self._key[1:k])) + 1
+        try:
+            x = np.empty(n, dtype=type(tuple))
+        except:
+            raise MemoryError(
+                'TopKHeap._genArray_ - unable to allocate array'
+            )
+        prio = (self._sign * self._key[order]).tolist()
+        datum = self._datum[order].tolist()
+        for j in range(n):
+            x[j] = (prio[j], datum[j])
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        returns iterator over the (prio,datum) entries, best first
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of array fails
+        """
+        x = self._genArray_()
+        return it.Iterator(len(x), x)
+
+    def __iter__(self):
+        """
+        Synonym for itCreate
+        """
+        return self.itCreate()
@@ -0,0 +1,615 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+import numpy as np
+from bisect import bisect_left, bisect_right
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class TreeMap(MapABC):
+    """
+    Ordered Map ADT implemented as a counted B+ tree
+    Entries are kept in key order in leaves of at most ORDER entries,
+    linked left to right for range scans.  Internal nodes hold up to ORDER
+    children, the separating keys between them, and the number of entries
+    below each child, which gives rank/select in O(log n).  Every node
+    except the root holds at least ORDER // 2 entries or children.
+    Keys must be mutually comparable with < and ==.
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _size (int) - number of entries in the Map
+    - _root (Leaf or Internal) - root node
+    - _head (Leaf) - leftmost leaf
+    - _modCount (int) - incremented whenever entries are added or
+    removed; iterators use it to fail fast
+    """
+    ORDER = 64
+    MIN = ORDER // 2
+
+    class Leaf:
+        """Leaf node: parallel lists of keys and values, in key order"""
+        def __init__(self, keys, values):
+            """
+            Construct leaf
+            Parameters
+            - keys - sorted list of keys
+            - values - list of values, parallel to keys
+            """
+            self._keys = keys
+            self._values = values
+            self._prev = None
+            self._next = None
+
+    class Internal:
+        """Internal node of the B+ tree"""
+        def __init__(self, keys, children, counts):
+            """
+            Construct internal node
+            Parameters
+            - keys - separators; keys[i] <= every key below children[i+1]
+            and > every key below children[i]
+            - children - list of child nodes, len(keys) + 1 of them
+            - counts - number of entries below each child
+            """
+            self._keys = keys
+            self._children = children
+            self._counts = counts
+
+    def __init__(self, dtype = type(int())):
+        """
+        Construct ordered map
+        Parameters
+        - dtype: type of data in the map, default type(int())
+        Effects
+        - object instance ready to act like a map
+        """
+        self._dtype = typemap(dtype)
+        self._modCount = 0
+        self.clear()
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'TreeMap - order: {}, size:{}, dtype:{}'.format(
+            TreeMap.ORDER, self._size, self._dtype)
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, isEmpty() invoked on the map returns True
+        """
+        self._root = TreeMap.Leaf([], [])
+        self._head = self._root
+        self._size = 0
+        self._modCount += 1
+
+    @staticmethod
+    def _count_(node):
+        """Return the number of entries below node"""
+        if isinstance(node, TreeMap.Leaf):
+            return len(node._keys)
+        return sum(node._counts)
+
+    def _findLeaf_(self, key):
+        """Return the leaf whose key range covers key"""
+        node = self._root
+        while isinstance(node, TreeMap.Internal):
+            node = node._children[bisect_right(node._keys, key)]
+        return node
+
+    def _typeCheck_(self, value, where):
+        """Raise TypeError unless type(value) is _dtype"""
+        if type(value) != self._dtype:
+            raise TypeError(
+                'TreeMap.{} - type(value) {} != {}'.format(
+                    where, type(value), self._dtype
+                )
+            )
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - True if an entry with key is in the Map
+        - False otherwise
+        """
+        leaf = self._findLeaf_(key)
+        j = bisect_left(leaf._keys, key)
+        return j < len(leaf._keys) and MapABC._equal_(leaf._keys[j], key)
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - value associated with key
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        leaf = self._findLeaf_(key)
+        j = bisect_left(leaf._keys, key)
+        if j < len(leaf._keys) and MapABC._equal_(leaf._keys[j], key):
+            return leaf._values[j]
+        raise KeyError('TreeMap.get - invalid key')
+
+    def _insert_(self, node, key, value, unique):
+        """
+        Insert (key, value) below node
+        Returns
+        - (added, split)
+        + added - True if a new entry was created
+        + split - None, or (separator, newRightSibling) if node overflowed
+        Raises
+        - KeyError if unique and key is already present
+        """
+        if isinstance(node, TreeMap.Leaf):
+            keys = node._keys
+            j = bisect_left(keys, key)
+            if j < len(keys) and MapABC._equal_(keys[j], key):
+                if unique:
+                    raise KeyError('TreeMap.putUnique - key already exists')
+                node._values[j] = value
+                return (False, None)
+            keys.insert(j, key)
+            node._values.insert(j, value)
+            if len(keys) <= TreeMap.ORDER:
+                return (True, None)
+            mid = len(keys) // 2
+            right = TreeMap.Leaf(keys[mid:], node._values[mid:])
+            del keys[mid:]
+            del node._values[mid:]
+            right._next = node._next
+            right._prev = node
+            if node._next is not None:
+                node._next._prev = right
+            node._next = right
+            return (True, (right._keys[0], right))
+        i = bisect_right(node._keys, key)
+        added, split = self._insert_(node._children[i], key, value, unique)
+        if added:
+            node._counts[i] += 1
+        if split is None:
+            return (added, None)
+        sep, right = split
+        n = TreeMap._count_(right)
+        node._counts[i] -= n
+        node._keys.insert(i, sep)
+        node._children.insert(i + 1, right)
+        node._counts.insert(i + 1, n)
+        if len(node._children) <= TreeMap.ORDER:
+            return (added, None)
+        mid = len(node._children) // 2
+        up = node._keys[mid - 1]
+        right = TreeMap.Internal(node._keys[mid:], node._children[mid:],
+                                 node._counts[mid:])
+        del node._keys[mid - 1:]
+        del node._children[mid:]
+        del node._counts[mid:]
+        return (added, (up, right))
+
+    def _put_(self, key, value, unique):
+        """Insert at the root, growing the tree a level on root split"""
+        added, split = self._insert_(self._root, key, value, unique)
+        if split is not None:
+            sep, right = split
+            left = self._root
+            self._root = TreeMap.Internal(
+                [sep], [left, right],
+                [TreeMap._count_(left), TreeMap._count_(right)])
+        if added:
+            self._size += 1
+            self._modCount += 1
+
+    def put(self, key, value):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Effects
+        - if containsKey(key) is True, the value associated with it will be
+        replaced by the value parameter
+        - if not, (key,value) will be added to the map in key order
+        Raises
+        - TypeError if type(value) is not equal to _dtype
+        """
+        self._typeCheck_(value, 'put')
+        self._put_(key, value, False)
+
+    def putUnique(self, key, value):
+        """
+        Store (key,value) into the map iff key not already in map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        Raises
+        - KeyError if there is already an entry using key
+        - TypeError if type(value) is not equal to _dtype
+        """
+        self._typeCheck_(value, 'putUnique')
+        self._put_(key, value, True)
+
+    def _rebalance_(self, parent, i):
+        """
+        Restore the minimum occupancy of parent's child i by borrowing
+        from, or merging with, an adjacent sibling
+        """
+        child = parent._children[i]
+        leaf = isinstance(child, TreeMap.Leaf)
+        left = parent._children[i - 1] if i > 0 else None
+        right = (parent._children[i + 1]
+                 if i + 1 < len(parent._children) else None)
+        if leaf:
+            if left is not None and len(left._keys) > TreeMap.MIN:
+                child._keys.insert(0, left._keys.pop())
+                child._values.insert(0, left._values.pop())
+                parent._keys[i - 1] = child._keys[0]
+                parent._counts[i - 1] -= 1
+                parent._counts[i] += 1
+                return
+            if right is not None and len(right._keys) > TreeMap.MIN:
+                child._keys.append(right._keys.pop(0))
+                child._values.append(right._values.pop(0))
+                parent._keys[i] = right._keys[0]
+                parent._counts[i + 1] -= 1
+                parent._counts[i] += 1
+                return
+        else:
+            if left is not None and len(left._children) > TreeMap.MIN:
+                n = left._counts.pop()
+                child._children.insert(0, left._children.pop())
+                child._counts.insert(0, n)
+                child._keys.insert(0, parent._keys[i - 1])
+                parent._keys[i - 1] = left._keys.pop()
+                parent._counts[i - 1] -= n
+                parent._counts[i] += n
+                return
+            if right is not None and len(right._children) > TreeMap.MIN:
+                n = right._counts.pop(0)
+                child._children.append(right._children.pop(0))
+                child._counts.append(n)
+                child._keys.append(parent._keys[i])
+                parent._keys[i] = right._keys.pop(0)
+                parent._counts[i + 1] -= n
+                parent._counts[i] += n
+                return
+        # no sibling can lend; merge child with a sibling
+        if left is None:
+            i += 1
+        left = parent._children[i - 1]
+        right = parent._children[i]
+        if leaf:
+            left._keys.extend(right._keys)
+            left._values.extend(right._values)
+            left._next = right._next
+            if right._next is not None:
+                right._next._prev = left
+        else:
+            left._keys.append(parent._keys[i - 1])
+            left._keys.extend(right._keys)
+            left._children.extend(right._children)
+            left._counts.extend(right._counts)
+        parent._counts[i - 1] += parent._counts[i]
+        del parent._keys[i - 1]
+        del parent._children[i]
+        del parent._counts[i]
+
+    def _delete_(self, node, key):
+        """
+        Remove key from below node
+        Returns
+        - True if an entry was removed
+        """
+        if isinstance(node, TreeMap.Leaf):
+            keys = node._keys
+            j = bisect_left(keys, key)
+            if j < len(keys) and MapABC._equal_(keys[j], key):
+                del keys[j]
+                del node._values[j]
+                return True
+            return False
+        i = bisect_right(node._keys, key)
+        child = node._children[i]
+        if not self._delete_(child, key):
+            return False
+        node._counts[i] -= 1
+        if isinstance(child, TreeMap.Leaf):
+            small = len(child._keys) < TreeMap.MIN
+        else:
+            small = len(child._children) < TreeMap.MIN
+        if small:
+            self._rebalance_(node, i)
+        return True
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key
+        Parameters
+        - key - the key in which we are interested
+        Effects
+        - entry associated with key removed from the map
+        - there is one fewer entry in the map
+        Raises
+        - KeyError if containsKey(key) == False
+        """
+        if not self._delete_(self._root, key):
+            raise KeyError('TreeMap.remove - key does not exist')
+        root = self._root
+        if isinstance(root, TreeMap.Internal) and len(root._children) == 1:
+            self._root = root._children[0]
+        self._size -= 1
+        self._modCount += 1
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if the map has no entries
+        - False otherwise
+        """
+        return self._size == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the number of entries in the map, >= 0
+        """
+        return self._size
+
+    def loadSorted(self, keys, values):
+        """
+        Replace the contents of the map with pre-sorted entries in O(n)
+        Parameters
+        - keys - numpy 1D array or sequence of strictly increasing keys
+        - values - numpy 1D array or sequence of values, same length
+        Effects
+        - the map holds exactly the given entries; leaves and internal
+        nodes are filled evenly bottom-up without any searching
+        Raises
+        - ValueError if keys is not strictly increasing or the lengths
+        differ
+        - TypeError if a value's type is not _dtype
+        """
+        keys = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+        values = (values.tolist() if isinstance(values, np.ndarray)
+                  else list(values))
+        n = len(keys)
+        if len(values) != n:
+            raise ValueError('TreeMap.loadSorted - len(keys) != len(values)')
+        for j in range(1, n):
+            if not keys[j - 1] < keys[j]:
+                raise ValueError(
+                    'TreeMap.loadSorted - keys not strictly increasing')
+        for value in values:
+            self._typeCheck_(value, 'loadSorted')
+        self.clear()
+        if n == 0:
+            return
+        # level is a list of (node, smallest key, entry count)
+        level = []
+        prev = None
+        for lo, hi in TreeMap._spans_(n):
+            leaf = TreeMap.Leaf(keys[lo:hi], values[lo:hi])
+            leaf._prev = prev
+            if prev is not None:
+                prev._next = leaf
+            prev = leaf
+            level.append((leaf, keys[lo], hi - lo))
+        self._head = level[0][0]
+        while len(level) > 1:
+            upper = []
+            for lo, hi in TreeMap._spans_(len(level)):
+                group = level[lo:hi]
+                node = TreeMap.Internal([g[1] for g in group[1:]],
+                                        [g[0] for g in group],
+                                        [g[2] for g in group])
+                upper.append((node, group[0][1], sum(g[2] for g in group)))
+            level = upper
+        self._root = level[0][0]
+        self._size = n
+
+    @staticmethod
+    def _spans_(n):
+        """
+        Split range(n) into the fewest runs of at most ORDER items whose
+        lengths differ by at most one
+        Returns
+        - list of (lo, hi) index pairs
+        """
+        k = -(-n // TreeMap.ORDER)
+        q, r = divmod(n, k)
+        spans = []
+        lo = 0
+        for j in range(k):
+            hi = lo + q + (1 if j < r else 0)
+            spans.append((lo, hi))
+            lo = hi
+        return spans
+
+    def firstKey(self):
+        """
+        Return the smallest key in the map
+        Raises
+        - EmptyError if the map is empty
+        """
+        if self._size == 0:
+            raise EmptyError('TreeMap.firstKey - map is empty')
+        return self._head._keys[0]
+
+    def lastKey(self):
+        """
+        Return the largest key in the map
+        Raises
+        - EmptyError if the map is empty
+        """
+        if self._size == 0:
+            raise EmptyError('TreeMap.lastKey - map is empty')
+        node = self._root
+        while isinstance(node, TreeMap.Internal):
+            node = node._children[-1]
+        return node._keys[-1]
+
+    def floorKey(self, key):
+        """
+        Return the largest key <= key, or None if there is none
+        """
+        leaf = self._findLeaf_(key)
+        j = bisect_right(leaf._keys, key) - 1
+        if j >= 0:
+            return leaf._keys[j]
+        if leaf._prev is not None:
+            return leaf._prev._keys[-1]
+        return None
+
+    def ceilingKey(self, key):
+        """
+        Return the smallest key >= key, or None if there is none
+        """
+        leaf = self._findLeaf_(key)
+        j = bisect_left(leaf._keys, key)
+        if j < len(leaf._keys):
+            return leaf._keys[j]
+        if leaf._next is not None:
+            return leaf._next._keys[0]
+        return None
+
+    def rank(self, key):
+        """
+        Return the number of keys in the map that are < key
+        """
+        r = 0
+        node = self._root
+        while isinstance(node, TreeMap.Internal):
+            i = bisect_right(node._keys, key)
+            r += sum(node._counts[:i])
+            node = node._children[i]
+        return r + bisect_left(node._keys, key)
+
+    def select(self, index):
+        """
+        Return the key with the given rank
+        Parameters
+        - index - integer in the range [0, size)
+        Returns
+        - the key k with rank(k) == index
+        Raises
+        - IndexError if index < 0 or index >= size
+        """
+        if index < 0 or index >= self._size:
+            raise IndexError('TreeMap.select - illegal index {}'.format(index))
+        node = self._root
+        while isinstance(node, TreeMap.Internal):
+            i = 0
+            while index >= node._counts[i]:
+                index -= node._counts[i]
+                i += 1
+            node = node._children[i]
+        return node._keys[index]
+
+    def rangeItems(self, lo = None, hi = None):
+        """
+        Generator over the (key,value) tuples with lo <= key < hi, in key
+        order; a bound of None is unbounded
+        Raises
+        - RuntimeError if entries are added or removed during iteration
+        """
+        expected = self._modCount
+        if lo is None:
+            leaf = self._head
+            j = 0
+        else:
+            leaf = self._findLeaf_(lo)
+            j = bisect_left(leaf._keys, lo)
+        while leaf is not None:
+            keys = leaf._keys
+            while j < len(keys):
+                if self._modCount != expected:
+                    raise RuntimeError(
+                        'TreeMap - map changed during iteration')
+                if hi is not None and not keys[j] < hi:
+                    return
+                yield (keys[j], leaf._values[j])
+                j += 1
+            leaf = leaf._next
+            j = 0
+
+    def rangeKeys(self, lo = None, hi = None):
+        """
+        Generator over the keys with lo <= key < hi, in key order
+        """
+        return (k for k, v in self.rangeItems(lo, hi))
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - numpy 1D object array of keys, in key order
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        try:
+            x = np.empty(self._size, dtype=object)
+        except:
+            raise MemoryError('TreeMap.keyArray - unable to allocate array')
+        j = 0
+        leaf = self._head
+        while leaf is not None:
+            for k in leaf._keys:
+                x[j] = k
+                j += 1
+            leaf = leaf._next
+        return x
+
+    def _genArray_(self):
+        """
+        Return an array of (key,value) tuples in key order
+        Raises
+        - MemoryError if array allocation fails
+        """
+        try:
+            x = np.empty(self._size, dtype=type(tuple))
+        except:
+            raise MemoryError('TreeMap._genArray_ - unable to allocate array')
+        j = 0
+        for item in self.rangeItems():
+            x[j] = item
+            j += 1
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return an iterator over the map entries in key order
+        Returns
+        - lazy generator over (key,value) tuples, see rangeItems()
+        """
+        return self.rangeItems()
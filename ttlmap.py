@@ -0,0 +1,390 @@
+"""
+Copyright (c) 2024, University of Oregon
+All rights reserved.
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+- Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+- Redistributions in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+- Neither the name of the University of Oregon nor the names of its
+contributors may be used to endorse or promote products derived from this
+software without specific prior written permission.
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+POSSIBILITY OF SUCH DAMAGE.
+"""
+from mapABC import MapABC
+from hashmap import HashMap
+import numpy as np
+import math
+import time
+import ADTiterator as it
+from ADTexceptions import *
+from ADTtypemap import typemap
+
+class TTLMap(MapABC):
+    """
+    Map ADT whose entries expire a fixed time after they were stored
+    Expired entries are dropped lazily when a lookup finds them, and in
+    bulk by expire(), which advances a hierarchical timer wheel to the
+    current time.  The wheel has LEVELS levels of SLOTS slots; a slot at
+    level l spans SLOTS**l ticks, so the work done by expire() is
+    proportional to the ticks elapsed and the entries that expired, not
+    to the size of the map.  put() calls expire(), so expiry is
+    amortized over updates.
+    Attributes
+    - _dtype (class) - type of data associated with keys
+    - _ttl (float) - default time-to-live, in clock units
+    - _tick (float) - width of a level-0 wheel slot, in clock units
+    - _clock (function) - returns the current time as a float
+    - _map (HashMap) - maps each key to its TTLMap.Entry
+    - _wheel (list of lists of lists) - _wheel[level][slot] holds the
+    entries scheduled to be examined when that slot is reached
+    - _now (int) - the last tick processed by the wheel
+    - _expired (int) - number of entries expired so far
+    """
+    DEFAULT_TTL = 60.0
+    DEFAULT_TICK = 1.0
+    LEVELS = 4
+    SLOT_BITS = 6
+    SLOTS = 1 << SLOT_BITS
+
+    class Entry:
+        """value with its expiry time"""
+        def __init__(self, key, value, expires, deadline):
+            """
+            Constructor for entry
+            Parameters
+            - key - the key to be associated with this entry
+            - value - the value to be associated with this key
+            - expires - clock time at which the entry expires
+            - deadline - first wheel tick at or after expires
+            """
+            self._key = key
+            self._value = value
+            self._expires = expires
+            self._deadline = deadline
+
+    def __init__(self, ttl = DEFAULT_TTL, hashfxn = hash,
+                 dtype = type(int()), tick = DEFAULT_TICK,
+                 clock = time.monotonic):
+        """
+        Constructor for expiring Map
+        Parameters
+        - ttl: default time-to-live of an entry, default DEFAULT_TTL
+        - hashfxn: function that hashes key to yield an int
+        - dtype: type of data in the map, default type(int())
+        - tick: resolution of the timer wheel, default DEFAULT_TICK
+        - clock: function returning the current time, default
+        time.monotonic; tests may pass a fake clock
+        Effects
+        - object instance ready to act like a map
+        Raises
+        - ValueError if ttl or tick is not positive
+        """
+        if ttl <= 0 or tick <= 0:
+            raise ValueError('TTLMap - ttl and tick must be positive')
+        self._dtype = typemap(dtype)
+        self._ttl = ttl
+        self._tick = tick
+        self._clock = clock
+        self._map = HashMap(hashfxn=hashfxn, dtype=TTLMap.Entry)
+        self._expired = 0
+        self._reset_()
+
+    def _reset_(self):
+        """Empty the timer wheel and restart it at the current time"""
+        self._wheel = [[[] for s in range(TTLMap.SLOTS)]
+                       for l in range(TTLMap.LEVELS)]
+        self._now = math.floor(self._clock() / self._tick)
+
+    def __str__(self):
+        """Document metadata about the map object"""
+        return 'TTLMap - ttl: {}, size:{}, dtype:{}'.format(
+            self._ttl, self._map.size(), self._dtype)
+
+    def clear(self):
+        """
+        Empty the map
+        Effects
+        - after return, isEmpty() invoked on the map returns True
+        """
+        self._map.clear()
+        self._reset_()
+
+    def _schedule_(self, entry):
+        """
+        File entry in the wheel slot that will be reached at, or on the
+        way down to, its deadline tick
+        """
+        d = entry._deadline
+        delta = max(d - self._now, 0)
+        level = 0
+        while (level < TTLMap.LEVELS - 1 and
+               delta >= 1 << (TTLMap.SLOT_BITS * (level + 1))):
+            level += 1
+        slot = (d >> (TTLMap.SLOT_BITS * level)) & (TTLMap.SLOTS - 1)
+        self._wheel[level][slot].append(entry)
+
+    def _isCurrent_(self, entry):
+        """Indicate whether entry is still the one stored for its key"""
+        found = self._map._findKey_(entry._key)[1]
+        return found is not None and found._value is entry
+
+    def _processTick_(self, t):
+        """
+        Advance the wheel to tick t
+        Effects
+        - higher-level slots whose span starts at t are cascaded down
+        - entries in the level-0 slot for t whose deadline has passed are
+        removed from the map
+        """
+        mask = TTLMap.SLOTS - 1
+        level = 1
+        while (level < TTLMap.LEVELS and
+               (t >> (TTLMap.SLOT_BITS * (level - 1))) & mask == 0):
+            slot = (t >> (TTLMap.SLOT_BITS * level)) & mask
+            pending = self._wheel[level][slot]
+            self._wheel[level][slot] = []
+            for entry in pending:
+                self._schedule_(entry)
+            level += 1
+        pending = self._wheel[0][t & mask]
+        self._wheel[0][t & mask] = []
+        for entry in pending:
+            if not self._isCurrent_(entry):
+                continue
+            if entry._deadline <= t:
+                self._map.remove(entry._key)
+                self._expired += 1
+            else:
+                self._schedule_(entry)
+
+    def expire(self):
+        """
+        Remove every entry whose deadline tick has been reached
+        Returns
+        - the number of entries removed
+        Effects
+        - the timer wheel is advanced to the current time
+        """
+        target = math.floor(self._clock() / self._tick)
+        before = self._expired
+        if self._map.isEmpty():
+            self._now = max(self._now, target)
+        mask = TTLMap.SLOTS - 1
+        level0 = self._wheel[0]
+        while self._now < target:
+            t = self._now + 1
+            # nothing cascades before the next multiple of SLOTS, so run
+            # straight past empty level-0 slots up to it
+            stop = min(target, t | mask)
+            while t & mask and t < stop and not level0[t & mask]:
+                t += 1
+            self._now = t
+            self._processTick_(t)
+        return self._expired - before
+
+    def _live_(self, key):
+        """
+        Return the entry for key if it has not expired, else None
+        Effects
+        - an expired entry found here is removed from the map
+        """
+        node = self._map._findKey_(key)[1]
+        if node is None:
+            return None
+        entry = node._value
+        if entry._expires <= self._clock():
+            self._map.remove(key)
+            self._expired += 1
+            return None
+        return entry
+
+    def containsKey(self, key):
+        """
+        Indicate whether the key is resident in the map and unexpired
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - True if an unexpired entry with key is in the Map
+        - False otherwise
+        """
+        return self._live_(key) is not None
+
+    def get(self, key):
+        """
+        Return value associated with key
+        Parameters
+        - key - the key in which we are interested
+        Returns
+        - value associated with key
+        Raises
+        - KeyError if key is not in the map or its entry has expired
+        """
+        entry = self._live_(key)
+        if entry is None:
+            raise KeyError('TTLMap.get - invalid key')
+        return entry._value
+
+    def ttl(self, key):
+        """
+        Return the time remaining before the entry for key expires
+        Raises
+        - KeyError if key is not in the map or its entry has expired
+        """
+        entry = self._live_(key)
+        if entry is None:
+            raise KeyError('TTLMap.ttl - invalid key')
+        return entry._expires - self._clock()
+
+    def _store_(self, key, value, ttl):
+        """
+        Store a fresh entry for key and schedule its expiry
+        """
+        if ttl is None:
+            ttl = self._ttl
+        if ttl <= 0:
+            raise ValueError('TTLMap.put - ttl must be positive')
+        expires = self._clock() + ttl
+        deadline = math.ceil(expires / self._tick)
+        entry = TTLMap.Entry(key, value, expires, deadline)
+        self._map.put(key, entry)
+        self._schedule_(entry)
+
+    def put(self, key, value, ttl = None):
+        """
+        Store (key,value) into the map
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        - ttl - time-to-live for this entry, default the map's ttl
+        Effects
+        - any entry for key is replaced, and its expiry time restarted
+        - entries that have expired are removed by expire()
+        Raises
+        - TypeError if type(value) is not equal to _dtype
+        - ValueError if ttl is not positive
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'TTLMap.put - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        self.expire()
+        self._store_(key, value, ttl)
+
+    def putUnique(self, key, value, ttl = None):
+        """
+        Store (key,value) into the map iff key has no unexpired entry
+        Parameters
+        - key - the key for this entry
+        - value - the value to be associated with this key
+        - ttl - time-to-live for this entry, default the map's ttl
+        Raises
+        - KeyError if there is already an unexpired entry using key
+        - TypeError if type(value) is not equal to _dtype
+        - ValueError if ttl is not positive
+        """
+        if type(value) != self._dtype:
+            raise TypeError(
+                'TTLMap.putUnique - type(value) {} != {}'.format(
+                    type(value), self._dtype
+                )
+            )
+        self.expire()
+        if self._live_(key) is not None:
+            raise KeyError('TTLMap.putUnique - key already exists')
+        self._store_(key, value, ttl)
+
+    def remove(self, key):
+        """
+        Remove the entry associated with key
+        Parameters
+        - key - the key in which we are interested
+        Effects
+        - entry associated with key removed from the map
+        Raises
+        - KeyError if key is not in the map or its entry has expired
+        """
+        if self._live_(key) is None:
+            raise KeyError('TTLMap.remove - key does not exist')
+        self._map.remove(key)
+
+    def isEmpty(self):
+        """
+        Indicate if the map is empty
+        Returns
+        - True if the map has no unexpired entries
+        - False otherwise
+        """
+        return self.size() == 0
+
+    def size(self):
+        """
+        Return the number of entries in the map
+        Returns
+        - the number of entries in the map after expire(); entries that
+        expired less than one tick ago may still be counted
+        """
+        self.expire()
+        return self._map.size()
+
+    def _genArray_(self):
+        """
+        Return an unordered array of unexpired (key,value) tuples
+        Raises
+        - MemoryError if array allocation fails
+        """
+        self.expire()
+        now = self._clock()
+        live = [(k, e._value) for k, e in self._map if e._expires > now]
+        try:
+            x = np.empty(len(live), dtype=type(tuple))
+        except:
+            raise MemoryError('TTLMap._genArray_ - unable to allocate array')
+        for j in range(len(live)):
+            x[j] = live[j]
+        return x
+
+    def keyArray(self):
+        """
+        Return an array of the keys in the map
+        Returns
+        - an unordered numpy 1D array of keys with unexpired entries
+        Raises
+        - MemoryError if allocation of the array fails
+        """
+        pairs = self._genArray_()
+        try:
+            x = np.empty(len(pairs), dtype=object)
+        except:
+            raise MemoryError('TTLMap.keyArray - unable to allocate array')
+        for j in range(len(pairs)):
+            x[j] = pairs[j][0]
+        return x
+
+    def toArray(self):
+        return self._genArray_()
+
+    def itCreate(self):
+        """
+        Return in unordered iterator over the unexpired map entries
+        Returns
+        - Iterator instance
+        Raises
+        - MemoryError if allocation of the array of entries fails
+        """
+        x = self._genArray_()
+        return it.Iterator(len(x), x)